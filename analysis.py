@@ -1,21 +1,19 @@
 import pandas as pd
 import numpy as np
 
+import xg_model
+
 # 모듈별 기능 분리
-from stats_utils import FIELD_W, FIELD_H, convert_time_to_seconds, is_in_final_third, is_in_penalty_area, is_progressive_pass
-from summaries import create_player_summary, create_shooter_summary, create_cross_summary, create_advanced_summary
-from scoring import calculate_passing_score, calculate_shooting_score, calculate_cross_score, calculate_dribbling_score, calculate_drive_score, calculate_tackling_score, calculate_advanced_scores, calculate_buildup_score, calculate_save_score, calculate_header_score, calculate_pace_score
+from stats_utils import FIELD_W, FIELD_H, convert_time_to_seconds, is_in_final_third, is_in_penalty_area, is_progressive_pass, add_zone_index, tag_mask
+from summaries import create_player_summary, create_shooter_summary, create_cross_summary, create_advanced_summary, create_zone_pass_matrix, create_pass_network, create_timeline_summary, DEFAULT_TIMELINE_WINDOW
+from schema import normalize_events, mark_analyzed, is_analyzed, was_analyzed, ANALYZED_COLUMNS
+from scoring import calculate_passing_score, calculate_shooting_score, calculate_cross_score, calculate_dribbling_score, calculate_drive_score, calculate_tackling_score, calculate_advanced_scores, calculate_buildup_score, calculate_save_score, calculate_header_score, calculate_pace_score, calculate_all_scores, RAW_SCORE_COLUMNS, RAW_SCORE_ACTIONS
 
 def analyze_pass_data(df):
     """
     경기 이벤트 데이터프레임을 분석하여 보정 좌표, 패스 거리, 패스 방향을 추가합니다.
     """
-    coord_cols = ['StartX', 'StartY', 'EndX', 'EndY']
-    for col in coord_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-
-    if not all(col in df.columns for col in coord_cols + ['Direction']):
-        return df
+    df = normalize_events(df)
 
     # --- 1. 보정 좌표 산출 ---
     is_left_direction = df['Direction'].str.lower() == 'left'
@@ -52,7 +50,8 @@ def analyze_pass_data(df):
 
 def add_xg_to_data(df):
     """
-    새로운 xG 공식을 적용하여 슈팅 데이터에 xG 값을 추가합니다.
+    활성 xG 모델(xg_model.py)을 적용하여 슈팅 데이터에 xG 값을 추가합니다.
+    보정된 모델이 없으면 기본 공식을 사용합니다.
     xG = 1 / (1 + exp(0.2 * dist - 2.0 * angle - 1.2 * is_pa + 1.5 * is_head + 0.8 * is_weak - 0.6))
     
     - dist: 골문까지의 거리
@@ -61,60 +60,22 @@ def add_xg_to_data(df):
     - is_head: 헤딩 여부 (1: 헤딩, 0: 아님) - Tags의 'Header'로 판단
     - is_weak: 약발 여부 (1: 약발, 0: 아님) - Tags의 'Weak Foot'로 판단
     """
-    shot_action_codes = {'ddd': 'Goal', 'dd': 'Shot On Target', 'd': 'Shot', 'db': 'Blocked Shot'}
-    shot_actions = list(shot_action_codes.values())
-    df_shots = df[df['Action'].isin(shot_actions)].copy()
+    df_shots = df[df['Action'].isin(xg_model.SHOT_ACTIONS)].copy()
     if df_shots.empty:
         df['xG'] = np.nan
         return df
 
-    # 골문 좌표 (오른쪽 골대 중앙)
-    goal_x, goal_y = 105, 34
-    goal_post_left = 30.34  # 골문 왼쪽 포스트 y좌표
-    goal_post_right = 37.66  # 골문 오른쪽 포스트 y좌표
-    
-    # 거리 계산
-    distance = np.sqrt((goal_x - df_shots['StartX_adj'])**2 + (goal_y - df_shots['StartY_adj'])**2)
-    
-    # 슈팅 각도 계산 (골문과 이루는 각도, 라디안 단위)
-    # 슈팅 위치에서 양쪽 골포스트까지의 벡터를 이용해 각도 계산
-    dx_left = goal_x - df_shots['StartX_adj']
-    dy_left = goal_post_left - df_shots['StartY_adj']
-    dx_right = goal_x - df_shots['StartX_adj']
-    dy_right = goal_post_right - df_shots['StartY_adj']
-    
-    # 두 벡터 사이의 각도 계산
-    angle_left = np.arctan2(dy_left, dx_left)
-    angle_right = np.arctan2(dy_right, dx_right)
-    angle = np.abs(angle_left - angle_right)  # 라디안 단위
-    
-    # Tags 컬럼에서 정보 추출
-    df_shots['Tags'] = df_shots['Tags'].astype(str).fillna('')
-    
-    # is_pa: 페널티 박스 내 여부 (In-box = 1, Out-box = 0)
-    is_pa = df_shots['Tags'].str.contains('In-box', case=False, na=False).astype(int)
-    
-    # is_head: 헤딩 여부 (Header = 1)
-    is_head = df_shots['Tags'].str.contains('Header', case=False, na=False).astype(int)
+    df_shots['xG'] = xg_model.predict(xg_model.shot_features(df_shots))
     
-    # is_weak: 약발 여부 (Weak Foot = 1)
-    is_weak = df_shots['Tags'].str.contains('Weak Foot', case=False, na=False).astype(int)
-    
-    # xG 계산
-    # xG = 1 / (1 + exp(0.2 * dist - 2.0 * angle - 1.2 * is_pa + 1.5 * is_head + 0.8 * is_weak - 0.6))
-    exponent = 0.2 * distance - 2.0 * angle - 1.2 * is_pa + 1.5 * is_head + 0.8 * is_weak - 0.6
-    xg_values = 1 / (1 + np.exp(exponent))
-    
-    df_shots['xG'] = xg_values
-    
-    df = pd.merge(df, df_shots[['No', 'xG']], on='No', how='left')
+    # 다시 분석하는 프레임은 이전 xG를 교체
+    df = pd.merge(df.drop(columns=['xG'], errors='ignore'), df_shots[['No', 'xG']], on='No', how='left')
     return df
 
 
 def auto_tag_key_pass_and_assist(df):
     df_sorted = df.sort_values(by='No').reset_index(drop=True)
     
-    df_sorted['Tags'] = df_sorted['Tags'].astype(str).fillna('')
+    df_sorted = normalize_events(df_sorted)
 
     shot_action_codes = {'ddd': 'Goal', 'dd': 'Shot On Target', 'd': 'Shot', 'db': 'Blocked Shot'}
     shot_actions = list(shot_action_codes.values())
@@ -143,15 +104,108 @@ def auto_tag_key_pass_and_assist(df):
     return df_sorted
 
 
-def create_tableau_pass_data(df):
-    coord_cols = ['StartX', 'StartY', 'EndX', 'EndY']
-    for col in coord_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+# --- 점유(Possession) 구분 ---
+# 이 액션에서 새 점유가 시작됨 (공 획득)
+POSSESSION_START_ACTIONS = ['Gain', 'Intercept', 'Throw-in']
+# 이 액션 다음 이벤트부터 새 점유가 시작됨 (공 상실)
+POSSESSION_END_ACTIONS = ['Miss', 'Clear']
+# 이전 이벤트와의 시간 간격이 이보다 크면 새 점유로 간주 (초)
+POSSESSION_MAX_GAP_S = 20
+
+def assign_possessions(df, max_gap_s=POSSESSION_MAX_GAP_S):
+    """
+    현재 행 순서(No 순)대로 이벤트마다 점유 번호 'PossessionID'와 점유 내 순번 'Possession_Seq'를 부여합니다.
+    MatchID/TeamID/Half가 바뀌거나, 획득/상실 액션, 시간 간격 초과 시 새 점유가 시작됩니다.
+    cumsum 기반 run-length 계산이므로 O(n)입니다.
+    """
+    n = len(df)
+    if n == 0:
+        df['PossessionID'] = pd.Series(dtype=int)
+        df['Possession_Seq'] = pd.Series(dtype=int)
+        return df
+
+    new_chain = np.zeros(n, dtype=bool)
+    new_chain[0] = True
+    for col in ('MatchID', 'TeamID', 'Half'):
+        if col in df.columns:
+            values = df[col].fillna('').astype(str).to_numpy()
+            new_chain[1:] |= values[1:] != values[:-1]
+
+    actions = df['Action'].to_numpy()
+    new_chain |= np.isin(actions, POSSESSION_START_ACTIONS)
+    new_chain[1:] |= np.isin(actions[:-1], POSSESSION_END_ACTIONS)
 
+    if 'Time(s)' in df.columns:
+        seconds = df['Time(s)'].to_numpy(dtype=float)
+        gap = np.diff(seconds)
+        new_chain[1:] |= (gap > max_gap_s) | (gap < 0)
+
+    idx = np.arange(n)
+    chain_start = np.maximum.accumulate(np.where(new_chain, idx, 0))
+    df['PossessionID'] = np.cumsum(new_chain)
+    df['Possession_Seq'] = idx - chain_start + 1
+    return df
+
+
+def create_possession_summary(df):
+    """
+    점유별 집계를 한 번의 groupby로 계산합니다.
+    """
+    if 'PossessionID' not in df.columns:
+        df = assign_possessions(df)
+    if df.empty:
+        return pd.DataFrame()
+
+    tags = df['Tags'] if 'Tags' in df.columns else pd.Series('', index=df.index)
+    is_pass = df['Action'].isin(['Pass', 'Cross'])
+    end_x = df['EndX_adj'].fillna(df['StartX_adj']) if 'EndX_adj' in df.columns else df.get('StartX_adj')
+    work = pd.DataFrame({
+        'PossessionID': df['PossessionID'],
+        'MatchID': df['MatchID'] if 'MatchID' in df.columns else '',
+        'TeamID': df['TeamID'],
+        'Half': df['Half'],
+        'Player': df['Player'],
+        'Time_s': df['Time(s)'] if 'Time(s)' in df.columns else np.nan,
+        'Start_X': df['StartX_adj'] if 'StartX_adj' in df.columns else np.nan,
+        'End_X': end_x,
+        'Pass': is_pass,
+        'Pass_Success': is_pass & tag_mask(tags, 'Success'),
+        'Shot': df['Action'].isin(['Goal', 'Shot On Target', 'Shot', 'Blocked Shot']),
+        'Goal': df['Action'] == 'Goal',
+        'xG': df['xG'] if 'xG' in df.columns else 0.0,
+    })
+
+    summary = work.groupby('PossessionID', sort=True).agg(
+        MatchID=('MatchID', 'first'),
+        TeamID=('TeamID', 'first'),
+        Half=('Half', 'first'),
+        Start_Time=('Time_s', 'min'),
+        End_Time=('Time_s', 'max'),
+        Events=('Player', 'size'),
+        Players=('Player', 'nunique'),
+        Passes=('Pass', 'sum'),
+        Successful_Passes=('Pass_Success', 'sum'),
+        Start_X=('Start_X', 'first'),
+        End_X=('End_X', 'last'),
+        Max_X=('End_X', 'max'),
+        Shots=('Shot', 'sum'),
+        Goals=('Goal', 'sum'),
+        xG=('xG', 'sum'),
+    )
+    summary['Duration'] = summary['End_Time'] - summary['Start_Time']
+    summary['Progression'] = (summary['End_X'] - summary['Start_X']).round(2)
+    return summary
+
+
+def create_tableau_pass_data(df):
+    df = normalize_events(df)
     df_origin = df.copy()
     df_origin['table'] = 'origin'
     df_apply = df.copy()
     df_apply[['StartX', 'StartY', 'EndX', 'EndY']] = df_apply[['EndX', 'EndY', 'StartX', 'StartY']]
+    zone_cols = ['Start_Zone', 'Start_Grid', 'End_Zone', 'End_Grid']
+    if all(col in df_apply.columns for col in zone_cols):
+        df_apply[zone_cols] = df_apply[['End_Zone', 'End_Grid', 'Start_Zone', 'Start_Grid']].to_numpy()
     df_apply['table'] = 'apply'
 
     combined_df = pd.concat([df_origin, df_apply], ignore_index=True)
@@ -165,16 +219,51 @@ def create_tableau_pass_data(df):
 
     return combined_df
 
+def build_player_stats(df, summaries=None):
+    """
+    선수별 요약(패스/슈팅/크로스/고급)을 병합하고 모든 Raw/Score 컬럼을 계산합니다.
+    summaries: 이미 계산한 (pass, shooter, cross, advanced) 요약이 있으면 재사용
+    """
+    if summaries is None:
+        summaries = (create_player_summary(df), create_shooter_summary(df),
+                     create_cross_summary(df), create_advanced_summary(df))
+    all_stats = pd.DataFrame(index=df['Player'].unique())
+    all_stats = all_stats.join(list(summaries), how='outer').fillna(0)
+    return calculate_all_scores(all_stats)
+
 def perform_full_analysis(df):
     """
     전체 분석 파이프라인을 실행합니다.
+    0. 표준 스키마 정규화 (schema.normalize_events)
     1. 시간 변환
     2. 키패스/어시스트 태깅
-    3. 패스/공간 분석
-    4. xG 계산
+    3. 점유 구분 (PossessionID, Possession_Seq)
+    4. 패스/공간 분석
+    5. 구역 인덱스 (Start/End_Zone, Start/End_Grid)
+    6. xG 계산
+    이미 분석된 프레임(df.attrs의 분석 버전이 현재와 같음)은 그대로 반환합니다.
     """
-    df_with_seconds = convert_time_to_seconds(df.copy())
+    if is_analyzed(df):
+        return df
+    df_normalized = normalize_events(df.copy())
+    df_with_seconds = convert_time_to_seconds(df_normalized)
     df_tagged = auto_tag_key_pass_and_assist(df_with_seconds)
-    df_analyzed = analyze_pass_data(df_tagged)
-    df_analyzed_with_xg = add_xg_to_data(df_analyzed)
-    return df_analyzed_with_xg
+    df_possessions = assign_possessions(df_tagged)
+    df_analyzed = analyze_pass_data(df_possessions)
+    df_zoned = add_zone_index(df_analyzed)
+    df_analyzed_with_xg = add_xg_to_data(df_zoned)
+    return mark_analyzed(df_analyzed_with_xg)
+
+def ensure_analyzed(df, analyze=None):
+    """
+    시각화 등에서 사용할 분석된 프레임을 반환합니다.
+    엑셀에서 읽은 프레임은 버전 표시(df.attrs)가 없으므로, 내보낸 Data 시트처럼 분석 컬럼이 모두 있으면
+    정규화만 하고 분석은 다시 하지 않습니다. 분석 표시가 있지만 유효하지 않은 프레임(필터/수정한 파생 프레임,
+    이전 분석 버전)은 분석 컬럼이 있어도 다시 분석합니다.
+    analyze: 분석이 필요할 때 사용할 함수 (기본값 perform_full_analysis, 예: pipeline.analyze_events)
+    """
+    if is_analyzed(df):
+        return df
+    if not was_analyzed(df) and all(col in df.columns for col in ANALYZED_COLUMNS):
+        return mark_analyzed(normalize_events(df))
+    return (analyze or perform_full_analysis)(df)
@@ -3,100 +3,35 @@ import io
 import re
 import pandas as pd
 import numpy as np
-from flask import Flask, request, send_file, render_template, jsonify
+from flask import Flask, Response, request, send_file, render_template, jsonify
 import analysis
-import matplotlib
-matplotlib.use('Agg') # Flask 서버 환경에서 GUI 백엔드 사용 방지
-import matplotlib.pyplot as plt
-from mplsoccer import Pitch
-import base64
-
-def fig_to_base64(fig):
-    img = io.BytesIO()
-    fig.savefig(img, format='png', bbox_inches='tight')
-    img.seek(0)
-    return base64.b64encode(img.getvalue()).decode('utf-8')
-
-def draw_pass_map_flask(df, p_id):
-    # Reference Image Style: Striped Grass
-    pitch = Pitch(pitch_type='custom', pitch_length=105, pitch_width=68, 
-                  pitch_color='grass', line_color='white', stripe=True)
-    fig, ax = pitch.draw(figsize=(10, 7))
-    
-    # 데이터 타입 통일
-    df['Player'] = df['Player'].astype(str).str.replace('.0', '', regex=False)
-    p_id = str(p_id).replace('.0', '')
-
-    plot_df = df[(df['Player'] == p_id) & (df['Action'].str.contains('Pass', case=False, na=False))]
-    
-    req_cols = ['StartX_adj', 'StartY_adj', 'EndX_adj', 'EndY_adj']
-    if not all(col in df.columns for col in req_cols):
-         return None
-
-    plot_df = plot_df.dropna(subset=req_cols)
-    
-    # Colors from Reference: Blue (Success), Red (Fail)
-    success_color = 'blue'
-    fail_color = 'red'
-    
-    for _, row in plot_df.iterrows():
-        tags = str(row['Tags']) if pd.notna(row['Tags']) else ''
-        is_success = 'Success' in tags
-        
-        color = success_color if is_success else fail_color
-        linestyle = '-' if is_success else '--' # Dashed for failure
-        alpha = 0.8
-        
-        # 1. 꼬리 (원형) - Rounded Tail: Remove border as requested
-        pitch.scatter(row['StartX_adj'], row['StartY_adj'], ax=ax, 
-                      color=color, edgecolors='none', s=60, alpha=alpha, zorder=2)
-                      
-        # 2. 화살표 (Arrow)
-        pitch.arrows(row['StartX_adj'], row['StartY_adj'], row['EndX_adj'], row['EndY_adj'], 
-                     color=color, ax=ax, width=2, headwidth=3, headlength=3, 
-                     linestyle=linestyle, alpha=alpha, zorder=1)
-    
-    # Remove Title and Legend as requested
-    # ax.set_title(f"Player {p_id} | Pass Map", fontsize=20, fontweight='bold', pad=15)
-    
-    base64_img = fig_to_base64(fig)
-    plt.close(fig)
-    return base64_img
-
-def draw_heatmap_flask(df, p_id):
-    # Match Pass Map Style: Striped Grass
-    pitch = Pitch(pitch_type='custom', pitch_length=105, pitch_width=68, 
-                  pitch_color='grass', line_color='white', stripe=True)
-    fig, ax = pitch.draw(figsize=(10, 7))
-    
-    # 데이터 타입 통일
-    df['Player'] = df['Player'].astype(str).str.replace('.0', '', regex=False)
-    p_id = str(p_id).replace('.0', '')
-
-    if 'StartX_adj' in df.columns and 'StartY_adj' in df.columns:
-        plot_df = df[df['Player'] == p_id].dropna(subset=['StartX_adj', 'StartY_adj'])
-        
-        if not plot_df.empty:
-            # thresh를 높여서 히트맵 범위를 좁게 조정 (0.05 -> 0.3)
-            # levels를 줄여서 더 명확한 경계 표시 (100 -> 50)
-            pitch.kdeplot(x=plot_df['StartX_adj'], y=plot_df['StartY_adj'], ax=ax, 
-                         fill=True, levels=50, thresh=0.3, cmap='hot', alpha=0.7)
-        else:
-            ax.text(52.5, 34, "No Data", ha='center', va='center', fontsize=20, color='white')
-            
-    # Remove Title as requested
-    # ax.set_title(f"Player {p_id} | Heatmap", fontsize=20, fontweight='bold', pad=15)
-    
-    base64_img = fig_to_base64(fig)
-    plt.close(fig)
-    return base64_img
+import schema
+import render_cache
+import xthreat
+import percentile_scoring
+import score_bootstrap
+import pipeline
+import live_log
+import similarity
+import splits
+import visual_data
+import datasets
+import event_index
+import journal
+import xg_model
+# 시각화 모듈(matplotlib/mplsoccer)은 무거우므로 시각화 라우트에서 처음 사용할 때 임포트합니다.
+# gunicorn.conf.py의 FPA_PRELOAD_VISUALIZATION=1 옵션으로 마스터에서 미리 로드할 수 있습니다.
 
 app = Flask(__name__, static_url_path='/static')
 
-# --- 상수 (기존 ui.py에서 가져옴) ---
-ACTION_CODES = { 'ddd': 'Goal', 'dd': 'Shot On Target', 'd': 'Shot', 'db': 'Blocked Shot', 'zz': 'Assist', 'z': 'Key Pass', 'cc': 'Cross', 'c': 'Cross', 'ss': 'Pass', 's': 'Pass', 'ee': 'Breakthrough', 'rr': 'Dribble', 'gp': 'Gain', 'm': 'Miss', 'aa': 'Tackle', 'q': 'Intercept', 'qq': 'Acquisition', 'w': 'Clear', 'ww': 'Cutout', 'qw': 'Block', 'v': 'Catching', 'vv': 'Punching', 'sv': 'Save', 'bb': 'Duel', 'b': 'Duel', 'f': 'Foul', 'ff': 'Be Fouled', 'o': 'Offside', 't': 'Touch', 'st': 'Sprint', 'tr': 'Throw-in' }
-TAG_CODES = { 'k': 'Key', 'a': 'Assist', 'h': 'Header', 'r': 'Aerial', 'w': 'Suffered', 'n': 'In-box', 'u': 'Out-box', 'p': 'Progressive', 'c': 'Counter Attack', 'sw': 'Switch', 'wf': 'Weak Foot', 'ft': 'First Time' }
-TWO_DOT_ACTION_CODES = {'s', 'c', 'r', 'e', 'z', 'tr'}
+def load_dataset(file_bytes, data_hash=None):
+    """
+    업로드된 파일의 분석 프레임. 처음 본 파일이면 읽고 분석해 datasets에 등록하고,
+    이후에는 어느 워커든 등록된 파일을 메모리 매핑해 재사용합니다.
+    """
+    data_hash = data_hash or render_cache.dataset_hash(file_bytes)
+    return datasets.decoded_frame(datasets.get_or_register(data_hash, lambda: analysis.ensure_analyzed(
+        pd.read_excel(io.BytesIO(file_bytes), sheet_name=0), analyze=pipeline.analyze_events)))
 
 def parse_logs_to_dataframe(logs, match_id, teamid_h, teamid_a):
     parsed_logs = []
@@ -125,6 +60,176 @@ def parse_logs_to_dataframe(logs, match_id, teamid_h, teamid_a):
     columns = ["No", "MatchID", "TeamID", "Half", "Team", "Direction", "Time", "Player", "Receiver", "Action", "StartX", "StartY", "EndX", "EndY", "Tags"]
     return pd.DataFrame(parsed_logs).reindex(columns=columns)
 
+def write_analysis_sheets(writer, df_analyzed_with_xg, timeline_window=analysis.DEFAULT_TIMELINE_WINDOW, scoring_mode=None,
+                          ci_resamples=0):
+    """
+    분석된 이벤트 데이터로 요약/점수 시트를 만들어 ExcelWriter에 기록합니다. (/export, /upload_analyze 공용)
+    scoring_mode: 'sigmoid'(고정 기준) 또는 'percentile'(누적된 경기 대비 백분위), 기본값은 FPA_SCORING_MODE
+    ci_resamples: 0보다 크면 이 횟수만큼 선수별 이벤트를 리샘플하여 Score_CI 시트(95% 부트스트랩 신뢰구간)를 추가
+    """
+    scoring_mode = scoring_mode or percentile_scoring.DEFAULT_SCORING_MODE
+    # xT: 저장된 모델에 없는 경기가 있을 때만 그리드를 다시 풀고, 이동 이벤트에 xT_Added 부여
+    xt_grid = xthreat.update_xt_model(df_analyzed_with_xg)
+    df_analyzed_with_xg = xthreat.add_xt_to_data(df_analyzed_with_xg, xt_grid)
+    # xG 보정용: 새 경기의 슈팅 특징/득점 여부를 누적
+    xg_model.record_shots(df_analyzed_with_xg)
+
+    df_analyzed_with_xg.to_excel(writer, sheet_name='Data', index=False)
+    analysis.create_tableau_pass_data(df_analyzed_with_xg).to_excel(writer, sheet_name='Tableau_Pass', index=False)
+    # 요약/점수는 단계별 메모이즈 파이프라인으로 계산 (입력 컬럼이 바뀐 단계만 다시 계산)
+    all_stats, summaries = pipeline.player_stats(df_analyzed_with_xg)
+    summaries['pass_summary'].to_excel(writer, sheet_name='Pass_Summary')
+    summaries['shooter_summary'].to_excel(writer, sheet_name='Shooting_Summary')
+    summaries['cross_summary'].to_excel(writer, sheet_name='Cross_Summary')
+    summaries['advanced_summary'].to_excel(writer, sheet_name='Advanced_Summary')
+    # 새 경기의 선수별 점수/Raw 벡터를 유사 선수 검색 인덱스에 추가
+    similarity.update_index(df_analyzed_with_xg)
+
+    # 이번 경기는 점수 방식과 관계없이 시즌 기준 분포에 반영하고,
+    # 백분위 모드에서만 각 Raw 점수를 기준 분포의 백분위로 변환
+    reference = percentile_scoring.update_reference(df_analyzed_with_xg)
+    if scoring_mode == 'percentile':
+        all_stats = percentile_scoring.apply_percentile_scores(all_stats, reference)
+    else:
+        reference = None
+
+    # Filter Score Columns
+    score_cols = [col for col in all_stats.columns if '_Score' in col]
+    final_stats_df = all_stats[score_cols].copy()
+
+    if not final_stats_df.empty:
+        final_stats_df = final_stats_df.fillna(0).astype(int)
+        final_stats_df.index.name = 'Player'
+        final_stats_df.to_excel(writer, sheet_name='Final_Stats')
+
+        if ci_resamples > 0:
+            score_bootstrap.bootstrap_score_intervals(df_analyzed_with_xg, all_stats, ci_resamples,
+                                                      reference=reference).to_excel(writer, sheet_name='Score_CI')
+
+    # 팀 / 팀-전후반 / 선수-전후반 분할 요약 (한 번의 다중 키 groupby로 계산)
+    for sheet_name, split_df in splits.split_stats(df_analyzed_with_xg).items():
+        split_df.to_excel(writer, sheet_name=sheet_name)
+
+    # 구역 간 패스 매트릭스 (그리드 셀 번호 기준, 선수/팀)
+    analysis.create_zone_pass_matrix(df_analyzed_with_xg, by='Player').to_excel(writer, sheet_name='Zone_Matrix_Player', index=False)
+    analysis.create_zone_pass_matrix(df_analyzed_with_xg, by='TeamID').to_excel(writer, sheet_name='Zone_Matrix_Team', index=False)
+
+    # xT 요약 (선수별) 및 현재 xT 그리드
+    xthreat.create_xt_summary(df_analyzed_with_xg).to_excel(writer, sheet_name='xT_Summary')
+    xthreat.grid_to_frame(xt_grid).to_excel(writer, sheet_name='xT_Grid')
+
+    # 시간대별 타임라인 (전/후반, timeline_window분 구간)
+    player_timeline, team_timeline = analysis.create_timeline_summary(df_analyzed_with_xg, timeline_window)
+    player_timeline.to_excel(writer, sheet_name='Player_Timeline')
+    team_timeline.to_excel(writer, sheet_name='Team_Timeline')
+
+    # 점유별 요약
+    analysis.create_possession_summary(df_analyzed_with_xg).to_excel(writer, sheet_name='Possession_Summary')
+
+    # 패스 네트워크 (패서 -> 리시버, 선수 평균 위치)
+    network_edges, network_nodes = analysis.create_pass_network(df_analyzed_with_xg)
+    network_edges.to_excel(writer, sheet_name='Pass_Network', index=False)
+    network_nodes.to_excel(writer, sheet_name='Pass_Network_Nodes', index=False)
+
+def _ci_resamples(score_ci, resamples):
+    # score_ci가 켜져 있으면 리샘플 횟수(기본 score_bootstrap.DEFAULT_RESAMPLES), 아니면 0
+    if str(score_ci).lower() not in ('1', 'true', 'on', 'yes'):
+        return 0
+    return int(resamples or score_bootstrap.DEFAULT_RESAMPLES)
+
+def _timeline_window(value):
+    # 타임라인 구간(분): 비어 있으면 기본값, 숫자가 아니거나 0 이하이면 ValueError
+    if value is None or str(value).strip() == '':
+        return analysis.DEFAULT_TIMELINE_WINDOW
+    try:
+        window = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("timeline_window는 숫자여야 합니다.")
+    if not np.isfinite(window) or window <= 0:
+        raise ValueError("timeline_window는 0보다 커야 합니다.")
+    return window
+
+def _scoring_mode(value):
+    # 점수 모드: 비어 있으면 None(기본값 FPA_SCORING_MODE), percentile_scoring.SCORING_MODES가 아니면 ValueError
+    if value is None or str(value).strip() == '':
+        return None
+    if value not in percentile_scoring.SCORING_MODES:
+        raise ValueError(f"scoring_mode는 {', '.join(percentile_scoring.SCORING_MODES)} 중 하나여야 합니다.")
+    return value
+
+@app.route('/similar_players', methods=['POST'])
+def similar_players():
+    # 본문: {"match_id", "player_id", "k"(기본 10, 최대 similarity.MAX_K), "features": scores|raw|all, "exclude_same_player"}
+    data = request.get_json(silent=True) or {}
+    k = data.get('k')
+    try:
+        neighbors = similarity.find_similar(data.get('match_id', ''), schema.player_id(data.get('player_id')),
+                                            k=similarity.DEFAULT_K if k in (None, '') else int(k),
+                                            features=data.get('features') or 'all',
+                                            exclude_same_player=bool(data.get('exclude_same_player')))
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"neighbors": neighbors.to_dict(orient='records')})
+
+# xG 모델: 활성 모델/저장된 버전 조회, 누적 슈팅으로 보정, 버전 지정 (0 = 기본 공식)
+@app.route('/xg_model', methods=['GET'])
+def get_xg_model():
+    return jsonify({"active": xg_model.model_info(xg_model.active_model()),
+                    "versions": [xg_model.model_info(model) for model in xg_model.list_versions()],
+                    "recorded_shots": int(len(xg_model.load_shots()['goals']))})
+
+@app.route('/xg_model/calibrate', methods=['POST'])
+def calibrate_xg_model():
+    # 본문: {"folds"(기본 5), "min_shots", "activate"(기본 true)}
+    data = request.get_json(silent=True) or {}
+    try:
+        model = xg_model.calibrate(folds=int(data.get('folds') or xg_model.DEFAULT_FOLDS),
+                                   min_shots=int(data.get('min_shots') or xg_model.MIN_SHOTS),
+                                   activate_model=data.get('activate', True) is not False)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(xg_model.model_info(model))
+
+@app.route('/xg_model/activate', methods=['POST'])
+def activate_xg_model():
+    data = request.get_json(silent=True) or {}
+    try:
+        model = xg_model.activate(data.get('version', 0))
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(xg_model.model_info(model))
+
+@app.route('/split_summary', methods=['POST'])
+def split_summary():
+    # 엑셀 업로드(file, Data 시트) 또는 /export와 같은 JSON 로그 본문
+    # by: 분할 키 (예: 'TeamID,Half'), 없으면 splits.DEFAULT_SPLITS 전체
+    try:
+        if 'file' in request.files:
+            by = request.form.get('by')
+            df = pd.read_excel(request.files['file'], sheet_name='Data')
+            df_analyzed = analysis.ensure_analyzed(df, analyze=pipeline.analyze_events)
+        else:
+            data = request.get_json(silent=True) or {}
+            by = data.get('by')
+            if not data.get('logs'):
+                return jsonify({"error": "No logs to process"}), 400
+            df = parse_logs_to_dataframe(data['logs'], data.get('match_id', ''), data.get('teamid_h', ''), data.get('teamid_a', ''))
+            df_analyzed = pipeline.analyze_events(df)
+        split_keys = {'_'.join(splits.parse_split_keys(by)): by} if by else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        results = splits.split_stats(df_analyzed, split_keys)
+        return jsonify({"splits": {name: split_df.reset_index().to_dict(orient='records')
+                                   for name, split_df in results.items()}})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -132,98 +237,58 @@ def index():
 @app.route('/generate_log', methods=['POST'])
 def generate_log():
     data = request.get_json()
-    stat_input = data.get('stat_input', '').lower()
-    dots = data.get('dots', [])
-    half, team, direction, timeline = data.get('half'), data.get('team'), data.get('direction'), data.get('timeline')
-
+    result = live_log.translate_item(data)
+    if 'error' in result:
+        return jsonify(result), 400
+    # match_id가 있으면 경기 저널에 기록 (워커 재시작/새로고침 후 /journal로 복원)
+    if data.get('match_id'):
+        try:
+            result['records'] = journal.append_logs(data['match_id'], [result])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+# 여러 입력을 한 번에 변환 (종이 기록 재입력, 녹화된 세션 재생 등)
+# 본문: {"items": [{stat_input, dots, half, team, direction, timeline}, ...], half/team/direction/timeline(공통값, 선택)}
+@app.route('/generate_log_batch', methods=['POST'])
+def generate_log_batch():
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list):
+        return jsonify({"error": "items 배열이 필요합니다."}), 400
+    if len(items) > live_log.BATCH_MAX_ITEMS:
+        return jsonify({"error": f"한 번에 최대 {live_log.BATCH_MAX_ITEMS}개까지 변환할 수 있습니다."}), 413
+
+    defaults = {key: data[key] for key in ('half', 'team', 'direction', 'timeline') if key in data}
+    results = live_log.translate_items(items, defaults)
+    n_errors = sum('error' in result for result in results)
+    response = {"results": results, "ok": len(results) - n_errors, "errors": n_errors}
+    if data.get('match_id'):
+        # 성공한 항목만 한 번의 쓰기로 저널에 추가
+        try:
+            response['records'] = journal.append_logs(data['match_id'], results)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    return jsonify(response)
+
+# 경기 저널: 현재 로그 목록 복원 / 마지막 이벤트 삭제
+@app.route('/journal', methods=['GET', 'POST'])
+def journal_session():
+    data = request.get_json(silent=True) or {}
+    match_id = request.args.get('match_id') or data.get('match_id', '')
     try:
-        parts = stat_input.split('.', 1)
-        base_action_part = parts[0]
-        tag_codes = parts[1].split('.') if len(parts) > 1 else []
-
-        # [수정] 숫자만 입력된 경우 'Touch'로 간주
-        if base_action_part.isdigit():
-            player_from = base_action_part
-            action_code_raw = 't'
-            player_to = ''
-        else:
-            match = re.match(r"(\d+)([a-z]+)(\d*)", base_action_part)
-            if not match: raise ValueError("기본 입력 형식 오류")
-
-            player_from, action_code_raw, player_to = match.groups()
-        player_to = player_to if player_to else ''
-        
-        base_action_code = action_code_raw[0]
-        action_name = ACTION_CODES.get(action_code_raw) or ACTION_CODES.get(base_action_code)
-        if not action_name: raise ValueError("알 수 없는 액션 코드")
-
-        # [수정] 패스, 크로스, 키패스/어시스트, 스로인은 반드시 받는 선수(player_to)가 있어야 함
-        # 'sv'(세이브)는 's'로 시작하지만 단독 액션이므로 예외 처리
-        if (base_action_code in ['s', 'c', 'z'] or action_code_raw == 'tr') and action_code_raw != 'sv' and not player_to:
-            raise ValueError(f"'{action_name}' 액션은 받는 선수 번호가 필요합니다. (예: 10{action_code_raw}8)")
-
-        tags_list = [TAG_CODES[tc] for tc in tag_codes if tc in TAG_CODES]
-        
-        # Success/Fail 태그 자동 추가
-        # keypass(z), gain(gp), clear(w), block(qw), catching(v), punching(vv), save(sv) 등은 Success로 처리
-        if action_code_raw in ['z', 'gp', 'w', 'qw', 'v', 'vv', 'sv', 'dd', 'ddd']:
-             tags_list.append('Success')
-        elif action_code_raw in ['d', 'db']:
-             tags_list.append('Fail')
-        elif action_code_raw not in ['t', 'm', 'q', 'p', 'l', 'qq', 'bl', 'o', 'st']:
-             if len(action_code_raw) > 1 and action_code_raw[0] == action_code_raw[1]:
-                 tags_list.append('Success')
-             else:
-                 tags_list.append('Fail')
-
-        # 'sv'는 s로 시작하지만 좌표 1개만 필요함
-        requires_two_dots = (base_action_code in TWO_DOT_ACTION_CODES or action_code_raw in TWO_DOT_ACTION_CODES or player_to) and action_code_raw != 'sv'
-        if requires_two_dots:
-            if len(dots) < 2: raise ValueError("좌표 2개가 필요합니다.")
-            start_pos, end_pos = dots[-2], dots[-1]
-            start_x, start_y = float(start_pos['meter_x']), float(start_pos['meter_y'])
-            end_x, end_y = float(end_pos['meter_x']), float(end_pos['meter_y'])
-            
-            # Progressive 태그
-            is_left_direction = direction == 'left'
-            start_x_adj = 105 - start_x if is_left_direction else start_x
-            end_x_adj = 105 - end_x if is_left_direction else end_x
-            if analysis.is_progressive_pass(start_x_adj, end_x_adj):
-                if 'Progressive' not in tags_list: tags_list.append('Progressive')
-
-            action_str = f"{player_from} {action_name}"
-            if player_to: action_str += f" to {player_to}"
-            log_text = f"{half} | {team} | {direction} | {timeline} | Pos({start_x}, {start_y}) | {action_str} | Pos({end_x}, {end_y})"
-        else: # 좌표 1개
-            start_pos = dots[-1]
-            start_x, start_y = float(start_pos['meter_x']), float(start_pos['meter_y'])
-            log_text = f"{half} | {team} | {direction} | {timeline} | Pos({start_x}, {start_y}) | {player_from} {action_name}"
-
-        # In-box/Out-box 태그
-        if analysis.is_in_penalty_area(start_x, start_y):
-            if 'In-box' not in tags_list: tags_list.append('In-box')
-        elif action_name in ['Goal', 'Shot On Target', 'Shot', 'Blocked Shot']:
-             if 'Out-box' not in tags_list: tags_list.append('Out-box')
-
-        if tags_list:
-            log_text += f" | Tags: {', '.join(sorted(list(set(tags_list))))}"
-        
-        # UI 표 출력을 위한 구조화된 데이터 생성
-        coord_str = f"Pos({start_x}, {start_y})"
-        log_data = {
-            "Time": timeline,
-            "Team": team,
-            "Player": player_from,
-            "Action": action_name,
-            "Receiver": player_to,
-            "Coord": coord_str,
-            "Tags": ', '.join(sorted(list(set(tags_list)))) if tags_list else ''
-        }
-
-        return jsonify({"log_text": log_text, "log_data": log_data})
+        return jsonify({"match_id": match_id, **journal.load_session(match_id)})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    except Exception as e:
+@app.route('/journal/undo', methods=['POST'])
+def journal_undo():
+    data = request.get_json(silent=True) or {}
+    try:
+        records = journal.undo(data.get('match_id', ''))
+    except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    return jsonify({"records": records})
 
 @app.route('/export', methods=['POST'])
 def export_data():
@@ -232,6 +297,18 @@ def export_data():
     match_id = data.get('match_id', '')
     teamid_h = data.get('teamid_h', '')
     teamid_a = data.get('teamid_a', '')
+    ci_resamples = _ci_resamples(data.get('score_ci'), data.get('ci_resamples'))
+    try:
+        timeline_window = _timeline_window(data.get('timeline_window'))
+        scoring_mode = _scoring_mode(data.get('scoring_mode'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if data.get('journal'):
+        # 브라우저의 로그 대신 서버 저널의 로그로 내보내기
+        try:
+            logs = journal.load_session(match_id)['logs']
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
     if not logs:
         return jsonify({"error": "No logs to process"}), 400
@@ -240,47 +317,12 @@ def export_data():
         df = parse_logs_to_dataframe(logs, match_id, teamid_h, teamid_a)
         
         # --- analysis.py의 통합 분석 파이프라인 실행 ---
-        df_analyzed_with_xg = analysis.perform_full_analysis(df)
+        df_analyzed_with_xg = pipeline.analyze_events(df)
 
         # --- 메모리 내에서 엑셀 파일 생성 ---
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df_analyzed_with_xg.to_excel(writer, sheet_name='Data', index=False)
-            analysis.create_tableau_pass_data(df_analyzed_with_xg).to_excel(writer, sheet_name='Tableau_Pass', index=False)
-            pass_summary = analysis.create_player_summary(df_analyzed_with_xg)
-            shooter_summary = analysis.create_shooter_summary(df_analyzed_with_xg)
-            cross_summary = analysis.create_cross_summary(df_analyzed_with_xg)
-            advanced_summary = analysis.create_advanced_summary(df_analyzed_with_xg)
-            pass_summary.to_excel(writer, sheet_name='Pass_Summary')
-            shooter_summary.to_excel(writer, sheet_name='Shooting_Summary')
-            cross_summary.to_excel(writer, sheet_name='Cross_Summary')
-            advanced_summary.to_excel(writer, sheet_name='Advanced_Summary')
-            final_stats_df = pd.DataFrame(index=df_analyzed_with_xg['Player'].unique())
-            
-            # Merge all summaries for unified scoring
-            all_stats = final_stats_df.join([pass_summary, shooter_summary, cross_summary, advanced_summary], how='outer').fillna(0)
-            
-            # Calculate Scores
-            all_stats = analysis.calculate_passing_score(all_stats, all_stats)
-            all_stats = analysis.calculate_buildup_score(all_stats)
-            all_stats = analysis.calculate_shooting_score(all_stats)
-            all_stats = analysis.calculate_save_score(all_stats)
-            all_stats = analysis.calculate_cross_score(all_stats)
-            all_stats = analysis.calculate_dribbling_score(all_stats)
-            all_stats = analysis.calculate_drive_score(all_stats)
-            all_stats = analysis.calculate_tackling_score(all_stats)
-            all_stats = analysis.calculate_header_score(all_stats)
-            all_stats = analysis.calculate_pace_score(all_stats)
-            all_stats = analysis.calculate_advanced_scores(all_stats, all_stats)
-
-            # Filter Score Columns
-            score_cols = [col for col in all_stats.columns if '_Score' in col]
-            final_stats_df = all_stats[score_cols].copy()
-            
-            if not final_stats_df.empty:
-                final_stats_df = final_stats_df.fillna(0).astype(int)
-                final_stats_df.index.name = 'Player'
-                final_stats_df.to_excel(writer, sheet_name='Final_Stats')
+            write_analysis_sheets(writer, df_analyzed_with_xg, timeline_window, scoring_mode, ci_resamples)
         
         output.seek(0)
         
@@ -304,50 +346,21 @@ def upload_and_analyze():
 
     if file and file.filename.endswith('.xlsx'):
         try:
+            timeline_window = _timeline_window(request.form.get('timeline_window'))
+            scoring_mode = _scoring_mode(request.form.get('scoring_mode'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            ci_resamples = _ci_resamples(request.form.get('score_ci'), request.form.get('ci_resamples', type=int))
             df = pd.read_excel(file, sheet_name='Data')
             
-            # --- analysis.py의 통합 분석 파이프라인 실행 ---
-            df_analyzed_with_xg = analysis.perform_full_analysis(df)
+            # --- analysis.py의 통합 분석 파이프라인 실행 (이미 분석된 Data 시트는 정규화만) ---
+            df_analyzed_with_xg = analysis.ensure_analyzed(df, analyze=pipeline.analyze_events)
 
             # --- 메모리 내에서 엑셀 파일 생성 ---
             output = io.BytesIO()
             with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df_analyzed_with_xg.to_excel(writer, sheet_name='Data', index=False)
-                analysis.create_tableau_pass_data(df_analyzed_with_xg).to_excel(writer, sheet_name='Tableau_Pass', index=False)
-                pass_summary = analysis.create_player_summary(df_analyzed_with_xg)
-                shooter_summary = analysis.create_shooter_summary(df_analyzed_with_xg)
-                cross_summary = analysis.create_cross_summary(df_analyzed_with_xg)
-                advanced_summary = analysis.create_advanced_summary(df_analyzed_with_xg)
-                pass_summary.to_excel(writer, sheet_name='Pass_Summary')
-                shooter_summary.to_excel(writer, sheet_name='Shooting_Summary')
-                cross_summary.to_excel(writer, sheet_name='Cross_Summary')
-                advanced_summary.to_excel(writer, sheet_name='Advanced_Summary')
-                final_stats_df = pd.DataFrame(index=df_analyzed_with_xg['Player'].unique())
-                
-                # Merge all summaries for unified scoring
-                all_stats = final_stats_df.join([pass_summary, shooter_summary, cross_summary, advanced_summary], how='outer').fillna(0)
-                
-                # Calculate Scores
-                all_stats = analysis.calculate_passing_score(all_stats, all_stats)
-                all_stats = analysis.calculate_buildup_score(all_stats)
-                all_stats = analysis.calculate_shooting_score(all_stats)
-                all_stats = analysis.calculate_save_score(all_stats)
-                all_stats = analysis.calculate_cross_score(all_stats)
-                all_stats = analysis.calculate_dribbling_score(all_stats)
-                all_stats = analysis.calculate_drive_score(all_stats)
-                all_stats = analysis.calculate_tackling_score(all_stats)
-                all_stats = analysis.calculate_header_score(all_stats)
-                all_stats = analysis.calculate_pace_score(all_stats)
-                all_stats = analysis.calculate_advanced_scores(all_stats, all_stats)
-
-                # Filter Score Columns
-                score_cols = [col for col in all_stats.columns if '_Score' in col]
-                final_stats_df = all_stats[score_cols].copy()
-
-                if not final_stats_df.empty:
-                    final_stats_df = final_stats_df.fillna(0).astype(int)
-                    final_stats_df.index.name = 'Player'
-                    final_stats_df.to_excel(writer, sheet_name='Final_Stats')
+                write_analysis_sheets(writer, df_analyzed_with_xg, timeline_window, scoring_mode, ci_resamples)
             
             output.seek(0)
             
@@ -372,7 +385,7 @@ def get_player_list():
     try:
         df = pd.read_excel(file, sheet_name=0)
         if 'Player' not in df.columns: return jsonify({"error": "Player 컬럼 없음"}), 400
-        players = sorted(df['Player'].dropna().astype(str).unique(), key=lambda x: float(x) if x.replace('.','',1).isdigit() else 999)
+        players = sorted({p for p in schema.player_keys(df['Player']) if p}, key=lambda x: float(x) if x.replace('.','',1).isdigit() else 999)
         return jsonify({"players": players})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -383,26 +396,165 @@ def upload_analyze_visualize():
     if 'file' not in request.files: return jsonify({"error": "파일 없음"}), 400
     file = request.files['file']
     player_id = request.form.get('player_id', '')
+    # vis_types: 일부만 필요할 때 (예: 패스맵/히트맵은 브라우저에서 그리고 'pass_network'만 요청)
+    vis_types = set(request.form.get('vis_types', 'pass_map,heatmap,pass_network').split(','))
 
     try:
-        df = pd.read_excel(file, sheet_name=0)
-        
-        # 분석 파이프라인 (필요시)
-        required_cols = ['StartX_adj', 'StartY_adj', 'EndX_adj', 'EndY_adj']
-        if not all(col in df.columns for col in required_cols):
-             df = analysis.perform_full_analysis(df)
-        
-        # 시각화 이미지만 생성
-        pass_map = draw_pass_map_flask(df.copy(), player_id)
-        heatmap = draw_heatmap_flask(df.copy(), player_id)
-        
+        import visualization
+        file_bytes = file.read()
+        data_hash = render_cache.dataset_hash(file_bytes)
+        loaded = {}
+
+        def load_df():
+            # 캐시 미스가 있을 때만 엑셀을 읽고 분석 (두 이미지가 한 번만 공유)
+            if 'df' not in loaded:
+                # 등록된 데이터셋이면 메모리 매핑, 아니면 분석 파이프라인 (필요시) + 표준 스키마 정규화 후 등록
+                loaded['df'] = load_dataset(file_bytes, data_hash)
+            return loaded['df']
+
+        # 시각화 이미지만 생성 (동일 데이터셋/선수 재요청은 렌더 캐시에서 반환)
+        pass_map = heatmap = pass_network = None
+        if 'pass_map' in vis_types:
+            pass_map = render_cache.get_or_render(data_hash, player_id, 'pass_map',
+                                                  lambda: visualization.draw_pass_map_flask(load_df(), player_id))
+        if 'heatmap' in vis_types:
+            heatmap = render_cache.get_or_render(data_hash, player_id, 'heatmap',
+                                                 lambda: visualization.draw_heatmap_flask(load_df(), player_id))
+
+        # 선택한 선수가 속한 팀의 패스 네트워크 (팀 단위로 캐시해 같은 팀 선수들이 이미지를 공유)
+        if 'pass_network' in vis_types:
+            df = load_df()
+            pid = schema.player_id(player_id)
+            teams = df.loc[(df['Player'] == pid) | (df['Receiver'] == pid), 'TeamID'].dropna().astype(str).unique()
+            if len(teams):
+                team_id = min(teams)
+
+                def render_pass_network():
+                    edges, nodes = analysis.create_pass_network(load_df())
+                    return visualization.draw_pass_network_flask(edges, nodes, team_id)
+
+                pass_network = render_cache.get_or_render(data_hash, f'team:{team_id}', 'pass_network', render_pass_network)
+
         return jsonify({
             "pass_map": pass_map,
-            "heatmap": heatmap
+            "heatmap": heatmap,
+            "pass_network": pass_network
+        })
+
+    except Exception as e:
+        app.logger.exception("시각화 생성 실패")
+        return jsonify({"error": str(e)}), 500
+
+# [신규 기능] 2-1. 브라우저 렌더링용 시각화 데이터 (전체 선수 패스/히트맵 데이터, 이미지 렌더링 없음)
+@app.route('/visual_data', methods=['POST'])
+def get_visual_data():
+    if 'file' not in request.files: return jsonify({"error": "파일 없음"}), 400
+    out_format = request.form.get('format', 'binary').lower()
+    if out_format not in ('json', 'binary'): return jsonify({"error": "format은 json 또는 binary"}), 400
+    file_bytes = request.files['file'].read()
+
+    try:
+        key = render_cache.make_key(render_cache.dataset_hash(file_bytes), '', 'visual_data',
+                                    {'version': visual_data.VISUAL_DATA_VERSION, 'format': out_format})
+        payload = render_cache.get(key)
+        if payload is None:
+            data = visual_data.build_visual_data(load_dataset(file_bytes))
+            payload = visual_data.encode_binary(data) if out_format == 'binary' else visual_data.encode_json(data).encode('ascii')
+            render_cache.put(key, payload)
+        mimetype = 'application/octet-stream' if out_format == 'binary' else 'application/json'
+        return Response(payload, mimetype=mimetype)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# [신규 기능] 2-2. 데이터셋 등록 및 이벤트 조회
+@app.route('/datasets', methods=['POST'])
+def register_dataset():
+    # 업로드한 파일을 분석해 등록하고 dataset_id(파일 내용 해시)를 반환 (같은 파일은 다시 분석하지 않음)
+    if 'file' not in request.files: return jsonify({"error": "파일 없음"}), 400
+    file_bytes = request.files['file'].read()
+    dataset_id = render_cache.dataset_hash(file_bytes)
+    try:
+        index = datasets.get_or_register(dataset_id, lambda: analysis.ensure_analyzed(
+            pd.read_excel(io.BytesIO(file_bytes), sheet_name=0), analyze=pipeline.analyze_events))
+        return jsonify({
+            "dataset_id": dataset_id,
+            "events": index['n'],
+            "players": sorted(p for p in index['player'] if p),
+            "actions": sorted(index['action']),
+            "tags": sorted(index['tag']),
+            "zones": list(event_index.ZONES),
         })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/query_events', methods=['POST'])
+def query_events():
+    # 본문: {"dataset_id", "player", "team", "action", "half", "match", "tags", "exclude_tags", "zone", "end_zone",
+    #        "time_from", "time_to", "page", "page_size"} (값 필터는 값 하나 또는 리스트)
+    data = request.get_json(silent=True) or {}
+    try:
+        index = datasets.get_index(data.get('dataset_id', ''))
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    try:
+        page = int(data.get('page') or 1)
+        page_size = int(data.get('page_size') or event_index.DEFAULT_PAGE_SIZE)
+        total, events = event_index.query_events(index, data, page, page_size)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    events = events.astype(object).where(events.notna(), None)
+    return jsonify({"total": total, "page": page, "page_size": min(max(page_size, 1), event_index.MAX_PAGE_SIZE),
+                    "events": events.to_dict(orient='records')})
+
+# [신규 기능] 3. 전체 선수 일괄 시각화 (프로세스 풀)
+@app.route('/batch_visualize', methods=['POST'])
+def batch_visualize():
+    if 'file' not in request.files: return jsonify({"error": "파일 없음"}), 400
+    file = request.files['file']
+    out_format = request.form.get('format', 'zip').lower()
+    if out_format not in ('zip', 'pdf'): return jsonify({"error": "format은 zip 또는 pdf"}), 400
+    player_ids = [schema.player_id(p) for p in request.form.get('player_ids', '').split(',') if p.strip()]
+    max_workers = request.form.get('workers', type=int)
+
+    try:
+        import visualization
+        file_bytes = file.read()
+        data_hash = render_cache.dataset_hash(file_bytes)
+        # 등록된 데이터셋이면 메모리 매핑, 아니면 분석 후 등록
+        df = load_dataset(file_bytes, data_hash)
+
+        if not player_ids:
+            player_ids = visualization.list_players(df)
+
+        # 캐시에 있는 이미지는 재사용하고, 없는 것만 풀에서 렌더링
+        images = {p_id: {} for p_id in player_ids}
+        jobs = []
+        for p_id in player_ids:
+            missing = []
+            for vis_type in visualization.VIS_TYPES:
+                cached = render_cache.get(render_cache.make_key(data_hash, p_id, vis_type))
+                if cached is not None:
+                    images[p_id][vis_type] = cached.decode('ascii')
+                else:
+                    missing.append(vis_type)
+            if missing:
+                jobs.append((p_id, missing))
+
+        rendered = visualization.render_players_batch(df, jobs, max_workers=max_workers)
+        for p_id, by_type in rendered.items():
+            for vis_type, image in by_type.items():
+                images[p_id][vis_type] = image
+                if image is not None:
+                    render_cache.put(render_cache.make_key(data_hash, p_id, vis_type), image.encode('ascii'))
+
+        if out_format == 'pdf':
+            return send_file(visualization.build_contact_sheet_pdf(images), as_attachment=True,
+                             download_name='player_visuals.pdf', mimetype='application/pdf')
+        return send_file(visualization.build_zip(images), as_attachment=True,
+                         download_name='player_visuals.zip', mimetype='application/zip')
 
     except Exception as e:
-        print(f"Error: {e}")
+        app.logger.exception("일괄 시각화 생성 실패")
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
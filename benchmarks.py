@@ -0,0 +1,532 @@
+"""
+성능 측정 스크립트.
+
+    python benchmarks.py startup [--repeat 5]
+    python benchmarks.py pass_network [--matches 380]
+    python benchmarks.py possessions [--matches 380]
+    python benchmarks.py xt [--matches 380]
+    python benchmarks.py pipeline [--events 20000]
+    python benchmarks.py generate_log [--events 1500]
+    python benchmarks.py chunked [--matches 76]
+    python benchmarks.py similarity [--rows 50000]
+    python benchmarks.py splits [--matches 4]
+    python benchmarks.py visual_data [--players 4]
+    python benchmarks.py query_events [--matches 100]
+    python benchmarks.py journal [--events 3000]
+    python benchmarks.py xg_fit [--shots 50000]
+    python benchmarks.py datasets [--workers 4]
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import subprocess
+import statistics
+
+
+def _memory_kb():
+    """
+    현재 프로세스의 RSS와 private(USS) 메모리(kB)를 반환합니다. (Linux /proc 기준)
+    """
+    rss = private = None
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        value = lambda name: int(fields[name].split()[0])
+        rss = value('Rss')
+        private = value('Private_Clean') + value('Private_Dirty')
+    except (OSError, KeyError, ValueError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss, private
+
+
+def _serve_generate_log(app_module):
+    # 워커가 라이브 경로(/generate_log) 요청 하나를 처리하는 상황을 재현
+    client = app_module.app.test_client()
+    client.post('/generate_log', json={
+        'stat_input': '10ss8', 'half': '1st', 'team': 'home', 'direction': 'right', 'timeline': '10:00',
+        'dots': [{'meter_x': 30, 'meter_y': 20}, {'meter_x': 50, 'meter_y': 30}],
+    })
+
+
+def _startup_probe(mode):
+    t0 = time.perf_counter()
+    if mode == 'preload':
+        # gunicorn.conf.py의 FPA_PRELOAD_VISUALIZATION=1과 동일한 순서: 마스터에서 임포트 -> freeze -> fork
+        gc.disable()
+        import app
+        import visualization  # noqa: F401
+        gc.freeze()
+        master_import = time.perf_counter() - t0
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            gc.enable()
+            t1 = time.perf_counter()
+            _serve_generate_log(app)
+            rss, private = _memory_kb()
+            result = {'import_s': time.perf_counter() - t1, 'master_import_s': master_import,
+                      'rss_kb': rss, 'private_kb': private}
+            os.write(write_fd, json.dumps(result).encode())
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as f:
+            payload = f.read()
+        os.waitpid(pid, 0)
+        print(payload)
+        return
+
+    import app
+    if mode == 'eager':
+        import visualization  # noqa: F401  (기존 app.py처럼 모듈 로드 시 플로팅 스택 임포트)
+    elapsed = time.perf_counter() - t0
+    _serve_generate_log(app)
+    rss, private = _memory_kb()
+    print(json.dumps({'import_s': elapsed, 'rss_kb': rss, 'private_kb': private}))
+
+
+def bench_startup(args):
+    modes = [
+        ('eager', '이전: 모듈 로드 시 플로팅 스택 임포트'),
+        ('lazy', '지연 임포트: /generate_log만 처리하는 워커'),
+        ('preload', '마스터 preload 후 fork된 워커'),
+    ]
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'mode':<8} {'import(s)':>10} {'RSS(MB)':>9} {'private(MB)':>12}  description")
+    for mode, description in modes:
+        runs = []
+        for _ in range(args.repeat):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '_startup_probe', mode],
+                                 cwd=here, capture_output=True, text=True, check=True)
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        def median(key):
+            values = [r[key] for r in runs if r.get(key) is not None]
+            return statistics.median(values) if values else float('nan')
+        print(f"{mode:<8} {median('import_s'):>10.3f} {median('rss_kb') / 1024:>9.1f} {median('private_kb') / 1024:>12.1f}  {description}")
+    print("* preload의 import(s)는 fork 이후 워커 준비 시간입니다. 마스터 임포트 시간은 한 번만 발생합니다.")
+
+
+def _timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def bench_pass_network(args):
+    import analysis
+    from synthetic_data import synthetic_events
+    df = synthetic_events(args.matches, args.events)
+    elapsed, (edges, nodes) = _timed(lambda: analysis.create_pass_network(df), args.repeat)
+    print(f"events={len(df):,} nodes={len(nodes):,} edges={len(edges):,} create_pass_network: {elapsed * 1000:.1f} ms")
+
+
+def bench_possessions(args):
+    import analysis
+    from synthetic_data import synthetic_events
+    df = synthetic_events(args.matches, args.events)
+    assign_s, df = _timed(lambda: analysis.assign_possessions(df), args.repeat)
+    summary_s, summary = _timed(lambda: analysis.create_possession_summary(df), args.repeat)
+    print(f"events={len(df):,} possessions={len(summary):,} "
+          f"assign_possessions: {assign_s * 1000:.1f} ms, create_possession_summary: {summary_s * 1000:.1f} ms")
+
+
+def bench_xt(args):
+    import xthreat
+    from synthetic_data import synthetic_events
+    df = synthetic_events(args.matches, args.events)
+    count_s, counts = _timed(lambda: xthreat.count_transitions(df), args.repeat)
+    solve_s, (grid, iterations) = _timed(lambda: xthreat.solve_xt(*counts), args.repeat)
+    lookup_s, _ = _timed(lambda: xthreat.add_xt_to_data(df, grid), args.repeat)
+    print(f"events={len(df):,} grid={xthreat.XT_GRID_X}x{xthreat.XT_GRID_Y} count_transitions: {count_s * 1000:.1f} ms, "
+          f"solve_xt: {solve_s * 1000:.1f} ms ({iterations} iterations), add_xt_to_data: {lookup_s * 1000:.1f} ms")
+
+
+def bench_pipeline(args):
+    import analysis
+    import pipeline
+    from schema import EVENT_COLUMNS
+    from synthetic_data import synthetic_events
+    raw = synthetic_events(args.matches, args.events)[EVENT_COLUMNS]
+    pipeline.DISK_LIMIT_BYTES = 0
+    pipeline.clear_cache()
+
+    def run(df):
+        return pipeline.player_stats(pipeline.analyze_events(df))
+
+    full_s, _ = _timed(lambda: analysis.build_player_stats(analysis.perform_full_analysis(raw.copy())), args.repeat)
+    t0 = time.perf_counter()
+    run(raw)
+    cold_s = time.perf_counter() - t0
+    warm_s, _ = _timed(lambda: run(raw), args.repeat)
+    edited = raw.copy()
+    edited.loc[edited.index[0], 'Tags'] = 'Header'
+    t0 = time.perf_counter()
+    run(edited)
+    edit_s = time.perf_counter() - t0
+    print(f"events={len(raw):,} perform_full_analysis+build_player_stats: {full_s * 1000:.1f} ms, "
+          f"pipeline cold: {cold_s * 1000:.1f} ms, warm: {warm_s * 1000:.1f} ms, one Tags edit: {edit_s * 1000:.1f} ms")
+
+
+def bench_generate_log(args):
+    import app
+    import live_log
+    from loadtest import synthetic_log_requests
+    items = synthetic_log_requests(args.events)
+    client = app.app.test_client()
+
+    single_s, _ = _timed(lambda: [client.post('/generate_log', json=item) for item in items], args.repeat)
+    batch_s, response = _timed(lambda: client.post('/generate_log_batch', json={'items': items}), args.repeat)
+    translate_s, _ = _timed(lambda: live_log.translate_items(items), args.repeat)
+    print(f"items={len(items):,} errors={response.get_json()['errors']} "
+          f"/generate_log x{len(items)}: {single_s * 1000:.1f} ms ({len(items) / single_s:,.0f} items/s), "
+          f"/generate_log_batch: {batch_s * 1000:.1f} ms ({len(items) / batch_s:,.0f} items/s), "
+          f"translate_items: {translate_s * 1000:.1f} ms ({len(items) / translate_s:,.0f} items/s)")
+
+
+def bench_chunked(args):
+    import tempfile
+    import tracemalloc
+    import pandas as pd
+    import chunked
+    from synthetic_data import synthetic_events
+    df = synthetic_events(args.matches, args.events)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'events.csv')
+        df.to_csv(path, index=False)
+        del df
+        print(f"events={args.matches * args.events:,} file={os.path.getsize(path) / 1024 ** 2:.1f} MB")
+
+        def measure(label, func):
+            gc.collect()
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{label:<28} {elapsed * 1000:>9.1f} ms  peak {peak / 1024 ** 2:>8.1f} MB")
+
+        measure('read_csv (whole file)', lambda: pd.read_csv(path))
+        for chunksize in args.chunksizes:
+            measure(f'chunked chunksize={chunksize:,}', lambda: chunked.chunked_player_stats(path, chunksize, by='chunk'))
+
+
+def bench_similarity(args):
+    import tempfile
+    import numpy as np
+    import similarity
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'similarity_index.npz')
+        index = similarity._empty_index()
+        index['match_ids'] = np.repeat(np.arange(args.rows // 22 + 1).astype(str), 22)[:args.rows]
+        index['players'] = np.tile(np.arange(1, 23).astype(str), args.rows // 22 + 1)[:args.rows]
+        index['teams'] = np.char.add('T', (np.arange(args.rows) % 40).astype(str))
+        index['features'] = rng.normal(50, 15, (args.rows, len(similarity.FEATURE_COLUMNS)))
+        index['indexed_matches'] = np.unique(index['match_ids'])
+        similarity._save_index(similarity._normalize(index), path)
+
+        for label, tree_min_rows in [('kd-tree', 0), ('brute force', args.rows + 1)]:
+            similarity.TREE_MIN_ROWS = tree_min_rows
+            similarity._searchers.clear()
+            t0 = time.perf_counter()
+            similarity.find_similar('0', '1', k=args.k, path=path)
+            build_s = time.perf_counter() - t0
+            for features in similarity.FEATURE_SETS:
+                similarity.find_similar('0', '1', k=args.k, features=features, path=path)
+                query_s, _ = _timed(lambda: similarity.find_similar('1', '2', k=args.k, features=features, path=path), args.repeat)
+                print(f"rows={args.rows:,} {label:<12} features={features:<6} load+build: {build_s * 1000:.1f} ms, "
+                      f"query k={args.k}: {query_s * 1000:.2f} ms")
+
+
+def bench_splits(args):
+    import analysis
+    import splits
+    from synthetic_data import synthetic_events
+    df = synthetic_events(args.matches, args.events)
+
+    def per_slice():
+        # 기존 방식: 조각마다 프레임을 걸러 요약/점수 전체를 다시 계산
+        results = {}
+        for name, by in splits.DEFAULT_SPLITS.items():
+            frames = []
+            for _, part in df.groupby([key for key in by if key != 'Player']):
+                stats = analysis.build_player_stats(part.reset_index(drop=True))
+                frames.append(stats if 'Player' in by else stats.sum(numeric_only=True).to_frame().T)
+            results[name] = frames
+        return results
+
+    slice_s, _ = _timed(per_slice, args.repeat)
+    split_s, results = _timed(lambda: splits.split_stats(df), args.repeat)
+    rows = ', '.join(f"{name}={len(frame):,}" for name, frame in results.items())
+    print(f"events={len(df):,} ({rows})")
+    print(f"filter + build_player_stats per slice: {slice_s * 1000:.1f} ms, split_stats (one groupby): {split_s * 1000:.1f} ms "
+          f"({slice_s / split_s:.1f}x)")
+
+
+def bench_visual_data(args):
+    import analysis
+    import visual_data
+    import visualization
+    from synthetic_data import synthetic_events
+    df = analysis.ensure_analyzed(synthetic_events(1, args.events))
+    players = visual_data.build_visual_data(df)['meta']['players'][:args.players]
+
+    def render_images():
+        for p in players:
+            visualization.draw_pass_map_flask(df, p)
+            visualization.draw_heatmap_flask(df, p)
+
+    render_s, _ = _timed(render_images, 1)
+    build_s, data = _timed(lambda: visual_data.build_visual_data(df), args.repeat)
+    binary_s, payload = _timed(lambda: visual_data.encode_binary(data), args.repeat)
+    print(f"events={len(df):,} server PNG pass map + heatmap: {render_s / len(players) * 1000:.0f} ms/player")
+    print(f"visual_data for all {len(data['meta']['players'])} players: build {build_s * 1000:.1f} ms, "
+          f"encode {binary_s * 1000:.2f} ms, binary {len(payload) / 1024:.1f} KB, "
+          f"json {len(visual_data.encode_json(data)) / 1024:.1f} KB")
+
+
+def bench_query_events(args):
+    import numpy as np
+    import event_index
+    from synthetic_data import synthetic_events
+    df = synthetic_events(args.matches, args.events)
+    build_s, index = _timed(lambda: event_index.build_event_index(df), 1)
+    print(f"events={len(df):,} build index: {build_s * 1000:.1f} ms")
+    queries = {
+        'player+action+tags+zone+half': {'player': '7', 'action': 'Pass', 'exclude_tags': 'Success',
+                                         'zone': 'final_third', 'half': '2nd'},
+        'shots in time range': {'action': ['Goal', 'Shot On Target', 'Shot', 'Blocked Shot'],
+                                'time_from': '10:00', 'time_to': '15:00'},
+    }
+    tokens = df['Tags'].fillna('').astype(str)
+    boolean = {
+        'player+action+tags+zone+half': lambda: df[(df['Player'] == '7') & (df['Action'] == 'Pass')
+                                                   & ~tokens.str.contains('Success')
+                                                   & ((df['Start_Zone'] & event_index.ZONES['final_third']) != 0)
+                                                   & (df['Half'] == '2nd')],
+        'shots in time range': lambda: df[df['Action'].isin(['Goal', 'Shot On Target', 'Shot', 'Blocked Shot'])
+                                          & df['Time(s)'].between(600, 900)],
+    }
+    for name, filters in queries.items():
+        query_s, (total, _) = _timed(lambda: event_index.query_events(index, filters), args.repeat)
+        scan_s, _ = _timed(boolean[name], args.repeat)
+        print(f"{name:<30} matches={total:>6,}  indexed: {query_s * 1000:.2f} ms, pandas boolean scan: {scan_s * 1000:.2f} ms")
+
+
+def bench_journal(args):
+    import tempfile
+    import journal
+    import live_log
+    from loadtest import synthetic_log_requests
+    results = [r for r in live_log.translate_items(synthetic_log_requests(args.events)) if 'log_text' in r]
+    journal.JOURNAL_DIR = tempfile.mkdtemp(prefix='fpa_journal_')
+
+    def append_all(match_id, fsync_every):
+        journal.FSYNC_EVERY = fsync_every
+        for result in results:
+            journal.append_logs(match_id, [result])
+        journal.flush()
+
+    for label, fsync_every in [('fsync every event', 1), (f'fsync every {args.fsync_every}', args.fsync_every)]:
+        match_id = f'bench_{fsync_every}'
+        append_s, _ = _timed(lambda: append_all(match_id, fsync_every), 1)
+        print(f"events={len(results):,} append ({label}): {append_s / len(results) * 1000:.3f} ms/event")
+
+    path = journal.journal_path(match_id)
+    replay_s, session = _timed(lambda: journal.load_session(match_id), args.repeat)
+    os.remove(journal._snapshot_path(path))
+    full_s, _ = _timed(lambda: journal.load_session(match_id), args.repeat)
+    print(f"restore {len(session['logs']):,} logs: snapshot + tail {replay_s * 1000:.1f} ms, "
+          f"full journal replay {full_s * 1000:.1f} ms (journal {os.path.getsize(path) / 1024:.0f} KiB)")
+
+
+def bench_xg_fit(args):
+    import tempfile
+    import numpy as np
+    import xg_model
+    from synthetic_data import synthetic_shots
+    true_coef = np.array([-0.8, -0.15, 1.6, 0.5, -1.0, -0.5])
+    shots = synthetic_shots(args.shots, true_coef)
+    xg_model.MODEL_DIR = tempfile.mkdtemp(prefix='fpa_xg_')
+    xg_model.ACTIVE_PATH = os.path.join(xg_model.MODEL_DIR, 'xg_model.npz')
+
+    fit_s, (coef, iterations) = _timed(lambda: xg_model.fit_logistic(shots['features'], shots['goals']), args.repeat)
+    model = xg_model.calibrate(shots, folds=args.folds)
+    d = model['diagnostics']
+    print(f"shots={len(shots['goals']):,} goals={int(shots['goals'].sum()):,} IRLS fit: {fit_s * 1000:.1f} ms "
+          f"({iterations} iterations), {args.folds}-fold batched fit: {d['cv_fit_seconds'] * 1000:.1f} ms")
+    print("coef   " + " ".join(f"{name:>9}" for name in ['intercept'] + xg_model.FEATURES))
+    for label, values in [('true', true_coef), ('fitted', coef), ('default', xg_model.DEFAULT_COEF)]:
+        print(f"{label:<7}" + " ".join(f"{v:>9.3f}" for v in values))
+    for label in ['default', 'fitted', 'cross_validated']:
+        r = d[label]
+        print(f"{label:<16} log_loss={r['log_loss']:.4f} brier={r['brier']:.4f} ece={r['ece']:.4f} "
+              f"xG={r['total_xg']:,.0f} vs goals={r['goals']:,}")
+
+
+def _anonymous_kb():
+    # 파일에 매핑되지 않은 (워커마다 따로 쓰는) 메모리
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['Anonymous'].split()[0])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _dataset_probe(mode, path):
+    import pickle
+    import datasets
+    import event_index
+    before = _anonymous_kb()
+    t0 = time.perf_counter()
+    if mode == 'pickle':
+        # 이전 방식: 워커마다 pickle을 읽어 프레임과 인덱스를 따로 만듦
+        with open(path, 'rb') as f:
+            index = event_index.build_event_index(pickle.load(f))
+    else:
+        index = datasets.get_index(os.path.basename(path)[:-len(datasets.SUFFIX)])
+    load_s = time.perf_counter() - t0
+    total, _ = event_index.query_events(index, {'player': '7', 'action': 'Pass', 'zone': 'final_third'})
+    after = _anonymous_kb()
+    print(json.dumps({'load_s': load_s, 'private_kb': after - before if before is not None else None, 'total': total}))
+
+
+def bench_datasets(args):
+    import pickle
+    import tempfile
+    from synthetic_data import synthetic_events
+    data_dir = tempfile.mkdtemp(prefix='fpa_datasets_')
+    env = dict(os.environ, FPA_DATA_DIR=data_dir)
+    df = synthetic_events(args.matches, args.events)
+    pickle_path = os.path.join(data_dir, 'bench.pkl')
+    with open(pickle_path, 'wb') as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    # 등록은 FPA_DATA_DIR을 바꾼 하위 프로세스에서 (이 프로세스의 datasets.DATASET_DIR은 이미 정해져 있음)
+    subprocess.run([sys.executable, '-c', 'import sys, pickle, datasets; '
+                    'datasets.register("bench", pickle.load(open(sys.argv[1], "rb")))', pickle_path],
+                   cwd=os.path.dirname(os.path.abspath(__file__)), env=env, check=True)
+    fpad_path = os.path.join(data_dir, 'datasets', 'bench.fpad')
+    print(f"events={len(df):,} pickle: {os.path.getsize(pickle_path) / 1e6:.1f} MB, "
+          f".fpad (frame + index): {os.path.getsize(fpad_path) / 1e6:.1f} MB, {args.workers} concurrent workers")
+
+    for mode, path in [('pickle', pickle_path), ('mmap', fpad_path)]:
+        procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '_dataset_probe', mode, path],
+                                  cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                                  stdout=subprocess.PIPE, text=True) for _ in range(args.workers)]
+        runs = [json.loads(proc.communicate()[0].strip().splitlines()[-1]) for proc in procs]
+        load_ms = statistics.median(r['load_s'] for r in runs) * 1000
+        private_mb = [r['private_kb'] / 1024 for r in runs if r['private_kb'] is not None]
+        print(f"{mode:<7} open+index: {load_ms:8.1f} ms/worker, private memory: "
+              f"{statistics.median(private_mb) if private_mb else float('nan'):7.1f} MB/worker "
+              f"(total {sum(private_mb):.1f} MB), query matches={runs[0]['total']:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='FPA WebApp benchmarks')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('startup', help='워커 시작 시 임포트 시간과 메모리(RSS/private) 비교')
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser('pass_network', help='시즌 규모 데이터의 패스 네트워크 계산 시간')
+    p.add_argument('--matches', type=int, default=380)
+    p.add_argument('--events', type=int, default=1500)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(func=bench_pass_network)
+
+    p = sub.add_parser('possessions', help='시즌 규모 데이터의 점유 구분/집계 시간')
+    p.add_argument('--matches', type=int, default=380)
+    p.add_argument('--events', type=int, default=1500)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(func=bench_possessions)
+
+    p = sub.add_parser('xt', help='xT 전이 행렬 집계/값 반복/조회 시간')
+    p.add_argument('--matches', type=int, default=380)
+    p.add_argument('--events', type=int, default=1500)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(func=bench_xt)
+
+    p = sub.add_parser('pipeline', help='단계별 메모이즈 파이프라인: 첫 실행 / 재실행 / 이벤트 하나 수정 후 시간')
+    p.add_argument('--matches', type=int, default=1)
+    p.add_argument('--events', type=int, default=20000)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser('generate_log', help='입력 코드 변환: 요청당 1건 vs 일괄 변환 처리량')
+    p.add_argument('--events', type=int, default=1500)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(func=bench_generate_log)
+
+    p = sub.add_parser('chunked', help='청크 단위 요약: 청크 크기별 시간/최대 메모리 (tracemalloc)')
+    p.add_argument('--matches', type=int, default=76)
+    p.add_argument('--events', type=int, default=1500)
+    p.add_argument('--chunksizes', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    p.set_defaults(func=bench_chunked)
+
+    p = sub.add_parser('similarity', help='유사 선수 검색: KD-tree / 전체 탐색 k-NN 질의 시간')
+    p.add_argument('--rows', type=int, default=50_000)
+    p.add_argument('--k', type=int, default=10)
+    p.add_argument('--repeat', type=int, default=20)
+    p.set_defaults(func=bench_similarity)
+
+    p = sub.add_parser('splits', help='팀/전후반 분할 요약: 조각별 재계산 vs 다중 키 groupby 한 번')
+    p.add_argument('--matches', type=int, default=4)
+    p.add_argument('--events', type=int, default=1500)
+    p.add_argument('--repeat', type=int, default=1)
+    p.set_defaults(func=bench_splits)
+
+    p = sub.add_parser('visual_data', help='시각화: 서버 PNG 렌더링 vs 브라우저 렌더링용 데이터 계산/크기')
+    p.add_argument('--events', type=int, default=1500)
+    p.add_argument('--players', type=int, default=4)
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(func=bench_visual_data)
+
+    p = sub.add_parser('query_events', help='이벤트 조회: 비트맵/정렬 시간 인덱스 vs pandas 불리언 필터')
+    p.add_argument('--matches', type=int, default=100)
+    p.add_argument('--events', type=int, default=2000)
+    p.add_argument('--repeat', type=int, default=20)
+    p.set_defaults(func=bench_query_events)
+
+    p = sub.add_parser('journal', help='라이브 기록 저널: 이벤트당 추가 시간(fsync 모으기) / 복원 시간 (스냅샷 유무)')
+    p.add_argument('--events', type=int, default=3000)
+    p.add_argument('--fsync-every', type=int, default=32)
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(func=bench_journal)
+
+    p = sub.add_parser('xg_fit', help='xG 보정: IRLS 적합 시간, 교차검증 폴드 일괄 적합, 기본/보정 계수의 보정 지표')
+    p.add_argument('--shots', type=int, default=50000)
+    p.add_argument('--folds', type=int, default=5)
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(func=bench_xg_fit)
+
+    p = sub.add_parser('datasets', help='데이터셋 공유: 워커별 pickle 로드+인덱스 vs 메모리 매핑 파일 (열기 시간/private 메모리)')
+    p.add_argument('--matches', type=int, default=100)
+    p.add_argument('--events', type=int, default=2000)
+    p.add_argument('--workers', type=int, default=4)
+    p.set_defaults(func=bench_datasets)
+
+    p = sub.add_parser('_dataset_probe')
+    p.add_argument('mode', choices=['pickle', 'mmap'])
+    p.add_argument('path')
+    p.set_defaults(func=lambda a: _dataset_probe(a.mode, a.path))
+
+    p = sub.add_parser('_startup_probe')
+    p.add_argument('mode', choices=['eager', 'lazy', 'preload'])
+    p.set_defaults(func=lambda a: _startup_probe(a.mode))
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
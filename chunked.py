@@ -0,0 +1,189 @@
+"""
+청크 단위(out-of-core) 선수 요약/점수 계산.
+
+여러 시즌 아카이브처럼 한 번에 메모리에 올릴 수 없는 이벤트 데이터를 파티션(경기 또는 고정 크기 청크)으로
+읽어, 파티션마다 선수별 카운터 합계와 팀별 실점 합계(부분 집계)를 만들고 map-reduce 방식으로 병합한 뒤
+비율 컬럼(Pass_Success_Rate, Cross_Accuracy)과 점수를 계산합니다. 최대 메모리는 청크 크기(와 경기 하나)에 비례합니다.
+
+    python chunked.py season.parquet --chunksize 200000 -o final_stats.csv
+"""
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from schema import ANALYZED_COLUMNS, normalize_events
+from scoring import calculate_all_scores
+from summaries import build_summary_counters, summary_frame
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+
+# --- 파티션 읽기 ---
+def iter_event_chunks(source, chunksize=DEFAULT_CHUNK_ROWS):
+    """
+    source를 chunksize행 단위 DataFrame으로 읽습니다.
+    source: CSV/Parquet 파일 경로 또는 DataFrame의 iterable (예: 경기별 프레임)
+    Parquet는 pyarrow가 있어야 읽을 수 있습니다.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        yield from source
+        return
+    ext = os.path.splitext(os.fspath(source))[1].lower()
+    if ext == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet 파일을 읽으려면 pyarrow가 필요합니다. (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif ext in ('.csv', '.gz'):
+        yield from pd.read_csv(source, chunksize=chunksize)
+    else:
+        raise ValueError(f"지원하지 않는 파일 형식: {ext} (CSV 또는 Parquet)")
+
+
+def _match_ids(df):
+    return df['MatchID'].fillna('').astype(str) if 'MatchID' in df.columns else pd.Series('', index=df.index)
+
+
+def iter_match_partitions(chunks):
+    """
+    청크 경계에서 잘린 경기를 다음 청크와 이어 붙여, 경기 하나씩 반환합니다.
+    (파일이 경기(MatchID) 순으로 모여 있어야 함)
+    """
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        ids = _match_ids(chunk)
+        starts = np.flatnonzero(ids.ne(ids.shift()).to_numpy())
+        # 마지막 경기는 다음 청크에 이어질 수 있으므로 보류
+        for begin, end in zip(starts[:-1], starts[1:]):
+            yield chunk.iloc[begin:end]
+        carry = chunk.iloc[starts[-1]:] if len(starts) else None
+    if carry is not None and len(carry):
+        yield carry
+
+
+# --- 부분 집계 ---
+def partial_aggregates(df_analyzed):
+    """
+    분석된 파티션 하나의 부분 집계를 만듭니다.
+    - counters: 선수별 카운터 합계
+    - teams: (MatchID, TeamID)별 유효 슈팅 xG/득점 합계 (상대팀 실점 계산용)
+    - appearances: 파티션에 나온 (MatchID, Player, TeamID) 조합
+    """
+    normalize_events(df_analyzed)
+    counters = build_summary_counters(df_analyzed)
+    players = df_analyzed['Player'].to_numpy()
+    match_ids = _match_ids(df_analyzed).to_numpy()
+    team_ids = df_analyzed['TeamID'].fillna('').astype(str).to_numpy()
+
+    is_sot = df_analyzed['Action'].isin(['Goal', 'Shot On Target']).to_numpy()
+    xg = df_analyzed['xG'].fillna(0).to_numpy() if 'xG' in df_analyzed.columns else np.zeros(len(df_analyzed))
+    teams = pd.DataFrame({
+        'MatchID': match_ids, 'TeamID': team_ids,
+        'Team_SOT_xG': np.where(is_sot, xg, 0.0),
+        'Team_Goals': (df_analyzed['Action'] == 'Goal').to_numpy().astype(float),
+    }).groupby(['MatchID', 'TeamID']).sum()
+    appearances = pd.DataFrame({'MatchID': match_ids, 'Player': players, 'TeamID': team_ids}).drop_duplicates()
+    return {'counters': counters.groupby(players, sort=False).sum(), 'teams': teams, 'appearances': appearances}
+
+
+def merge_partials(left, right):
+    """
+    두 부분 집계를 합칩니다. (합계는 더하고, 출전 조합은 합집합)
+    """
+    if left is None:
+        return right
+    return {
+        'counters': left['counters'].add(right['counters'], fill_value=0),
+        'teams': left['teams'].add(right['teams'], fill_value=0),
+        'appearances': pd.concat([left['appearances'], right['appearances']]).drop_duplicates(),
+    }
+
+
+def _conceded(teams, appearances):
+    """
+    선수별 실점 지표: 출전한 경기마다 상대팀(같은 경기의 다른 팀)의 유효 슈팅 xG/득점을 합산합니다.
+    """
+    match_totals = teams.groupby(level='MatchID').sum()
+    own = teams.reindex(pd.MultiIndex.from_frame(appearances[['MatchID', 'TeamID']])).fillna(0).to_numpy()
+    opponent = match_totals.reindex(appearances['MatchID']).fillna(0).to_numpy() - own
+    conceded = pd.DataFrame(opponent, columns=['Total_SOT_xG_Conceded', 'Goals_Conceded'])
+    return conceded.groupby(appearances['Player'].to_numpy()).sum()
+
+
+def finalize_partials(partials):
+    """
+    병합된 부분 집계로 build_player_stats와 같은 선수별 요약/Raw/Score 프레임을 만듭니다.
+    """
+    counters = partials['counters'].copy()
+    conceded = _conceded(partials['teams'], partials['appearances'])
+    for col in conceded.columns:
+        counters[col] = conceded[col].reindex(counters.index).fillna(0)
+    return calculate_all_scores(summary_frame(counters).sort_index())
+
+
+def _analyzed_partitions(source, chunksize, by):
+    """
+    분석된 파티션을 차례로 반환합니다.
+    by='chunk': 이미 분석된 이벤트(내보낸 Data 시트 등)를 고정 크기 청크로 사용
+    by='match': 경기 단위로 모아 perform_full_analysis 실행 (키패스 태깅/점유 등은 경기 전체가 필요)
+    by=None   : 첫 청크에 분석 컬럼이 모두 있으면 'chunk', 아니면 'match'
+    """
+    chunks = iter_event_chunks(source, chunksize)
+    first = next(chunks, None)
+    if first is None:
+        return
+    if by is None:
+        by = 'chunk' if all(col in first.columns for col in ANALYZED_COLUMNS) else 'match'
+
+    def all_chunks():
+        yield first
+        yield from chunks
+
+    if by == 'chunk':
+        for chunk in all_chunks():
+            yield analysis.ensure_analyzed(chunk)
+    elif by == 'match':
+        for match_df in iter_match_partitions(all_chunks()):
+            yield analysis.ensure_analyzed(match_df.reset_index(drop=True))
+    else:
+        raise ValueError("by는 'chunk' 또는 'match' 입니다.")
+
+
+def chunked_player_stats(source, chunksize=DEFAULT_CHUNK_ROWS, by=None):
+    """
+    source를 파티션 단위로 읽어 선수별 요약/점수(build_player_stats와 같은 컬럼)를 계산합니다.
+    실점 지표는 경기별 상대팀 기준으로 합산합니다. (경기 하나인 데이터에서는 build_player_stats와 동일)
+    """
+    partials = None
+    for part in _analyzed_partitions(source, chunksize, by):
+        partials = merge_partials(partials, partial_aggregates(part))
+    if partials is None:
+        return pd.DataFrame()
+    return finalize_partials(partials)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='청크 단위 선수 요약/점수 계산')
+    parser.add_argument('source', help='이벤트 CSV 또는 Parquet 파일')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_ROWS, help='청크당 행 수')
+    parser.add_argument('--by', choices=['chunk', 'match'], help='파티션 단위 (기본: 분석 컬럼 유무로 자동 결정)')
+    parser.add_argument('-o', '--output', default='final_stats.csv', help='결과 파일 (.csv 또는 .xlsx)')
+    args = parser.parse_args(argv)
+
+    stats = chunked_player_stats(args.source, args.chunksize, args.by)
+    if args.output.lower().endswith('.xlsx'):
+        stats.to_excel(args.output, sheet_name='Final_Stats')
+    else:
+        stats.to_csv(args.output)
+    print(f"players={len(stats):,} -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
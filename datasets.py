@@ -0,0 +1,189 @@
+"""
+분석된 데이터셋 저장소.
+
+업로드된 파일을 분석한 프레임을 파일 내용 해시(dataset_id)로 등록해 두고, 이후 요청(이벤트 조회 등)은
+dataset_id만 보내 재사용합니다. 등록한 워커가 프레임과 조회 인덱스를 DATA_DIR/datasets/<id>.fpad에
+한 번 쓰고, 모든 워커는 그 파일을 메모리 매핑(np.memmap)해 복사 없이 읽습니다. 파일 페이지는 OS 페이지 캐시로
+공유되므로 워커를 늘려도 데이터셋 메모리는 늘지 않습니다.
+
+파일 형식 (storage.pack_arrays, 8바이트 정렬):
+- 숫자/불리언 컬럼: 원래 dtype 그대로
+- 그 외(문자열) 컬럼: 범주 코드(int8/16/32, 결측 -1) + 헤더의 범주 목록 -> 읽을 때 Categorical
+  (기존 분석/시각화 함수에는 decoded_frame으로 일반 문자열 컬럼으로 풀어서 전달)
+- 조회 인덱스(event_index.build_event_index): 시간 정렬 순서/정렬된 시간, 필터 값별 비트맵
+용량 한도(FPA_DATASET_DISK_MB)를 넘으면 오래 안 쓴 파일부터 지우며, 파일 열기/삭제는 datasets/evict.lock으로
+직렬화합니다. (이미 매핑한 워커는 파일이 지워져도 매핑을 닫을 때까지 그대로 읽을 수 있음)
+"""
+import os
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import event_index
+from storage import DATA_DIR, atomic_write_bytes, file_lock, pack_arrays, prune_directory, unpack_arrays
+
+DATASET_DIR = os.path.join(DATA_DIR, 'datasets')
+DISK_LIMIT_BYTES = int(os.environ.get('FPA_DATASET_DISK_MB', '512')) * 1024 * 1024
+MEMORY_ENTRIES = int(os.environ.get('FPA_DATASET_MEMORY_ENTRIES', '8'))
+DATASET_MAGIC = b'FPAD'
+DATASET_FORMAT_VERSION = 1
+SUFFIX = '.fpad'
+# 비트맵 딕셔너리를 가진 인덱스 항목
+BITMAP_FILTERS = list(event_index.VALUE_FILTERS) + ['tag', 'zone', 'end_zone']
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def _path(dataset_id):
+    return os.path.join(DATASET_DIR, os.path.basename(str(dataset_id)) + SUFFIX)
+
+
+def _evict_lock():
+    return file_lock(os.path.join(DATASET_DIR, 'evict'))
+
+
+def _remember(dataset_id, index):
+    with _lock:
+        _indexes[dataset_id] = index
+        _indexes.move_to_end(dataset_id)
+        while len(_indexes) > MEMORY_ENTRIES:
+            _indexes.popitem(last=False)
+
+
+# --- 직렬화 ---
+def _codes_dtype(n_categories):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def encode_dataset(index):
+    """
+    조회 인덱스(프레임 포함)를 .fpad 바이트로 변환합니다.
+    """
+    df = index['df']
+    arrays, columns = {}, []
+    for i, col in enumerate(df.columns):
+        name = f'c{i}'
+        values = df[col]
+        if values.dtype.kind in 'biuf':
+            arrays[name] = values.to_numpy()
+            columns.append({'name': col, 'array': name})
+        else:
+            codes, uniques = pd.factorize(values)
+            arrays[name] = codes.astype(_codes_dtype(len(uniques)))
+            columns.append({'name': col, 'array': name, 'categories': [str(v) for v in uniques]})
+    arrays['order'], arrays['times'] = index['order'], index['times']
+    bitmaps = {}
+    for filter_name in BITMAP_FILTERS:
+        bitmaps[filter_name] = {}
+        for value, words in index[filter_name].items():
+            name = f'b{len(arrays)}'
+            arrays[name] = words
+            bitmaps[filter_name][value] = name
+    meta = {'version': DATASET_FORMAT_VERSION, 'rows': int(index['n']), 'attrs': df.attrs,
+            'columns': columns, 'bitmaps': bitmaps}
+    return pack_arrays(DATASET_MAGIC, json.loads(json.dumps(meta, default=str)), arrays)
+
+
+def decode_dataset(buffer):
+    """
+    .fpad 버퍼(np.memmap 또는 bytes)에서 조회 인덱스를 복원합니다. 숫자 컬럼/코드/인덱스 배열은 버퍼를 그대로 가리킵니다.
+    """
+    meta, arrays = unpack_arrays(buffer, DATASET_MAGIC)
+    if meta.get('version') != DATASET_FORMAT_VERSION:
+        raise ValueError("데이터셋 형식 버전이 다릅니다.")
+    data = {}
+    for spec in meta['columns']:
+        values = arrays[spec['array']]
+        if 'categories' in spec:
+            values = pd.Categorical.from_codes(values, spec['categories'], validate=False)
+        data[spec['name']] = values
+    df = pd.DataFrame(data, copy=False)
+    df.attrs.update(meta['attrs'])
+    index = {'df': df, 'n': meta['rows'], 'order': arrays['order'], 'times': arrays['times']}
+    for filter_name, names in meta['bitmaps'].items():
+        index[filter_name] = {value: arrays[name] for value, name in names.items()}
+    return index
+
+
+def decoded_frame(index):
+    """
+    범주(Categorical) 문자열 컬럼을 일반 문자열 컬럼(결측은 NaN)으로 풀어낸 프레임. 숫자 컬럼은 매핑된 버퍼를 그대로 공유합니다.
+    분석/시각화 함수는 fillna('') 등 새 값을 넣는 연산을 하므로 조회 인덱스의 프레임 대신 이것을 받습니다.
+    """
+    df = index['df']
+    decoded = {}
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # 코드 -1(결측)은 마지막에 붙인 NaN을 가리킴
+            categories = np.append(np.asarray(values.cat.categories, dtype=object), np.nan)
+            decoded[col] = categories[values.cat.codes.to_numpy()]
+    return df.assign(**decoded) if decoded else df
+
+
+def _open(path):
+    # 열기와 LRU 시각 갱신은 삭제(prune)와 같은 잠금 아래에서 (열기 직전에 지워지는 경우 방지)
+    with _evict_lock():
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        os.utime(path)
+    return decode_dataset(buffer)
+
+
+# --- 등록/조회 ---
+def register(dataset_id, df_analyzed):
+    """
+    분석된 프레임과 조회 인덱스를 dataset_id로 저장하고, 저장한 파일을 메모리 매핑해 반환합니다.
+    이미 있으면 저장을 건너뜁니다.
+    반환: 조회 인덱스
+    """
+    path = _path(dataset_id)
+    if not os.path.exists(path):
+        atomic_write_bytes(path, encode_dataset(event_index.build_event_index(df_analyzed)))
+        with _evict_lock():
+            prune_directory(DATASET_DIR, DISK_LIMIT_BYTES, SUFFIX)
+    try:
+        index = _open(path)
+    except (OSError, ValueError):
+        # 한도보다 큰 데이터셋이 바로 지워진 경우 등: 이 워커의 메모리에만 둠
+        index = event_index.build_event_index(df_analyzed)
+    _remember(dataset_id, index)
+    return index
+
+
+def get_index(dataset_id):
+    """
+    dataset_id의 조회 인덱스를 반환합니다. (메모리 -> 디스크(메모리 매핑) 순, 없으면 KeyError)
+    """
+    with _lock:
+        if dataset_id in _indexes:
+            _indexes.move_to_end(dataset_id)
+            return _indexes[dataset_id]
+    try:
+        index = _open(_path(dataset_id))
+    except (OSError, ValueError):
+        raise KeyError(f"등록되지 않은 데이터셋입니다: {dataset_id}")
+    _remember(dataset_id, index)
+    return index
+
+
+def get_or_register(dataset_id, load_frame):
+    """
+    등록된 dataset_id면 그 인덱스를, 아니면 load_frame()이 반환한 분석 프레임을 등록해 반환합니다.
+    (같은 파일을 여러 워커가 각자 읽고 분석하지 않도록 업로드 경로들이 공유)
+    """
+    try:
+        return get_index(dataset_id)
+    except KeyError:
+        return register(dataset_id, load_frame())
+
+
+def clear_memory():
+    with _lock:
+        _indexes.clear()
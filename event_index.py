@@ -0,0 +1,158 @@
+"""
+분석된 이벤트 데이터의 조회 인덱스.
+
+데이터셋마다 한 번 만들어 두고 조회마다 재사용합니다.
+- Time(s): 안정 정렬한 순서와 정렬된 시간 배열 (구간 조회는 이진 탐색)
+- Player/TeamID/Action/Half 값, 태그(Tags의 각 항목), 시작/끝 구역 플래그: 값마다 비트맵(uint64 워드)
+필터는 비트맵 OR(같은 필터의 여러 값) / AND(서로 다른 필터)로 결합합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from schema import normalize_events
+from stats_utils import (parse_time_seconds, ZONE_OWN_HALF, ZONE_DEF_THIRD, ZONE_MID_THIRD, ZONE_FINAL_THIRD,
+                         ZONE_PENALTY_AREA, ZONE_CENTRAL_CHANNEL)
+
+# 조회 필터 이름 -> 값 비트맵을 만드는 컬럼
+VALUE_FILTERS = {'player': 'Player', 'team': 'TeamID', 'action': 'Action', 'half': 'Half', 'match': 'MatchID'}
+ZONES = {
+    'own_half': ZONE_OWN_HALF, 'defensive_third': ZONE_DEF_THIRD, 'middle_third': ZONE_MID_THIRD,
+    'final_third': ZONE_FINAL_THIRD, 'penalty_area': ZONE_PENALTY_AREA, 'central_channel': ZONE_CENTRAL_CHANNEL,
+}
+RESULT_COLUMNS = ['No', 'MatchID', 'TeamID', 'Half', 'Time', 'Time(s)', 'Player', 'Receiver', 'Action',
+                  'StartX', 'StartY', 'EndX', 'EndY', 'Tags', 'xG']
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+# --- 비트맵 ---
+def to_bitmap(mask):
+    """
+    bool 배열 -> uint64 워드 비트맵 (행 i는 워드 i // 64의 비트 i % 64)
+    """
+    mask = np.asarray(mask, dtype=bool)
+    padded = np.zeros(-(-len(mask) // 64) * 64, dtype=bool)
+    padded[:len(mask)] = mask
+    return np.packbits(padded, bitorder='little').view('<u8')
+
+
+def from_bitmap(words, n):
+    return np.unpackbits(words.view(np.uint8), count=n, bitorder='little').view(bool)
+
+
+def _value_bitmaps(values):
+    """
+    컬럼의 고유값마다 비트맵을 만듭니다. 반환: {값 문자열: 비트맵}
+    """
+    codes, uniques = pd.factorize(values)
+    return {str(value): to_bitmap(codes == i) for i, value in enumerate(uniques)}
+
+
+def _tag_bitmaps(tags):
+    """
+    'Key, Success'처럼 쉼표로 구분된 태그의 각 항목마다 비트맵을 만듭니다. (고유 조합에만 문자열 분리 적용)
+    """
+    codes, uniques = pd.factorize(tags.fillna('').astype(str))
+    token_sets = [{token.strip() for token in combo.split(',') if token.strip()} for combo in uniques]
+    bitmaps = {}
+    for token in sorted(set().union(*token_sets)) if token_sets else []:
+        has_token = np.array([token in tokens for tokens in token_sets] + [False])
+        bitmaps[token] = to_bitmap(has_token[codes])
+    return bitmaps
+
+
+def build_event_index(df_analyzed):
+    """
+    조회 인덱스를 만듭니다. 반환: dict (df, n, order, times, 필터별 비트맵)
+    """
+    df = normalize_events(df_analyzed)
+    times = df['Time(s)'].to_numpy(dtype=float) if 'Time(s)' in df.columns else parse_time_seconds(df['Time']).astype(float)
+    order = np.argsort(times, kind='stable')
+    index = {'df': df, 'n': len(df), 'order': order, 'times': times[order]}
+    for name, col in VALUE_FILTERS.items():
+        index[name] = _value_bitmaps(df[col].fillna('').astype(str)) if col in df.columns else {}
+    index['tag'] = _tag_bitmaps(df['Tags'])
+    for name, col in [('zone', 'Start_Zone'), ('end_zone', 'End_Zone')]:
+        flags = df[col].to_numpy() if col in df.columns else np.zeros(len(df), dtype=np.uint8)
+        index[name] = {zone: to_bitmap((flags & bit) != 0) for zone, bit in ZONES.items()}
+    return index
+
+
+# --- 조회 ---
+def _as_list(value):
+    if value is None or value == '' or value == []:
+        return []
+    return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
+
+
+def _seconds(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if str(value).replace('.', '', 1).isdigit():
+        return float(value)
+    if ':' not in str(value):
+        raise ValueError(f"시간 형식 오류: {value} (MM:SS 또는 초)")
+    return float(parse_time_seconds(pd.Series([str(value)]))[0])
+
+
+def _normalize_value(name, value):
+    # 선수 번호는 엑셀의 10.0 표기도 허용
+    return value.replace('.0', '').strip() if name == 'player' else value
+
+
+def match_rows(index, filters):
+    """
+    filters의 모든 조건을 만족하는 행 번호(원래 순서)를 반환합니다.
+    filters: player/team/action/half/match/zone/end_zone/tags(모두 포함)/exclude_tags(하나도 없음)는 값 또는 리스트,
+             time_from/time_to는 'MM:SS' 또는 초 (양 끝 포함)
+    없는 값은 빈 결과, 알 수 없는 구역은 ValueError
+    """
+    n = index['n']
+    words = None
+
+    def combine(bitmap):
+        nonlocal words
+        words = bitmap.copy() if words is None else np.bitwise_and(words, bitmap, out=words)
+
+    empty = np.zeros(-(-n // 64), dtype='<u8')
+    for name in list(VALUE_FILTERS) + ['zone', 'end_zone']:
+        values = _as_list(filters.get(name))
+        if not values:
+            continue
+        if name in ('zone', 'end_zone'):
+            unknown = [v for v in values if v not in ZONES]
+            if unknown:
+                raise ValueError(f"구역은 {', '.join(ZONES)} 중 하나입니다: {', '.join(unknown)}")
+        bitmaps = [index[name].get(_normalize_value(name, v), empty) for v in values]
+        combine(np.bitwise_or.reduce(bitmaps) if len(bitmaps) > 1 else bitmaps[0])
+    for tag in _as_list(filters.get('tags')):
+        combine(index['tag'].get(tag, empty))
+    for tag in _as_list(filters.get('exclude_tags')):
+        if tag in index['tag']:
+            combine(~index['tag'][tag])
+
+    time_from, time_to = _seconds(filters.get('time_from')), _seconds(filters.get('time_to'))
+    if time_from is None and time_to is None:
+        return np.arange(n) if words is None else np.flatnonzero(from_bitmap(words, n))
+    # 정렬된 시간에서 이진 탐색한 구간의 행만 비트맵으로 확인
+    lo = 0 if time_from is None else np.searchsorted(index['times'], time_from, side='left')
+    hi = n if time_to is None else np.searchsorted(index['times'], time_to, side='right')
+    candidates = index['order'][lo:hi]
+    if words is not None:
+        candidates = candidates[from_bitmap(words, n)[candidates]]
+    return np.sort(candidates)
+
+
+def query_events(index, filters, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    조건에 맞는 이벤트를 페이지 단위로 반환합니다. 반환: (전체 건수, 해당 페이지 DataFrame)
+    """
+    page_size = min(max(int(page_size), 1), MAX_PAGE_SIZE)
+    page = max(int(page), 1)
+    rows = match_rows(index, filters)
+    page_rows = rows[(page - 1) * page_size:page * page_size]
+    df = index['df']
+    columns = [col for col in RESULT_COLUMNS if col in df.columns]
+    return len(rows), df.iloc[page_rows][columns]
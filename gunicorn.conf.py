@@ -0,0 +1,32 @@
+import gc
+import os
+
+# --- gunicorn 설정 ---
+# 워커 수는 gunicorn 기본 동작대로 WEB_CONCURRENCY 환경변수를 따릅니다.
+#
+# FPA_PRELOAD_VISUALIZATION=1 이면 마스터 프로세스에서 시각화 스택(matplotlib/mplsoccer)을
+# 미리 임포트합니다. 워커는 fork로 생성되므로 임포트된 모듈 메모리를 copy-on-write로 공유하고,
+# 첫 시각화 요청의 임포트 지연도 사라집니다. 기본값(0)에서는 각 워커가 처음 사용할 때 임포트합니다.
+PRELOAD_VISUALIZATION = os.environ.get('FPA_PRELOAD_VISUALIZATION', '0') == '1'
+preload_app = os.environ.get('FPA_PRELOAD_APP', '0') == '1'
+
+if PRELOAD_VISUALIZATION:
+    # 임포트 중 생긴 가비지가 페이지에 '구멍'을 만들지 않도록 마스터에서는 GC를 끔
+    gc.disable()
+
+
+def on_starting(server):
+    if PRELOAD_VISUALIZATION:
+        import visualization  # noqa: F401  마스터에서 한 번만 임포트 (figure는 만들지 않으므로 fork-safe)
+        server.log.info("Preloaded visualization stack in master")
+
+
+def pre_fork(server, worker):
+    if PRELOAD_VISUALIZATION:
+        # 마스터의 기존 객체를 GC 추적 대상에서 제외하여, 워커의 GC가 공유 페이지를 건드리지 않도록 함
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if PRELOAD_VISUALIZATION:
+        gc.enable()
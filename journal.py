@@ -0,0 +1,229 @@
+"""
+라이브 기록 저널.
+
+/generate_log에서 받아들인 이벤트를 경기(match_id)마다 하나의 추가 전용 파일(JSON Lines)에 기록합니다.
+- 기록: {"op": "add", "log_text", "log_data"} 또는 {"op": "undo"} (마지막 이벤트 삭제)
+- 쓰기는 파일 잠금 아래 한 번의 write로 추가하므로 워커가 재시작되어도 기록은 남습니다.
+  fsync는 FSYNC_EVERY건 또는 FSYNC_INTERVAL초마다 모아서 실행합니다. (전원 장애 시 최대 그만큼 유실)
+- SNAPSHOT_EVERY건마다 현재 로그 목록을 컬럼 단위 스냅샷(.npz)으로 저장하고,
+  복원은 마지막 스냅샷 + 그 이후 저널만 다시 적용합니다.
+"""
+import io
+import os
+import re
+import json
+import hashlib
+import time
+import threading
+
+import numpy as np
+
+from storage import DATA_DIR, atomic_write_bytes, file_lock
+
+JOURNAL_DIR = os.path.join(DATA_DIR, 'journal')
+FSYNC_EVERY = int(os.environ.get('FPA_JOURNAL_FSYNC_EVERY', '32'))
+FSYNC_INTERVAL = float(os.environ.get('FPA_JOURNAL_FSYNC_INTERVAL', '0.5'))
+SNAPSHOT_EVERY = int(os.environ.get('FPA_JOURNAL_SNAPSHOT_EVERY', '256'))
+LOG_FIELDS = ['Time', 'Team', 'Player', 'Action', 'Receiver', 'Coord', 'Tags']
+
+_pending = {}  # 경로 -> fsync하지 않은 기록 수
+_pending_lock = threading.Lock()
+_flusher = None
+_positions = {}  # 스냅샷 경로 -> (파일 stat, (기록 수, 저널 바이트 위치))
+
+
+def _safe_name(match_id):
+    # 읽기 쉬운 접두어 + 원래 match_id의 해시 ('M 1', 'M_1', 'M/1'이 서로 다른 파일이 되도록)
+    match_id = str(match_id).strip()
+    if not match_id:
+        raise ValueError("저널에는 Match ID가 필요합니다.")
+    readable = re.sub(r'[^0-9A-Za-z_-]', '_', match_id)[:64]
+    return f"{readable}.{hashlib.sha1(match_id.encode('utf-8')).hexdigest()[:16]}"
+
+
+def journal_path(match_id):
+    return os.path.join(JOURNAL_DIR, _safe_name(match_id) + '.jsonl')
+
+
+def _snapshot_path(path):
+    return path[:-len('.jsonl')] + '.snapshot.npz'
+
+
+# --- fsync 모아서 실행 ---
+def _fsync(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def flush(path=None):
+    """
+    fsync하지 않은 기록이 있는 저널(또는 path 하나)을 디스크에 동기화합니다.
+    """
+    with _pending_lock:
+        paths = [path] if path is not None else list(_pending)
+        for p in paths:
+            _pending.pop(p, None)
+    for p in paths:
+        _fsync(p)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FSYNC_INTERVAL)
+        flush()
+
+
+def _mark_pending(path, count):
+    global _flusher
+    with _pending_lock:
+        _pending[path] = _pending.get(path, 0) + count
+        due = _pending[path] >= FSYNC_EVERY
+        if _flusher is None and FSYNC_INTERVAL > 0:
+            _flusher = threading.Thread(target=_flush_loop, name='journal-fsync', daemon=True)
+            _flusher.start()
+    if due or FSYNC_INTERVAL <= 0:
+        flush(path)
+
+
+# --- 복원 ---
+def _empty_state():
+    return {'logs': [], 'log_data': [], 'records': 0, 'offset': 0}
+
+
+def _load_snapshot(path):
+    try:
+        with np.load(_snapshot_path(path), allow_pickle=False) as snap:
+            state = {'logs': snap['log_text'].tolist(), 'records': int(snap['records']), 'offset': int(snap['offset'])}
+            fields = {name: snap[name].tolist() for name in LOG_FIELDS}
+    except (OSError, KeyError, ValueError):
+        return _empty_state()
+    state['log_data'] = [dict(zip(LOG_FIELDS, values)) for values in zip(*(fields[name] for name in LOG_FIELDS))]
+    return state
+
+
+def _apply(state, data, offset):
+    """
+    저널 바이트(data, 파일의 offset 위치부터)를 state에 적용합니다. 끝의 불완전한 줄은 무시합니다.
+    """
+    end = data.rfind(b'\n') + 1
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # 빈 줄 또는 쓰기 도중 중단된 줄
+            continue
+        if record.get('op') == 'add':
+            state['logs'].append(record['log_text'])
+            state['log_data'].append(record.get('log_data') or {})
+        elif record.get('op') == 'undo' and state['logs']:
+            state['logs'].pop()
+            state['log_data'].pop()
+        state['records'] += 1
+    state['offset'] = offset + end
+    return state
+
+
+def _replay(path):
+    state = _load_snapshot(path)
+    try:
+        with open(path, 'rb') as f:
+            f.seek(state['offset'])
+            data = f.read()
+    except OSError:
+        return state if state['records'] else _empty_state()
+    return _apply(state, data, state['offset'])
+
+
+def load_session(match_id):
+    """
+    match_id 경기의 현재 로그 목록을 복원합니다. (마지막 스냅샷 + 이후 저널)
+    반환: {'logs': 로그 문자열 목록, 'log_data': 표 출력용 dict 목록, 'records': 저널 기록 수}
+    """
+    state = _replay(journal_path(match_id))
+    state.pop('offset')
+    return state
+
+
+def _snapshot_position(path):
+    """
+    스냅샷에 반영된 (기록 수, 저널 바이트 위치). 스냅샷 파일이 바뀌지 않았으면 워커 메모리의 값을 재사용합니다.
+    """
+    snapshot = _snapshot_path(path)
+    try:
+        st = os.stat(snapshot)
+    except OSError:
+        return 0, 0
+    key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = _positions.get(snapshot)
+    if cached and cached[0] == key:
+        return cached[1]
+    try:
+        with np.load(snapshot, allow_pickle=False) as snap:
+            position = int(snap['records']), int(snap['offset'])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+    _positions[snapshot] = (key, position)
+    return position
+
+
+def _write_snapshot(path, state):
+    columns = {name: np.array([str(row.get(name, '')) for row in state['log_data']], dtype=str) for name in LOG_FIELDS}
+    buffer = io.BytesIO()
+    np.savez(buffer, log_text=np.array(state['logs'], dtype=str), records=state['records'], offset=state['offset'], **columns)
+    atomic_write_bytes(_snapshot_path(path), buffer.getvalue())
+
+
+# --- 기록 ---
+def append(match_id, records):
+    """
+    기록 목록을 저널에 추가합니다. (잠금 아래 한 번의 write)
+    records: [{'op': 'add', 'log_text', 'log_data'} 또는 {'op': 'undo'}]
+    반환: 추가 후 저널 기록 수
+    """
+    path = journal_path(match_id)
+    data = b''.join(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n' for record in records)
+    os.makedirs(JOURNAL_DIR, exist_ok=True)
+    with file_lock(path):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            # 이전 쓰기가 중간에 끊겨 마지막 줄이 불완전하면 줄을 바꿔서 이어 씀
+            size = os.fstat(fd).st_size
+            if size and _last_byte(path, size) != b'\n':
+                data = b'\n' + data
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        # 스냅샷 이후 기록 수는 줄 수로만 세고, 스냅샷이 필요할 때만 다시 적용
+        snapshot_records, offset = _snapshot_position(path)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            tail = f.read()
+        tail_records = sum(1 for line in tail.split(b'\n')[:-1] if line.strip())
+        if tail_records >= SNAPSHOT_EVERY:
+            _write_snapshot(path, _apply(_load_snapshot(path), tail, offset))
+    _mark_pending(path, len(records))
+    return snapshot_records + tail_records
+
+
+def _last_byte(path, size):
+    with open(path, 'rb') as f:
+        f.seek(size - 1)
+        return f.read(1)
+
+
+def append_logs(match_id, results):
+    """
+    live_log.translate_item 결과 중 성공한 항목을 저널에 추가합니다. 반환: 저널 기록 수 (추가할 것이 없으면 None)
+    """
+    records = [{'op': 'add', 'log_text': r['log_text'], 'log_data': r['log_data']} for r in results if 'log_text' in r]
+    return append(match_id, records) if records else None
+
+
+def undo(match_id):
+    return append(match_id, [{'op': 'undo'}])
@@ -0,0 +1,165 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from stats_utils import is_in_penalty_area, is_progressive_pass
+
+# --- 상수 (기존 ui.py에서 가져옴) ---
+ACTION_CODES = { 'ddd': 'Goal', 'dd': 'Shot On Target', 'd': 'Shot', 'db': 'Blocked Shot', 'zz': 'Assist', 'z': 'Key Pass', 'cc': 'Cross', 'c': 'Cross', 'ss': 'Pass', 's': 'Pass', 'ee': 'Breakthrough', 'rr': 'Dribble', 'gp': 'Gain', 'm': 'Miss', 'aa': 'Tackle', 'q': 'Intercept', 'qq': 'Acquisition', 'w': 'Clear', 'ww': 'Cutout', 'qw': 'Block', 'v': 'Catching', 'vv': 'Punching', 'sv': 'Save', 'bb': 'Duel', 'b': 'Duel', 'f': 'Foul', 'ff': 'Be Fouled', 'o': 'Offside', 't': 'Touch', 'st': 'Sprint', 'tr': 'Throw-in' }
+TAG_CODES = { 'k': 'Key', 'a': 'Assist', 'h': 'Header', 'r': 'Aerial', 'w': 'Suffered', 'n': 'In-box', 'u': 'Out-box', 'p': 'Progressive', 'c': 'Counter Attack', 'sw': 'Switch', 'wf': 'Weak Foot', 'ft': 'First Time' }
+TWO_DOT_ACTION_CODES = {'s', 'c', 'r', 'e', 'z', 'tr'}
+
+# keypass(z), gain(gp), clear(w), block(qw), catching(v), punching(vv), save(sv) 등은 Success로 처리
+SUCCESS_CODES = {'z', 'gp', 'w', 'qw', 'v', 'vv', 'sv', 'dd', 'ddd'}
+FAIL_CODES = {'d', 'db'}
+# 성공/실패 태그를 붙이지 않는 액션
+NO_RESULT_CODES = {'t', 'm', 'q', 'p', 'l', 'qq', 'bl', 'o', 'st'}
+SHOT_ACTIONS = {'Goal', 'Shot On Target', 'Shot', 'Blocked Shot'}
+
+BATCH_MAX_ITEMS = 10000
+
+_INPUT_RE = re.compile(r"(\d+)([a-z]+)(\d*)")
+
+# 액션 코드 하나에 대한 규칙을 미리 계산한 표
+# result_tag: 자동으로 붙는 'Success'/'Fail' (없으면 None)
+# needs_receiver: 받는 선수 번호가 필요한 액션 (패스, 크로스, 키패스/어시스트, 스로인)
+# two_dots: 코드만으로 좌표 2개가 필요한 액션, receiver_two_dots: 받는 선수가 있으면 좌표 2개가 필요한지
+LogRule = namedtuple('LogRule', ['action', 'result_tag', 'needs_receiver', 'two_dots', 'receiver_two_dots'])
+
+
+def _compile_rule(code):
+    base = code[0]
+    action = ACTION_CODES.get(code) or ACTION_CODES.get(base)
+    if not action:
+        return None
+    if code in SUCCESS_CODES:
+        result_tag = 'Success'
+    elif code in FAIL_CODES:
+        result_tag = 'Fail'
+    elif code not in NO_RESULT_CODES:
+        result_tag = 'Success' if len(code) > 1 and code[0] == code[1] else 'Fail'
+    else:
+        result_tag = None
+    # 'sv'(세이브)는 's'로 시작하지만 단독 액션이며 좌표 1개만 필요함
+    is_save = code == 'sv'
+    return LogRule(
+        action=action,
+        result_tag=result_tag,
+        needs_receiver=(base in ('s', 'c', 'z') or code == 'tr') and not is_save,
+        two_dots=(base in TWO_DOT_ACTION_CODES or code in TWO_DOT_ACTION_CODES) and not is_save,
+        receiver_two_dots=not is_save,
+    )
+
+
+RULES = {code: _compile_rule(code) for code in ACTION_CODES}
+
+
+def _rule(code):
+    """
+    표에 없는 코드(예: 'sx' -> 첫 글자 's'의 Pass)는 그때 규칙을 계산합니다.
+    """
+    rule = RULES.get(code)
+    return rule if rule is not None else _compile_rule(code)
+
+
+@lru_cache(maxsize=1024)
+def _tags(tag_part):
+    """
+    '.p.n' 부분의 태그 코드 -> 태그 이름 튜플 (알 수 없는 코드는 무시)
+    """
+    return tuple(TAG_CODES[tc] for tc in tag_part.split('.') if tc in TAG_CODES)
+
+
+def translate_log(stat_input, dots, half, team, direction, timeline):
+    """
+    입력 코드 하나(예: '10ss8.p')와 좌표 점을 로그 문자열과 표 출력용 데이터로 변환합니다.
+    입력 오류는 예외로 전달됩니다. (라우트에서 메시지를 그대로 반환)
+    반환: (log_text, log_data)
+    """
+    parts = stat_input.split('.', 1)
+    base_action_part = parts[0]
+
+    # 숫자만 입력된 경우 'Touch'로 간주
+    if base_action_part.isdigit():
+        player_from, action_code_raw, player_to = base_action_part, 't', ''
+    else:
+        match = _INPUT_RE.match(base_action_part)
+        if not match: raise ValueError("기본 입력 형식 오류")
+        player_from, action_code_raw, player_to = match.groups()
+
+    rule = _rule(action_code_raw)
+    if rule is None: raise ValueError("알 수 없는 액션 코드")
+    action_name = rule.action
+
+    if rule.needs_receiver and not player_to:
+        raise ValueError(f"'{action_name}' 액션은 받는 선수 번호가 필요합니다. (예: 10{action_code_raw}8)")
+
+    tags_list = list(_tags(parts[1])) if len(parts) > 1 else []
+    if rule.result_tag:
+        tags_list.append(rule.result_tag)
+
+    if rule.two_dots or (player_to and rule.receiver_two_dots):
+        if len(dots) < 2: raise ValueError("좌표 2개가 필요합니다.")
+        start_pos, end_pos = dots[-2], dots[-1]
+        start_x, start_y = float(start_pos['meter_x']), float(start_pos['meter_y'])
+        end_x, end_y = float(end_pos['meter_x']), float(end_pos['meter_y'])
+
+        # Progressive 태그
+        is_left_direction = direction == 'left'
+        start_x_adj = 105 - start_x if is_left_direction else start_x
+        end_x_adj = 105 - end_x if is_left_direction else end_x
+        if is_progressive_pass(start_x_adj, end_x_adj):
+            if 'Progressive' not in tags_list: tags_list.append('Progressive')
+
+        action_str = f"{player_from} {action_name}"
+        if player_to: action_str += f" to {player_to}"
+        log_text = f"{half} | {team} | {direction} | {timeline} | Pos({start_x}, {start_y}) | {action_str} | Pos({end_x}, {end_y})"
+    else: # 좌표 1개
+        start_pos = dots[-1]
+        start_x, start_y = float(start_pos['meter_x']), float(start_pos['meter_y'])
+        log_text = f"{half} | {team} | {direction} | {timeline} | Pos({start_x}, {start_y}) | {player_from} {action_name}"
+
+    # In-box/Out-box 태그
+    if is_in_penalty_area(start_x, start_y):
+        if 'In-box' not in tags_list: tags_list.append('In-box')
+    elif action_name in SHOT_ACTIONS:
+        if 'Out-box' not in tags_list: tags_list.append('Out-box')
+
+    tags_text = ', '.join(sorted(set(tags_list))) if tags_list else ''
+    if tags_list:
+        log_text += f" | Tags: {tags_text}"
+
+    # UI 표 출력을 위한 구조화된 데이터
+    log_data = {
+        "Time": timeline,
+        "Team": team,
+        "Player": player_from,
+        "Action": action_name,
+        "Receiver": player_to,
+        "Coord": f"Pos({start_x}, {start_y})",
+        "Tags": tags_text,
+    }
+    return log_text, log_data
+
+
+def translate_item(item, defaults=None):
+    """
+    요청 본문 형식({'stat_input', 'dots', 'half', 'team', 'direction', 'timeline'})을 변환합니다.
+    defaults의 메타 필드는 항목에 없을 때 사용됩니다.
+    반환: {'log_text', 'log_data'} 또는 {'error'}
+    """
+    try:
+        if defaults:
+            item = {**defaults, **item}
+        log_text, log_data = translate_log((item.get('stat_input') or '').lower(), item.get('dots', []),
+                                           item.get('half'), item.get('team'), item.get('direction'), item.get('timeline'))
+        return {"log_text": log_text, "log_data": log_data}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def translate_items(items, defaults=None):
+    """
+    여러 입력을 한 번에 변환합니다. 결과는 입력 순서와 같으며 항목별 오류는 {'error': 메시지}로 포함됩니다.
+    """
+    return [translate_item(item, defaults) for item in items]
@@ -0,0 +1,319 @@
+"""
+로컬 부하 테스트 도구.
+
+경기 당일처럼 여러 분석원이 /generate_log 요청을 연속(burst)으로 보내는 동안 다른 사용자가
+/export, /upload_analyze_visualize를 호출하는 요청 혼합을 재현하고, 경로별 처리량과
+p50/p95/p99 지연 시간을 출력합니다. (표준 라이브러리 스레드 + urllib만 사용)
+
+    # gunicorn(없으면 Flask 개발 서버)을 로컬에서 띄워 측정
+    python loadtest.py --workers 4 --concurrency 16 --duration 30
+    # 이미 실행 중인 서버를 측정
+    python loadtest.py --url http://127.0.0.1:8000 --mix generate_log=90,export=5,upload_analyze_visualize=5
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import socket
+import argparse
+import threading
+import tempfile
+import subprocess
+import urllib.error
+import urllib.request
+
+# 경로별 기본 요청 비율 (가중치)
+DEFAULT_MIX = 'generate_log=90,export=5,upload_analyze_visualize=5'
+ROUTES = ('generate_log', 'export', 'upload_analyze_visualize')
+PERCENTILES = (50, 95, 99)
+
+
+# --- 합성 입력 ---
+def _stat_inputs(rng, n):
+    """
+    live_log.ACTION_CODES/TAG_CODES로 입력창에 치는 것과 같은 코드(예: '10ss8.p', '7ddd.n')와 좌표 점을 만듭니다.
+    선수 번호는 홈 1~11, 원정 12~22 입니다. (synthetic_data.synthetic_events와 동일)
+    반환: [(team, stat_input, dots), ...]
+    """
+    from live_log import ACTION_CODES, TAG_CODES, TWO_DOT_ACTION_CODES
+
+    # 실제 기록 빈도에 가깝도록 패스 계열을 자주 선택
+    action_codes = ['ss'] * 20 + ['s'] * 6 + ['cc', 'c', 'z', 'zz', 'tr', 'ee', 'rr'] * 2 + \
+                   [code for code in ACTION_CODES if code not in ('ss', 's', 'cc', 'c', 'z', 'zz', 'tr', 'ee', 'rr')]
+    tag_codes = list(TAG_CODES)
+    inputs = []
+    for _ in range(n):
+        team = rng.choice(['home', 'away'])
+        squad = list(range(1, 12)) if team == 'home' else list(range(12, 23))
+        code = rng.choice(action_codes)
+        player = rng.choice(squad)
+        receiver = ''
+        if (code[0] in ('s', 'c', 'z') or code == 'tr') and code != 'sv':
+            receiver = str(rng.choice([p for p in squad if p != player]))
+        tags = rng.sample(tag_codes, rng.choice([0, 0, 0, 1, 1, 2]))
+        stat_input = f"{player}{code}{receiver}" + ''.join(f".{tag}" for tag in tags)
+        two_dots = (code[0] in TWO_DOT_ACTION_CODES or code in TWO_DOT_ACTION_CODES or receiver) and code != 'sv'
+        dots = [{'meter_x': round(rng.uniform(0, 105), 1), 'meter_y': round(rng.uniform(0, 68), 1)}
+                for _ in range(2 if two_dots else 1)]
+        inputs.append((team, stat_input, dots))
+    return inputs
+
+
+def _log_payload(team, stat_input, dots, index, n):
+    half = '1st' if index < n // 2 else '2nd'
+    seconds = int(index % max(n // 2, 1) * 2700 / max(n // 2, 1))
+    return {
+        'stat_input': stat_input, 'dots': dots, 'half': half, 'team': team,
+        'direction': 'right' if (team == 'home') == (half == '1st') else 'left',
+        'timeline': f"{seconds // 60:02d}:{seconds % 60:02d}",
+    }
+
+
+def synthetic_log_requests(n_events=1500, seed=0):
+    """
+    한 경기 분량(n_events)의 /generate_log 요청 본문 목록 (전/후반, 시간 순)
+    """
+    rng = random.Random(seed)
+    return [_log_payload(team, stat_input, dots, i, n_events)
+            for i, (team, stat_input, dots) in enumerate(_stat_inputs(rng, n_events))]
+
+
+def build_payloads(n_events=1500, seed=0):
+    """
+    부하 테스트용 요청 본문을 만듭니다.
+    - generate_log: 합성 stat_input/dots 요청 목록
+    - export: 같은 입력을 앱의 /generate_log로 변환한 한 경기 분량의 로그
+    - players: 업로드 시각화 요청에 사용할 선수 번호
+    반환: {'generate_log': [...], 'export': {...}, 'players': [...]}
+    """
+    import app
+
+    client = app.app.test_client()
+    log_requests = synthetic_log_requests(n_events, seed)
+    logs = []
+    players = set()
+    for payload in log_requests:
+        response = client.post('/generate_log', json=payload)
+        if response.status_code == 200:
+            result = response.get_json()
+            logs.append(result['log_text'])
+            players.add(result['log_data']['Player'])
+    export = {'logs': logs, 'match_id': 'LOADTEST', 'teamid_h': 'H', 'teamid_a': 'A'}
+    return {'generate_log': log_requests, 'export': export, 'players': sorted(players, key=int)}
+
+
+# --- HTTP ---
+def _request(url, body=None, content_type='application/json', timeout=300):
+    if body is not None and content_type == 'application/json':
+        body = json.dumps(body).encode('utf-8')
+    req = urllib.request.Request(url, data=body, method='POST' if body is not None else 'GET')
+    if body is not None:
+        req.add_header('Content-Type', content_type)
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def _multipart(fields, files):
+    """
+    multipart/form-data 본문을 만듭니다. files: {필드명: (파일명, bytes)}
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8'))
+    for name, (filename, data) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8') + data + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+# --- 로컬 서버 ---
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, threads=1, timeout=120, port=None, data_dir=None):
+    """
+    gunicorn(gunicorn.conf.py 사용)으로 앱을 띄웁니다. gunicorn이 없으면 Flask 개발 서버(threaded)로 대신합니다.
+    합성 /export 요청이 실제 xT/xG/유사 선수/백분위 누적 데이터에 섞이지 않도록 FPA_DATA_DIR을 data_dir로 지정합니다.
+    반환: (subprocess.Popen, base_url, 서버 설명)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    port = port or _free_port()
+    try:
+        import gunicorn  # noqa: F401
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-b', f'127.0.0.1:{port}',
+               '-w', str(workers), '--threads', str(threads), '--timeout', str(timeout), 'app:app']
+        description = f'gunicorn workers={workers} threads={threads} timeout={timeout}'
+    except ImportError:
+        cmd = [sys.executable, '-c', f'import app; app.app.run(host="127.0.0.1", port={port}, threaded=True)']
+        description = 'flask dev server (threaded, gunicorn 미설치)'
+    env = {**os.environ, 'FPA_DATA_DIR': data_dir or tempfile.mkdtemp(prefix='fpa_loadtest_')}
+    process = subprocess.Popen(cmd, cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'서버 시작 실패: {" ".join(cmd)}')
+        try:
+            _request(base_url + '/', timeout=2)
+            return process, base_url, description
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('서버가 60초 안에 응답하지 않았습니다.')
+
+
+# --- 부하 생성 ---
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        route, _, weight = item.partition('=')
+        route = route.strip().lstrip('/')
+        if route not in ROUTES:
+            raise ValueError(f"알 수 없는 경로: {route} (가능: {', '.join(ROUTES)})")
+        mix[route] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, q):
+    """
+    정렬된 값의 q 백분위수 (nearest-rank)
+    """
+    if not sorted_values:
+        return float('nan')
+    rank = max(1, int(-(-q * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_load(base_url, payloads, mix, concurrency=8, duration=30.0, burst=5, think=0.5, seed=0):
+    """
+    concurrency개의 가상 사용자가 duration초 동안 mix 비율로 요청을 보냅니다.
+    /generate_log는 1~burst개를 연속으로 보내고(분석원의 연속 입력), 반복 사이에는 평균 think초를 쉽니다.
+    반환: {경로: {'latencies': [초], 'errors': 오류 수}}, 실제 측정 시간(초)
+    """
+    routes = list(mix)
+    weights = [mix[route] for route in routes]
+    results = {route: {'latencies': [], 'errors': 0} for route in routes}
+    lock = threading.Lock()
+    upload_file = payloads.get('upload_file')
+    players = payloads.get('players') or ['']
+
+    def send(route, rng):
+        if route == 'generate_log':
+            return _request(f'{base_url}/generate_log', rng.choice(payloads['generate_log']))
+        if route == 'export':
+            return _request(f'{base_url}/export', payloads['export'])
+        body, content_type = _multipart({'player_id': rng.choice(players)}, {'file': ('loadtest.xlsx', upload_file)})
+        return _request(f'{base_url}/upload_analyze_visualize', body, content_type)
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < stop_at:
+            route = rng.choices(routes, weights)[0]
+            repeats = rng.randint(1, burst) if route == 'generate_log' else 1
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                try:
+                    status, _ = send(route, rng)
+                    ok = status == 200
+                except (urllib.error.URLError, OSError):
+                    ok = False
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    if ok:
+                        results[route]['latencies'].append(elapsed)
+                    else:
+                        results[route]['errors'] += 1
+            if think > 0:
+                time.sleep(rng.expovariate(1 / think))
+
+    started = time.perf_counter()
+    stop_at = started + duration
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def summarize(results, elapsed):
+    """
+    경로별 요청 수/오류/처리량(req/s)/지연 백분위(ms) 요약 행 목록
+    """
+    rows = []
+    for route, result in results.items():
+        latencies = sorted(result['latencies'])
+        row = {'route': route, 'requests': len(latencies), 'errors': result['errors'],
+               'throughput': len(latencies) / elapsed if elapsed else 0.0}
+        for q in PERCENTILES:
+            row[f'p{q}_ms'] = percentile(latencies, q) * 1000
+        row['max_ms'] = latencies[-1] * 1000 if latencies else float('nan')
+        rows.append(row)
+    return rows
+
+
+def print_report(rows, elapsed, description):
+    print(f"server: {description}, duration: {elapsed:.1f}s")
+    print(f"{'route':<26} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}")
+    for row in rows:
+        print(f"{row['route']:<26} {row['requests']:>8} {row['errors']:>6} {row['throughput']:>8.1f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='FPA WebApp load test')
+    parser.add_argument('--url', help='측정할 서버 주소 (생략하면 로컬 서버를 띄움)')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', '2')),
+                        help='로컬 gunicorn 워커 수')
+    parser.add_argument('--threads', type=int, default=1, help='로컬 gunicorn 워커당 스레드 수')
+    parser.add_argument('--timeout', type=int, default=120, help='로컬 gunicorn 워커 타임아웃(초)')
+    parser.add_argument('--concurrency', type=int, default=8, help='동시 가상 사용자 수')
+    parser.add_argument('--duration', type=float, default=30.0, help='측정 시간(초)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='경로별 요청 비율 (예: generate_log=90,export=5)')
+    parser.add_argument('--burst', type=int, default=5, help='/generate_log 연속 요청 최대 개수')
+    parser.add_argument('--think', type=float, default=0.5, help='반복 사이 평균 대기 시간(초)')
+    parser.add_argument('--events', type=int, default=1500, help='/export 한 번에 보내는 로그 수 (한 경기 분량)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    payloads = build_payloads(args.events, args.seed)
+    process = data_dir = None
+    if args.url:
+        base_url, description = args.url.rstrip('/'), args.url
+    else:
+        # 로컬 서버는 임시 데이터 디렉토리를 사용하고 종료 후 삭제
+        data_dir = tempfile.mkdtemp(prefix='fpa_loadtest_')
+        process, base_url, description = start_server(args.workers, args.threads, args.timeout, data_dir=data_dir)
+    try:
+        if 'upload_analyze_visualize' in mix:
+            # 업로드 파일은 측정 전에 /export 결과로 한 번 만들어 둠 (측정에는 포함하지 않음)
+            _, payloads['upload_file'] = _request(f'{base_url}/export', payloads['export'])
+        results, elapsed = run_load(base_url, payloads, mix, args.concurrency, args.duration,
+                                    args.burst, args.think, args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if data_dir is not None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    rows = summarize(results, elapsed)
+    if args.json:
+        print(json.dumps({'server': description, 'duration_s': elapsed, 'routes': rows}, indent=2))
+    else:
+        print_report(rows, elapsed, description)
+
+
+if __name__ == '__main__':
+    main()
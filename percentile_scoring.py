@@ -0,0 +1,132 @@
+import os
+import json
+
+import numpy as np
+
+import analysis
+from quantile_sketch import TDigest
+from scoring import RAW_SCORE_COLUMNS, RAW_SCORE_ACTIONS
+from stats_utils import match_keys, match_hashes
+from storage import DATA_DIR, atomic_write_bytes, file_lock
+
+# --- 상수 ---
+SCORING_MODES = ('sigmoid', 'percentile')
+DEFAULT_SCORING_MODE = os.environ.get('FPA_SCORING_MODE', 'sigmoid')
+SKETCH_COMPRESSION = 100
+
+REFERENCE_PATH = os.path.join(DATA_DIR, 'score_sketches.json')
+
+
+def _empty_reference():
+    return {'match_ids': [], 'match_hashes': {}, 'match_sketches': {}, 'sketches': {}}
+
+
+def _merged_sketches(match_sketches):
+    # 경기별 스케치를 경기 키 순서로 병합한 시즌 기준 분포
+    merged = {}
+    for key in sorted(match_sketches):
+        for raw_col, sketch in match_sketches[key].items():
+            merged.setdefault(raw_col, TDigest(SKETCH_COMPRESSION)).merge(sketch)
+    return merged
+
+
+def load_reference(path=None):
+    """
+    저장된 기준 분포를 읽습니다.
+    반환: {'match_ids': [...], 'match_hashes': {경기 키: 해시}, 'match_sketches': {경기 키: {raw_col: TDigest}},
+          'sketches': {raw_col: TDigest}} (sketches는 경기별 스케치를 병합한 시즌 분포)
+    """
+    try:
+        with open(path or REFERENCE_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return _empty_reference()
+    # 경기별 스케치가 없는 이전 형식은 경기를 교체할 수 없으므로 새로 시작
+    matches = data.get('matches', {})
+    return {
+        'match_ids': sorted(matches),
+        'match_hashes': {key: match['hash'] for key, match in matches.items()},
+        'match_sketches': {key: {col: TDigest.from_dict(sketch) for col, sketch in match['sketches'].items()}
+                           for key, match in matches.items()},
+        'sketches': {col: TDigest.from_dict(sketch) for col, sketch in data.get('sketches', {}).items()},
+    }
+
+
+def _save_reference(reference, path):
+    data = {
+        'matches': {key: {'hash': reference['match_hashes'][key],
+                          'sketches': {col: sketch.to_dict() for col, sketch in reference['match_sketches'][key].items()}}
+                    for key in sorted(reference['match_sketches'])},
+        'sketches': {col: sketch.to_dict() for col, sketch in reference['sketches'].items()},
+    }
+    atomic_write_bytes(path, json.dumps(data).encode('utf-8'))
+
+
+def _scored_values(all_stats, raw_col):
+    """
+    기준 분포에 넣을 Raw 값. 비율형 점수는 시도 횟수가 0인 선수를 제외합니다.
+    """
+    values = all_stats[raw_col].to_numpy(dtype=float)
+    action_col = RAW_SCORE_ACTIONS.get(raw_col)
+    if action_col in all_stats.columns:
+        values = values[all_stats[action_col].to_numpy() > 0]
+    return values
+
+
+def match_sketches(all_stats):
+    """
+    한 경기의 선수별 Raw 점수로 Raw 컬럼별 스케치를 만듭니다.
+    """
+    return {raw_col: TDigest(SKETCH_COMPRESSION).update(_scored_values(all_stats, raw_col))
+            for raw_col in RAW_SCORE_COLUMNS if raw_col in all_stats.columns}
+
+
+def _changed_matches(reference, hashes):
+    stored = reference['match_hashes']
+    return sorted(key for key, digest in hashes.items() if stored.get(key) != digest)
+
+
+def update_reference(df, path=None):
+    """
+    df의 경기 중 기준 분포에 없거나 내용이 바뀐 경기(전반 종료 후 내보낸 경기를 다시 내보낸 경우 등)의
+    선수별 Raw 점수 스케치를 새로 만들어 그 경기의 이전 스케치를 교체하고, 시즌 분포를 다시 병합해 저장합니다.
+    바뀐 경기가 없으면 저장된 기준 분포를 그대로 반환합니다.
+    """
+    path = path or REFERENCE_PATH
+    keys = match_keys(df)
+    hashes = match_hashes(df, keys)
+    reference = load_reference(path)
+    if not _changed_matches(reference, hashes):
+        return reference
+
+    with file_lock(path):
+        # 잠금을 얻는 동안 다른 워커가 같은 경기를 반영했을 수 있으므로 다시 읽음
+        reference = load_reference(path)
+        changed = _changed_matches(reference, hashes)
+        if changed:
+            for key, match_df in df.groupby(keys.to_numpy(), sort=False):
+                if key not in changed:
+                    continue
+                reference['match_sketches'][key] = match_sketches(analysis.build_player_stats(match_df))
+                reference['match_hashes'][key] = hashes[key]
+            reference['match_ids'] = sorted(reference['match_sketches'])
+            reference['sketches'] = _merged_sketches(reference['match_sketches'])
+            _save_reference(reference, path)
+    return reference
+
+
+def apply_percentile_scores(all_stats, reference):
+    """
+    각 *_Score를 기준 분포 대비 백분위(0~100)로 바꿉니다.
+    기준 분포가 비어 있는 점수는 기존 시그모이드 점수를 유지하고, 시도 횟수가 0인 비율형 점수는 50입니다.
+    """
+    for raw_col, score_col in RAW_SCORE_COLUMNS.items():
+        sketch = reference['sketches'].get(raw_col)
+        if raw_col not in all_stats.columns or sketch is None or sketch.count == 0:
+            continue
+        scores = np.rint(sketch.cdf(all_stats[raw_col].to_numpy(dtype=float)) * 100)
+        action_col = RAW_SCORE_ACTIONS.get(raw_col)
+        if action_col in all_stats.columns:
+            scores = np.where(all_stats[action_col].to_numpy() == 0, 50, scores)
+        all_stats[score_col] = np.nan_to_num(scores, nan=50).astype(int)
+    return all_stats
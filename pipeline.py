@@ -0,0 +1,357 @@
+import os
+import sys
+import pickle
+import types
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import analysis
+import scoring
+import xg_model
+from schema import normalize_events, mark_analyzed
+from stats_utils import convert_time_to_seconds, add_zone_index
+from storage import DATA_DIR, atomic_write_bytes, maybe_prune_directory
+
+# --- 단계(Stage) 정의 ---
+# kind='columns': 이벤트 프레임의 inputs 컬럼만 받아 outputs 컬럼을 추가하는 단계
+# kind='frame'  : inputs(이벤트 컬럼 또는 앞 단계 이름)를 받아 DataFrame을 반환하는 단계
+#                 ('단계명:컬럼1,컬럼2' 형식이면 앞 단계 결과 중 해당 컬럼만 입력으로 사용)
+# 각 단계의 결과는 (단계 코드 해시, 입력 해시)로 메모이즈되므로, 입력 컬럼이나 단계 코드(가중치 등)가
+# 바뀐 단계와 그 하위 단계만 다시 계산됩니다.
+Stage = namedtuple('Stage', ['name', 'kind', 'func', 'inputs', 'outputs'])
+
+CACHE_ENTRIES = int(os.environ.get('FPA_PIPELINE_CACHE_ENTRIES', '256'))
+# 디스크 계층: 워커 프로세스 간, 재시작 후에도 단계 결과를 재사용 (0이면 사용하지 않음)
+CACHE_DIR = os.path.join(DATA_DIR, 'pipeline_cache')
+DISK_LIMIT_BYTES = int(float(os.environ.get('FPA_PIPELINE_CACHE_DISK_MB', '256')) * 1024 * 1024)
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_code_hashes = {}
+
+
+# --- 이벤트 단계 래퍼 ---
+# 행 순서는 analyze_events에서 No 기준으로 한 번 정렬해 두므로, No 대신 행 번호를 넘겨
+# 내부 정렬/병합이 행을 바꾸지 않도록 합니다. (No가 중복된 여러 경기 파일에서도 행이 유지됨)
+def _with_row_numbers(df):
+    return df.assign(No=np.arange(len(df)))
+
+def _tag_key_passes(df):
+    return analysis.auto_tag_key_pass_and_assist(_with_row_numbers(df))
+
+def _add_xg(df):
+    return analysis.add_xg_to_data(_with_row_numbers(df))
+
+def _player_stats_base(df, pass_summary, shooter_summary, cross_summary, advanced_summary):
+    all_stats = pd.DataFrame(index=df['Player'].unique())
+    return all_stats.join([pass_summary, shooter_summary, cross_summary, advanced_summary], how='outer').fillna(0)
+
+def _passing_score(summary):
+    return scoring.calculate_passing_score(summary, summary)
+
+def _advanced_scores(summary):
+    return scoring.calculate_advanced_scores(summary, summary)
+
+
+COORDS = ['StartX', 'StartY', 'EndX', 'EndY']
+ADJ_COORDS = ['StartX_adj', 'StartY_adj', 'EndX_adj', 'EndY_adj']
+ZONES = ['Start_Zone', 'Start_Grid', 'End_Zone', 'End_Grid']
+
+EVENT_STAGES = [
+    Stage('time', 'columns', convert_time_to_seconds, ['Time'], ['Time(s)']),
+    Stage('key_pass_tags', 'columns', _tag_key_passes, ['Action', 'Tags', 'TeamID', 'Player'], ['Tags']),
+    Stage('possessions', 'columns', analysis.assign_possessions,
+          ['MatchID', 'TeamID', 'Half', 'Action', 'Time(s)'], ['PossessionID', 'Possession_Seq']),
+    Stage('pass_geometry', 'columns', analysis.analyze_pass_data, COORDS + ['Direction'],
+          ADJ_COORDS + ['Distance', 'Pass_Distance', 'Angle', 'Pass_Direction']),
+    Stage('zones', 'columns', add_zone_index, ADJ_COORDS, ZONES),
+    Stage('xg', 'columns', _add_xg, ['Action', 'Tags', 'StartX_adj', 'StartY_adj'], ['xG']),
+]
+
+SUMMARY_STAGES = [
+    Stage('pass_summary', 'frame', analysis.create_player_summary,
+          ['Player', 'Action', 'Tags', 'Pass_Direction', 'Pass_Distance'] + ADJ_COORDS + ZONES, None),
+    Stage('shooter_summary', 'frame', analysis.create_shooter_summary, ['Player', 'Action', 'Tags', 'xG', 'TeamID'], None),
+    Stage('cross_summary', 'frame', analysis.create_cross_summary, ['Player', 'Action', 'Tags'] + ADJ_COORDS + ZONES, None),
+    Stage('advanced_summary', 'frame', analysis.create_advanced_summary,
+          ['Player', 'Action', 'Tags', 'Distance'] + ADJ_COORDS + ZONES, None),
+    Stage('player_stats', 'frame', _player_stats_base,
+          ['Player', 'pass_summary', 'shooter_summary', 'cross_summary', 'advanced_summary'], None),
+]
+
+# 점수 단계: player_stats 중 필요한 컬럼만 입력으로 받아 Raw/Score 컬럼을 출력 (선언 순서 = 기존 계산 순서)
+# 기존 컬럼을 다시 출력하면 calculate_all_scores와 같이 해당 컬럼이 끝으로 이동합니다. (passing_score의 Pass_Fail_Count)
+SCORE_STAGES = [
+    Stage('passing_score', 'frame', _passing_score,
+          ['player_stats:Pass_Success_Rate,Progressive_Pass_Success,Key_Pass,Assist,PA_Pass_Success,Pass_Fail_Count'],
+          ['Pass_Fail_Count', 'Passing_Raw', 'Passing_Score']),
+    Stage('buildup_score', 'frame', scoring.calculate_buildup_score,
+          ['player_stats:Own_Half_Pass_Score,Own_Half_Pass_Fail'], ['BLD_Raw', 'BLD_Score']),
+    Stage('shooting_score', 'frame', scoring.calculate_shooting_score,
+          ['player_stats:Goals,Total_xG,Headed_Goals,Outbox_Goals'], ['Shooting_Raw', 'Shooting_Score']),
+    Stage('save_score', 'frame', scoring.calculate_save_score,
+          ['player_stats:Total_SOT_xG_Conceded,Goals_Conceded,Catch_Count'], ['SAV_Raw', 'SAV_Score']),
+    Stage('cross_score', 'frame', scoring.calculate_cross_score,
+          ['player_stats:Cross_Accuracy,Successful_Crosses,Central_PA_Cross_Success'], ['Raw_Cross_Score', 'Cross_Score']),
+    Stage('dribbling_score', 'frame', scoring.calculate_dribbling_score,
+          ['player_stats:Dribble_Attempt,Breakthrough_Success,Miss_Count,Be_Fouled'], ['Dribbling_Raw', 'Dribbling_Score']),
+    Stage('drive_score', 'frame', scoring.calculate_drive_score,
+          ['player_stats:Valid_Dribble_Distance,Dribble_Fail_Count'], ['DRV_Raw', 'DRV_Score']),
+    Stage('tackling_score', 'frame', scoring.calculate_tackling_score,
+          ['player_stats:Successful_Tackles,Total_Tackles,Intercept_Count,Block_Count,Clear_Count,'
+           'Aerial_Duels_Won,Total_Aerial_Duels,Duel_Win_Count'], ['TAC_Raw', 'TAC_Score']),
+    Stage('header_score', 'frame', scoring.calculate_header_score,
+          ['player_stats:Header_SOT,Headed_Goals,Aerial_Duels_Won,Header_Clear,Aerial_Duels_Lost'], ['HED_Raw', 'HED_Score']),
+    Stage('pace_score', 'frame', scoring.calculate_pace_score,
+          ['player_stats:Total_Sprint_Distance,Sprint_Count'], ['PAC_Raw', 'PAC_Score']),
+    Stage('advanced_scores', 'frame', _advanced_scores,
+          ['player_stats:Pass_Success_Count,Breakthrough_Success,Pass_Fail_Count,Miss_Count,Received_Assist,'
+           'Received_Key_Pass,SOT_Count,Goal_Count,Offside_Count,FT_Pass_Success,FT_Breakthrough_Success,'
+           'FT_Pass_Fail,FT_Miss,FT_Offside'],
+          ['FST_Raw', 'FST_Actions', 'FST_Score', 'OFF_Raw', 'OFF_Score', 'DEC_Raw', 'DEC_Actions', 'DEC_Score']),
+]
+
+# 디스크 계층에도 저장하는 단계: 다시 계산하는 비용이 파일 읽기/쓰기보다 큰 단계만
+# (좌표 변환/구역/xG/점수 단계는 수 ms로 다시 계산하는 편이 pickle 파일을 읽는 것보다 빠름)
+DISK_STAGES = {'time', 'key_pass_tags', 'pass_summary', 'shooter_summary', 'cross_summary', 'advanced_summary'}
+
+# 코드 밖의 상태에 의존하는 단계 -> 캐시 키에 더할 값 (xG는 활성 모델의 계수)
+STAGE_STATE = {
+    'xg': lambda: xg_model.active_model()['coef'].tobytes().hex(),
+}
+
+
+# --- 해시 ---
+def _code_hash(func, _seen=None):
+    """
+    함수 코드(바이트코드, 상수)와 그 함수가 호출하는 프로젝트 함수들의 코드를 합친 해시.
+    가중치 상수나 호출하는 점수 함수가 바뀌면 값이 바뀌어 해당 단계의 캐시가 무효화됩니다.
+    """
+    if _seen is None and func in _code_hashes:
+        return _code_hashes[func]
+    seen = set() if _seen is None else _seen
+    seen.add(func)
+
+    h = hashlib.sha256()
+    names = set()
+    codes = [func.__code__]
+    while codes:
+        code = codes.pop()
+        h.update(code.co_code)
+        h.update(repr(code.co_names).encode())
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                codes.append(const)
+            else:
+                h.update(repr(const).encode())
+        names.update(code.co_names)
+
+    # 전역 이름(함수) 또는 프로젝트 모듈 속성(analysis.xxx)으로 호출하는 함수까지 포함
+    scopes = [func.__globals__] + [vars(m) for m in func.__globals__.values()
+                                   if isinstance(m, types.ModuleType) and _is_project_module(m)]
+    for name in sorted(names):
+        for scope in scopes:
+            target = scope.get(name)
+            if isinstance(target, types.FunctionType) and target not in seen \
+                    and _is_project_module(sys.modules.get(target.__module__)):
+                h.update(_code_hash(target, seen).encode())
+                break
+
+    digest = h.hexdigest()
+    if _seen is None:
+        _code_hashes[func] = digest
+    return digest
+
+def _is_project_module(module):
+    path = getattr(module, '__file__', None)
+    return bool(path) and os.path.dirname(os.path.abspath(path)) == _PROJECT_DIR
+
+
+def _hash_frame(frame):
+    h = hashlib.sha256()
+    h.update(repr(list(frame.columns)).encode())
+    h.update(pd.util.hash_pandas_object(frame.index.to_series(), index=False).to_numpy().tobytes())
+    for col in frame.columns:
+        h.update(str(frame[col].dtype).encode())
+        h.update(pd.util.hash_pandas_object(frame[col], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# --- 메모이즈 캐시 (메모리 LRU + 디스크) ---
+def _disk_path(key):
+    return os.path.join(CACHE_DIR, key[:2], key + '.pkl')
+
+def _remember(key, value):
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+
+def _cache_get(key, persist=True):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    if not persist or DISK_LIMIT_BYTES <= 0:
+        return None
+    path = _disk_path(key)
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+        os.utime(path)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    _remember(key, value)
+    return value
+
+def _cache_put(key, value, persist=True):
+    _remember(key, value)
+    if not persist or DISK_LIMIT_BYTES <= 0:
+        return
+    try:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        atomic_write_bytes(_disk_path(key), data)
+        maybe_prune_directory(CACHE_DIR, DISK_LIMIT_BYTES, '.pkl', len(data))
+    except OSError:
+        pass
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+# --- 실행 ---
+def _levels(stages, available):
+    """
+    선언 순서를 유지하면서, 입력이 모두 준비된 단계끼리 묶은 실행 단계(level) 목록을 반환합니다.
+    컬럼의 생산자는 그 컬럼을 출력하는 가장 가까운 앞 단계입니다.
+    """
+    producer = {}
+    depth = {}
+    for stage in stages:
+        deps = []
+        for spec in stage.inputs:
+            name = spec.split(':', 1)[0]
+            if name in producer:
+                deps.append(producer[name])
+            elif name not in available:
+                raise KeyError(f"stage '{stage.name}': unknown input '{name}'")
+        depth[stage.name] = 1 + max((depth[d] for d in deps), default=-1)
+        for out in (stage.outputs if stage.kind == 'columns' else []) or []:
+            producer[out] = stage.name
+        producer[stage.name] = stage.name
+    levels = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for stage in stages:
+        levels[depth[stage.name]].append(stage)
+    return levels
+
+
+def _run_stage(stage, df, results, keys, column_hashes):
+    parts = [stage.name, _code_hash(stage.func)]
+    if stage.name in STAGE_STATE:
+        parts.append(STAGE_STATE[stage.name]())
+    args = []
+    columns = []
+    for spec in stage.inputs:
+        name, _, cols = spec.partition(':')
+        if name in results:
+            if cols:
+                frame = results[name][cols.split(',')]
+                parts.append(_hash_frame(frame))
+                args.append(frame)
+            else:
+                parts.append(keys[name])
+                args.append(results[name])
+        else:
+            columns.append(name)
+            if name not in column_hashes:
+                column_hashes[name] = _hash_frame(df[[name]])
+            parts.append(column_hashes[name])
+    key = hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+    persist = stage.name in DISK_STAGES
+    cached = _cache_get(key, persist)
+    if cached is None:
+        if stage.kind == 'columns':
+            out = stage.func(df[columns].copy())
+            cached = {col: out[col].to_numpy() for col in stage.outputs}
+        else:
+            inputs = [df[columns].copy()] if columns else []
+            out = stage.func(*(inputs + args))
+            cached = out[stage.outputs] if stage.outputs else out
+        _cache_put(key, cached, persist)
+    if stage.kind == 'frame':
+        cached = cached.copy()
+    return key, cached
+
+
+def run_stages(stages, df, results=None, keys=None, max_workers=None):
+    """
+    stages를 DAG 순서로 실행합니다. 같은 level의 독립 단계는 스레드 풀에서 동시에 실행됩니다.
+    columns 단계의 출력은 level이 끝난 뒤 선언 순서대로 df에 추가됩니다.
+    반환: (df, {단계명: 결과}, {단계명: 캐시 키})
+    """
+    results = dict(results or {})
+    keys = dict(keys or {})
+    column_hashes = {}
+    levels = _levels(stages, set(df.columns) | set(results))
+    max_workers = max_workers or min(4, os.cpu_count() or 1)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for level in levels:
+            if len(level) == 1 or max_workers == 1:
+                outcomes = [_run_stage(stage, df, results, keys, column_hashes) for stage in level]
+            else:
+                futures = [executor.submit(_run_stage, stage, df, results, keys, column_hashes) for stage in level]
+                outcomes = [future.result() for future in futures]
+            for stage, (key, value) in zip(level, outcomes):
+                keys[stage.name] = key
+                if stage.kind == 'columns':
+                    for col, values in value.items():
+                        df[col] = values.copy()
+                        column_hashes.pop(col, None)
+                else:
+                    results[stage.name] = value
+    return df, results, keys
+
+
+def analyze_events(df, max_workers=None):
+    """
+    perform_full_analysis와 같은 결과를 단계별 메모이즈로 계산합니다.
+    이벤트 하나를 수정하면 그 컬럼에 의존하는 단계만 다시 계산됩니다.
+    """
+    if analysis.is_analyzed(df):
+        return df
+    df = normalize_events(df.copy())
+    df = df.sort_values(by='No', kind='stable').reset_index(drop=True)
+    original_columns = list(df.columns)
+    df, _, _ = run_stages(EVENT_STAGES, df, max_workers=max_workers)
+    # 컬럼 순서는 perform_full_analysis와 동일하게 (기존 컬럼 -> 단계 선언 순서의 출력)
+    outputs = [col for stage in EVENT_STAGES for col in stage.outputs]
+    df = df[list(dict.fromkeys(original_columns + outputs))]
+    return mark_analyzed(df)
+
+
+def player_stats(df, max_workers=None):
+    """
+    분석된 이벤트로 4개 요약과 선수별 Raw/Score(analysis.build_player_stats와 같은 값)를 계산합니다.
+    반환: (all_stats, {'pass_summary': ..., 'shooter_summary': ..., 'cross_summary': ..., 'advanced_summary': ...})
+    """
+    df, results, keys = run_stages(SUMMARY_STAGES, df, max_workers=max_workers)
+    _, scores, _ = run_stages(SCORE_STAGES, df, {'player_stats': results['player_stats']},
+                              {'player_stats': keys['player_stats']}, max_workers=max_workers)
+    all_stats = results['player_stats']
+    for stage in SCORE_STAGES:
+        for col in stage.outputs:
+            if col in all_stats.columns:
+                del all_stats[col]
+            all_stats[col] = scores[stage.name][col]
+    summaries = {name: results[name] for name in ('pass_summary', 'shooter_summary', 'cross_summary', 'advanced_summary')}
+    return all_stats, summaries
@@ -0,0 +1,118 @@
+import numpy as np
+
+
+class TDigest:
+    """
+    병합 가능한(mergeable) t-digest 분위수 스케치.
+
+    값 분포를 (평균, 가중치) 센트로이드 목록으로 요약합니다. 분포 양 끝에서는 센트로이드를 잘게,
+    가운데서는 크게 유지하는 k1 스케일 함수로 압축하므로 크기는 대략 compression 개로 제한됩니다.
+    두 스케치는 센트로이드를 합친 뒤 다시 압축하는 것으로 병합됩니다.
+    """
+
+    def __init__(self, compression=100, means=None, weights=None, min_value=np.inf, max_value=-np.inf):
+        self.compression = compression
+        self.means = np.asarray(means if means is not None else [], dtype=float)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=float)
+        self.min_value = float(min_value)
+        self.max_value = float(max_value)
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        """
+        값 배열을 추가합니다. (NaN은 무시)
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.min_value = min(self.min_value, float(values.min()))
+        self.max_value = max(self.max_value, float(values.max()))
+        self.means = np.concatenate([self.means, values])
+        self.weights = np.concatenate([self.weights, np.ones(values.size)])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        다른 스케치를 병합합니다. (결과는 두 데이터를 함께 넣은 스케치와 근사적으로 같음)
+        """
+        if other.count == 0:
+            return self
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        self.means = np.concatenate([self.means, other.means])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self._compress()
+        return self
+
+    def _compress(self):
+        if self.means.size <= self.compression:
+            order = np.argsort(self.means, kind='mergesort')
+            self.means, self.weights = self.means[order], self.weights[order]
+            return
+        order = np.argsort(self.means, kind='mergesort')
+        means, weights = self.means[order], self.weights[order]
+        total = weights.sum()
+        # 센트로이드 중심의 분위수를 k1 스케일(arcsin)로 변환하여 같은 정수 구간끼리 병합
+        q_mid = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_mid - 1)
+        bucket = np.floor(k - k[0]).astype(np.int64)
+        _, bucket = np.unique(bucket, return_inverse=True)
+        merged_weights = np.bincount(bucket, weights=weights)
+        self.means = np.bincount(bucket, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+
+    def cdf(self, values):
+        """
+        각 값의 누적 분포 F(x) (0~1)를 반환합니다. 같은 값이 많으면 그 질량의 가운데를 돌려줍니다.
+        """
+        values = np.asarray(values, dtype=float)
+        if self.count == 0:
+            return np.full(values.shape, np.nan)
+        upper = np.cumsum(self.weights) / self.count
+        lower = upper - self.weights / self.count
+        # 같은 평균의 센트로이드(점 질량)는 하나로 묶어 [하한, 상한] 분위수 구간의 가운데를 사용
+        unique_xs, first = np.unique(self.means, return_index=True)
+        last = np.r_[first[1:], self.means.size] - 1
+        xs, qs = unique_xs, (lower[first] + upper[last]) / 2
+        if self.min_value < xs[0]:
+            xs, qs = np.r_[self.min_value, xs], np.r_[0.0, qs]
+        if self.max_value > xs[-1]:
+            xs, qs = np.r_[xs, self.max_value], np.r_[qs, 1.0]
+        if xs.size == 1:
+            result = np.where(values < xs[0], 0.0, np.where(values > xs[0], 1.0, 0.5))
+        else:
+            result = np.interp(values, xs, qs, left=0.0, right=1.0)
+        return np.where(np.isnan(values), np.nan, result)
+
+    def quantile(self, q):
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        positions = (np.cumsum(self.weights) - self.weights / 2) / self.count
+        xs = np.concatenate([[self.min_value], self.means, [self.max_value]])
+        qs = np.concatenate([[0.0], positions, [1.0]])
+        return np.interp(q, qs, xs)
+
+    def to_dict(self):
+        return {
+            'compression': self.compression,
+            'means': self.means.round(6).tolist(),
+            'weights': self.weights.tolist(),
+            'min': self.min_value if np.isfinite(self.min_value) else None,
+            'max': self.max_value if np.isfinite(self.max_value) else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            compression=data.get('compression', 100),
+            means=data.get('means', []),
+            weights=data.get('weights', []),
+            min_value=data['min'] if data.get('min') is not None else np.inf,
+            max_value=data['max'] if data.get('max') is not None else -np.inf,
+        )
@@ -0,0 +1,109 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import schema
+from storage import DATA_DIR, content_hash, atomic_write_bytes, maybe_prune_directory
+
+# --- 상수 ---
+# 시각화 스타일이 바뀌면 올려서 기존 캐시를 무효화합니다.
+RENDER_VERSION = 1
+MEMORY_LIMIT_BYTES = int(os.environ.get('FPA_RENDER_CACHE_MEMORY_MB', '64')) * 1024 * 1024
+DISK_LIMIT_BYTES = int(os.environ.get('FPA_RENDER_CACHE_DISK_MB', '512')) * 1024 * 1024
+CACHE_DIR = os.path.join(DATA_DIR, 'render_cache')
+
+_memory = OrderedDict()
+_memory_bytes = 0
+_lock = threading.Lock()
+
+
+def dataset_hash(file_bytes):
+    """
+    업로드된 파일 내용으로 데이터셋 해시를 계산합니다.
+    """
+    return content_hash(file_bytes)
+
+
+def make_key(data_hash, player_id, vis_type, options=None):
+    """
+    (데이터셋 해시, 선수, 시각화 종류, 렌더 옵션)으로 캐시 키를 만듭니다.
+    """
+    player_id = schema.player_id(player_id)
+    payload = json.dumps([RENDER_VERSION, data_hash, player_id, vis_type, options or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _disk_path(key):
+    return os.path.join(CACHE_DIR, key[:2], key + '.bin')
+
+
+def _remember(key, value):
+    # 메모리 LRU에 넣고, 한도를 넘으면 가장 오래된 항목부터 제거
+    global _memory_bytes
+    with _lock:
+        if key in _memory:
+            _memory_bytes -= len(_memory.pop(key))
+        _memory[key] = value
+        _memory_bytes += len(value)
+        while _memory_bytes > MEMORY_LIMIT_BYTES and len(_memory) > 1:
+            _, evicted = _memory.popitem(last=False)
+            _memory_bytes -= len(evicted)
+
+
+def get(key):
+    """
+    캐시에서 값을 찾습니다. 메모리 -> 디스크 순으로 조회하며, 없으면 None을 반환합니다.
+    """
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+
+    path = _disk_path(key)
+    try:
+        with open(path, 'rb') as f:
+            value = f.read()
+        os.utime(path)  # 디스크 LRU 순서 갱신
+    except OSError:
+        return None
+    _remember(key, value)
+    return value
+
+
+def put(key, value):
+    """
+    값을 메모리와 디스크 양쪽에 저장합니다. 디스크 용량이 한도를 넘으면 오래된 파일부터 지웁니다
+    (디렉토리 정리는 storage.maybe_prune_directory의 주기로만 실행).
+    """
+    _remember(key, value)
+    try:
+        atomic_write_bytes(_disk_path(key), value)
+        maybe_prune_directory(CACHE_DIR, DISK_LIMIT_BYTES, '.bin', len(value))
+    except OSError:
+        # 디스크 캐시 실패는 렌더링 결과에 영향을 주지 않음
+        pass
+
+
+def get_or_render(data_hash, player_id, vis_type, render_fn, options=None):
+    """
+    캐시에 있으면 저장된 base64 이미지를, 없으면 render_fn()을 실행해 결과를 저장 후 반환합니다.
+    render_fn이 None을 반환하면 캐시하지 않습니다.
+    """
+    key = make_key(data_hash, player_id, vis_type, options)
+    cached = get(key)
+    if cached is not None:
+        return cached.decode('ascii')
+
+    image = render_fn()
+    if image is not None:
+        put(key, image.encode('ascii'))
+    return image
+
+
+def clear_memory():
+    global _memory_bytes
+    with _lock:
+        _memory.clear()
+        _memory_bytes = 0
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# --- 이벤트 데이터 표준 스키마 ---
+# 정규화를 마친 DataFrame에는 df.attrs[SCHEMA_ATTR] = SCHEMA_VERSION 이 기록되며,
+# 같은 버전이 기록된 프레임은 다시 정규화하지 않습니다. (스키마를 바꾸면 버전을 올릴 것)
+SCHEMA_VERSION = 1
+SCHEMA_ATTR = 'fpa_schema_version'
+# perform_full_analysis까지 마친 프레임에 기록되는 분석 버전과 행 수
+# (분석 단계나 분석 컬럼을 바꾸면 ANALYSIS_VERSION을 올릴 것)
+ANALYSIS_VERSION = 1
+ANALYSIS_ATTR = 'fpa_analysis_version'
+ANALYSIS_ROWS_ATTR = 'fpa_analysis_rows'
+
+EVENT_COLUMNS = ["No", "MatchID", "TeamID", "Half", "Team", "Direction", "Time", "Player", "Receiver", "Action", "StartX", "StartY", "EndX", "EndY", "Tags"]
+COORD_COLUMNS = ['StartX', 'StartY', 'EndX', 'EndY']
+TEXT_COLUMNS = ['Action', 'Tags']
+PLAYER_COLUMNS = ['Player', 'Receiver']
+# 분석을 마친 데이터(내보낸 엑셀의 Data 시트)에 항상 있는 컬럼
+ANALYZED_COLUMNS = ['Time(s)', 'StartX_adj', 'StartY_adj', 'EndX_adj', 'EndY_adj', 'xG']
+
+
+def player_id(value):
+    """
+    선수 번호 하나를 표준 문자열로 변환합니다. (엑셀의 10.0 -> '10', 결측 -> '')
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    return str(value).replace('.0', '').strip()
+
+
+def player_keys(series):
+    """
+    선수 번호 컬럼을 표준 문자열로 변환합니다.
+    문자열 처리는 고유값에만 적용하고 factorize 코드로 되돌립니다.
+    """
+    codes, uniques = pd.factorize(series)
+    labels = pd.Index(uniques).astype(str).str.replace('.0', '', regex=False).str.strip()
+    return np.append(np.asarray(labels, dtype=object), '')[codes]
+
+
+def is_canonical(df):
+    return df.attrs.get(SCHEMA_ATTR) == SCHEMA_VERSION
+
+
+def is_analyzed(df):
+    """
+    분석 표시가 현재 버전이고, 표시 후 행이 바뀌지 않았으며(필터/슬라이스/병합한 파생 프레임 제외)
+    분석 컬럼이 모두 남아 있으면 True입니다. df.attrs는 .copy()와 슬라이스에도 따라가므로 표시만으로 판단하지 않습니다.
+    (분석된 프레임의 이벤트 값을 직접 수정하는 코드는 invalidate_analysis를 호출할 것)
+    """
+    return (is_canonical(df) and df.attrs.get(ANALYSIS_ATTR) == ANALYSIS_VERSION
+            and df.attrs.get(ANALYSIS_ROWS_ATTR) == len(df)
+            and all(col in df.columns for col in ANALYZED_COLUMNS))
+
+
+def normalize_events(df):
+    """
+    이벤트 DataFrame을 표준 스키마로 정규화합니다. (df를 직접 수정하고 반환)
+    - 누락된 기본 컬럼 추가 (No는 1부터 순번)
+    - 좌표: 숫자형 (변환 불가 값은 NaN)
+    - Player/Receiver: 표준 선수 번호 문자열, Action/Tags: 결측 없는 문자열
+    이미 같은 버전으로 정규화된 프레임은 그대로 반환합니다.
+    """
+    if is_canonical(df):
+        return df
+
+    for col in EVENT_COLUMNS:
+        if col not in df.columns:
+            if col == 'No':
+                df[col] = np.arange(1, len(df) + 1)
+            else:
+                df[col] = np.nan if col in COORD_COLUMNS else ''
+
+    for col in COORD_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    for col in PLAYER_COLUMNS:
+        df[col] = player_keys(df[col])
+    for col in TEXT_COLUMNS:
+        df[col] = df[col].fillna('').astype(str)
+
+    df.attrs[SCHEMA_ATTR] = SCHEMA_VERSION
+    return df
+
+
+def mark_analyzed(df):
+    df.attrs[SCHEMA_ATTR] = SCHEMA_VERSION
+    df.attrs[ANALYSIS_ATTR] = ANALYSIS_VERSION
+    df.attrs[ANALYSIS_ROWS_ATTR] = len(df)
+    return df
+
+
+def invalidate_analysis(df):
+    """
+    이벤트 값을 수정한 프레임의 정규화/분석 표시를 무효화합니다. 분석 컬럼이 남아 있어도
+    다음 ensure_analyzed에서 다시 정규화/분석됩니다.
+    """
+    df.attrs.pop(SCHEMA_ATTR, None)
+    df.attrs.pop(ANALYSIS_ROWS_ATTR, None)
+    df.attrs[ANALYSIS_ATTR] = 0
+    return df
+
+
+def was_analyzed(df):
+    # 분석 표시가 있었던 프레임 (현재 유효하지 않더라도): 분석 컬럼만 보고 분석된 것으로 간주하면 안 됨
+    return ANALYSIS_ATTR in df.attrs
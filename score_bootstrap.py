@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from percentile_scoring import apply_percentile_scores
+from scoring import calculate_all_scores
+from summaries import build_event_counters, summarize_event_counters
+
+# --- 상수 ---
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+# 상대팀 이벤트로 정해지는 팀 단위 지표: 선수 이벤트 리샘플과 무관하므로 원래 값을 그대로 사용
+FIXED_COLUMNS = ['Total_SOT_xG_Conceded', 'Goals_Conceded']
+
+
+def resample_player_counters(df, n_resamples=DEFAULT_RESAMPLES, seed=0):
+    """
+    선수마다 자기 이벤트를 복원 추출(다항분포 가중치)한 n_resamples개의 리샘플에 대해 카운터 합계를 구합니다.
+    선수별로 (리샘플 x 이벤트) 가중치 행렬 @ (이벤트 x 카운터) 행렬 한 번으로 모든 리샘플을 계산합니다.
+    반환: (players, sums[n_resamples, 선수 수, 카운터 수], 카운터 이름 목록)
+    """
+    counters = build_event_counters(df)
+    codes, players = pd.factorize(df['Player'])
+    values = counters.to_numpy()
+
+    valid = codes >= 0
+    order = np.argsort(codes[valid], kind='stable')
+    values = values[valid][order]
+    sizes = np.bincount(codes[valid], minlength=len(players))
+    bounds = np.r_[0, np.cumsum(sizes)]
+
+    rng = np.random.default_rng(seed)
+    sums = np.zeros((n_resamples, len(players), values.shape[1]))
+    for p, n_events in enumerate(sizes):
+        if n_events == 0:
+            continue
+        weights = rng.multinomial(n_events, np.full(n_events, 1 / n_events), size=n_resamples)
+        sums[:, p, :] = weights @ values[bounds[p]:bounds[p + 1]]
+    return players, sums, list(counters.columns)
+
+
+def bootstrap_score_intervals(df, all_stats, n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE,
+                              seed=0, reference=None):
+    """
+    *_Score 컬럼별 부트스트랩 신뢰구간을 계산합니다.
+    리샘플 전체(n_resamples x 선수)를 한 DataFrame으로 만들어 기존 점수 함수를 한 번만 실행합니다.
+    reference: 백분위 점수 모드의 기준 분포 (percentile_scoring.update_reference 결과)
+    반환: 선수별 <Score>_Low / <Score>_High DataFrame
+    """
+    players, sums, names = resample_player_counters(df, n_resamples, seed)
+    n_players = len(players)
+    if n_players == 0:
+        return pd.DataFrame()
+
+    resampled = pd.DataFrame(sums.reshape(-1, len(names)), columns=names)
+    resampled = summarize_event_counters(resampled)
+    for col in FIXED_COLUMNS:
+        fixed = all_stats[col].reindex(players).fillna(0).to_numpy() if col in all_stats.columns else np.zeros(n_players)
+        resampled[col] = np.tile(fixed, n_resamples)
+
+    resampled = calculate_all_scores(resampled)
+    if reference is not None:
+        resampled = apply_percentile_scores(resampled, reference)
+
+    score_cols = [col for col in resampled.columns if '_Score' in col]
+    alpha = (1 - confidence) / 2 * 100
+    intervals = pd.DataFrame(index=pd.Index(players, name='Player'))
+    for col in score_cols:
+        scores = resampled[col].to_numpy(dtype=float).reshape(n_resamples, n_players)
+        low, high = np.percentile(scores, [alpha, 100 - alpha], axis=0)
+        intervals[f'{col}_Low'] = np.rint(low).astype(int)
+        intervals[f'{col}_High'] = np.rint(high).astype(int)
+    return intervals
@@ -196,6 +196,7 @@ def calculate_advanced_scores(summary, pass_summary):
     fst_num = summary['Pass_Success_Count'] + summary['Breakthrough_Success']
     fst_denom = fst_num + summary['Pass_Fail_Count'] + summary['Miss_Count']
     summary['FST_Raw'] = (fst_num / fst_denom).fillna(0) * 100
+    summary['FST_Actions'] = fst_denom
     
     # Default 50 if no actions
     fst_scores = sigmoid_score(summary['FST_Raw'], 80, 0.15)
@@ -209,9 +210,37 @@ def calculate_advanced_scores(summary, pass_summary):
     dec_num = summary['FT_Pass_Success'] + summary['FT_Breakthrough_Success']
     dec_denom = dec_num + summary['FT_Pass_Fail'] + summary['FT_Miss'] + summary['FT_Offside']
     summary['DEC_Raw'] = (dec_num / dec_denom).fillna(0) * 100
+    summary['DEC_Actions'] = dec_denom
     
     # Default 50 if no actions
     dec_scores = sigmoid_score(summary['DEC_Raw'], 80, 0.15)
     summary['DEC_Score'] = np.where(dec_denom == 0, 50, dec_scores).astype(int)
     
     return summary
+
+# Raw 점수 컬럼 -> 최종 점수 컬럼 (백분위 점수 모드에서 사용)
+RAW_SCORE_COLUMNS = {
+    'Passing_Raw': 'Passing_Score', 'BLD_Raw': 'BLD_Score', 'Shooting_Raw': 'Shooting_Score',
+    'SAV_Raw': 'SAV_Score', 'Raw_Cross_Score': 'Cross_Score', 'Dribbling_Raw': 'Dribbling_Score',
+    'DRV_Raw': 'DRV_Score', 'TAC_Raw': 'TAC_Score', 'HED_Raw': 'HED_Score', 'PAC_Raw': 'PAC_Score',
+    'FST_Raw': 'FST_Score', 'OFF_Raw': 'OFF_Score', 'DEC_Raw': 'DEC_Score',
+}
+# 비율형 Raw 점수: 시도 횟수가 0이면 점수 50으로 고정하고 기준 분포에서도 제외
+RAW_SCORE_ACTIONS = {'FST_Raw': 'FST_Actions', 'DEC_Raw': 'DEC_Actions'}
+
+def calculate_all_scores(summary):
+    """
+    병합된 선수 요약(summary)에 모든 Raw/Score 컬럼을 계산합니다.
+    """
+    summary = calculate_passing_score(summary, summary)
+    summary = calculate_buildup_score(summary)
+    summary = calculate_shooting_score(summary)
+    summary = calculate_save_score(summary)
+    summary = calculate_cross_score(summary)
+    summary = calculate_dribbling_score(summary)
+    summary = calculate_drive_score(summary)
+    summary = calculate_tackling_score(summary)
+    summary = calculate_header_score(summary)
+    summary = calculate_pace_score(summary)
+    summary = calculate_advanced_scores(summary, summary)
+    return summary
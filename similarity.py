@@ -0,0 +1,216 @@
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import pipeline
+from scoring import RAW_SCORE_COLUMNS
+from stats_utils import match_keys, match_hashes
+from storage import DATA_DIR, atomic_write_bytes, file_lock
+
+# --- 상수 ---
+# 선수-경기 단위 벡터: Final_Stats의 13개 점수 + 대응하는 Raw 값
+SCORE_FEATURES = list(RAW_SCORE_COLUMNS.values())
+RAW_FEATURES = list(RAW_SCORE_COLUMNS)
+FEATURE_COLUMNS = SCORE_FEATURES + RAW_FEATURES
+FEATURE_SETS = {'scores': SCORE_FEATURES, 'raw': RAW_FEATURES, 'all': FEATURE_COLUMNS}
+DEFAULT_K = 10
+MAX_K = 100
+# 이 행 수 이상, 차원 수 이하일 때만 KD-tree를 만듦 (작은 인덱스나 고차원에서는 전체 탐색이 더 빠름)
+TREE_MIN_ROWS = 2000
+TREE_MAX_DIMS = 16
+
+INDEX_PATH = os.path.join(DATA_DIR, 'similarity_index.npz')
+
+_searchers = {}
+_searchers_lock = threading.Lock()
+
+
+def _empty_index():
+    return {
+        'indexed_matches': np.array([], dtype=str), 'match_hashes': np.array([], dtype=str),
+        'match_ids': np.array([], dtype=str), 'players': np.array([], dtype=str), 'teams': np.array([], dtype=str),
+        'columns': np.array(FEATURE_COLUMNS, dtype=str),
+        'features': np.zeros((0, len(FEATURE_COLUMNS))),
+        'mean': np.zeros(len(FEATURE_COLUMNS)), 'std': np.ones(len(FEATURE_COLUMNS)),
+        'normalized': np.zeros((0, len(FEATURE_COLUMNS)), dtype=np.float32),
+    }
+
+
+def load_index(path=INDEX_PATH):
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            index = {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return _empty_index()
+    if index.get('columns', np.zeros(0)).tolist() != FEATURE_COLUMNS:
+        # 특징 컬럼이 바뀐 경우 다시 구축
+        return _empty_index()
+    if 'match_hashes' not in index:
+        # 경기 내용 해시가 없는 이전 형식: 다시 내보낸 경기는 모두 교체
+        index['match_hashes'] = np.full(len(index['indexed_matches']), '', dtype=str)
+    return index
+
+
+def _save_index(index, path):
+    buffer = io.BytesIO()
+    np.savez(buffer, **index)
+    atomic_write_bytes(path, buffer.getvalue())
+
+
+def _normalize(index):
+    """
+    컬럼별 z-score로 정규화한 행렬을 갱신합니다. (표준편차 0인 컬럼은 1로 나눔)
+    """
+    features = index['features']
+    mean = features.mean(axis=0) if len(features) else np.zeros(features.shape[1])
+    std = features.std(axis=0) if len(features) else np.ones(features.shape[1])
+    std = np.where(std > 0, std, 1.0)
+    index['mean'], index['std'] = mean, std
+    index['normalized'] = ((features - mean) / std).astype(np.float32)
+    return index
+
+
+def player_match_vectors(df_analyzed):
+    """
+    경기별 선수 특징 벡터를 계산합니다. (선수 번호가 없는 이벤트 제외)
+    반환: DataFrame [Match_ID, Player, TeamID] + FEATURE_COLUMNS
+    """
+    keys = match_keys(df_analyzed)
+    frames = []
+    for key, match_df in df_analyzed.groupby(keys.to_numpy(), sort=False):
+        stats, _ = pipeline.player_stats(match_df)
+        stats = stats[stats.index != '']
+        teams = match_df.groupby('Player')['TeamID'].first()
+        frame = stats[FEATURE_COLUMNS].astype(float)
+        frame.insert(0, 'TeamID', teams.reindex(frame.index).fillna('').astype(str).to_numpy())
+        frame.insert(0, 'Player', frame.index.astype(str))
+        frame.insert(0, 'Match_ID', key)
+        frames.append(frame.reset_index(drop=True))
+    if not frames:
+        return pd.DataFrame(columns=['Match_ID', 'Player', 'TeamID'] + FEATURE_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _changed_matches(index, hashes):
+    stored = dict(zip(index['indexed_matches'].tolist(), index['match_hashes'].tolist()))
+    return sorted(key for key, digest in hashes.items() if stored.get(key) != digest)
+
+
+def update_index(df_analyzed, path=INDEX_PATH):
+    """
+    df의 경기 중 인덱스에 없거나 내용이 바뀐 경기(전반 종료 후 내보낸 경기를 다시 내보낸 경우 등)의
+    선수 벡터를 새로 계산해 이전 행을 교체하고, 정규화 행렬을 다시 계산해 저장합니다.
+    바뀐 경기가 없으면 아무것도 하지 않습니다. 반환: 추가(교체)된 행 수
+    """
+    keys = match_keys(df_analyzed)
+    hashes = match_hashes(df_analyzed, keys)
+    if not _changed_matches(load_index(path), hashes):
+        return 0
+
+    with file_lock(path):
+        # 잠금을 얻는 동안 다른 워커가 같은 경기를 반영했을 수 있으므로 다시 읽음
+        index = load_index(path)
+        changed = _changed_matches(index, hashes)
+        if not changed:
+            return 0
+        vectors = player_match_vectors(df_analyzed[keys.isin(changed).to_numpy()])
+        keep = ~np.isin(index['match_ids'], changed)
+        index['match_ids'] = np.concatenate([index['match_ids'][keep], vectors['Match_ID'].to_numpy(dtype=str)])
+        index['players'] = np.concatenate([index['players'][keep], vectors['Player'].to_numpy(dtype=str)])
+        index['teams'] = np.concatenate([index['teams'][keep], vectors['TeamID'].to_numpy(dtype=str)])
+        index['features'] = np.vstack([index['features'][keep], vectors[FEATURE_COLUMNS].to_numpy(dtype=float)])
+        stored = dict(zip(index['indexed_matches'].tolist(), index['match_hashes'].tolist()))
+        stored.update((key, hashes[key]) for key in changed)
+        index['indexed_matches'] = np.array(sorted(stored), dtype=str)
+        index['match_hashes'] = np.array([stored[key] for key in sorted(stored)], dtype=str)
+        _save_index(_normalize(index), path)
+    return len(vectors)
+
+
+def _kd_tree(matrix):
+    # scipy는 KD-tree가 필요한 크기의 인덱스를 처음 검색할 때만 임포트 (app을 임포트하는 모든 워커가 로드하지 않도록)
+    if len(matrix) < TREE_MIN_ROWS or matrix.shape[1] > TREE_MAX_DIMS:
+        return None
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:  # scipy가 없으면 NumPy 전체 탐색으로 대신
+        return None
+    return cKDTree(matrix)
+
+
+def _searcher(path, features):
+    """
+    (파일 수정 시각, 특징 집합)별로 정규화 행렬과 KD-tree를 워커 프로세스에 캐시합니다.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+    key = (path, features)
+    with _searchers_lock:
+        cached = _searchers.get(key)
+        if cached is not None and cached['mtime'] == mtime:
+            return cached
+
+    index = load_index(path)
+    cols = [FEATURE_COLUMNS.index(col) for col in FEATURE_SETS[features]]
+    matrix = np.ascontiguousarray(index['normalized'][:, cols])
+    tree = _kd_tree(matrix)
+    rows = {}
+    for row, player_match in enumerate(zip(index['match_ids'].tolist(), index['players'].tolist())):
+        rows.setdefault(player_match, row)
+    cached = {'mtime': mtime, 'index': index, 'matrix': matrix, 'tree': tree, 'rows': rows,
+              'sq_norms': np.einsum('ij,ij->i', matrix, matrix)}
+    with _searchers_lock:
+        _searchers[key] = cached
+    return cached
+
+
+def _nearest(searcher, vector, k):
+    matrix, tree = searcher['matrix'], searcher['tree']
+    k = min(k, len(matrix))
+    if tree is not None:
+        distances, rows = tree.query(vector, k=k)
+        return np.atleast_1d(rows), np.atleast_1d(distances)
+    # |x - q|^2 = |x|^2 - 2 x.q + |q|^2 : 행렬-벡터 곱 한 번으로 전체 거리 계산
+    sq = searcher['sq_norms'] - 2 * (matrix @ vector) + vector @ vector
+    rows = np.argpartition(sq, k - 1)[:k] if k < len(matrix) else np.arange(len(matrix))
+    rows = rows[np.argsort(sq[rows], kind='stable')]
+    return rows, np.sqrt(np.maximum(sq[rows], 0))
+
+
+def find_similar(match_id, player_id, k=DEFAULT_K, features='all', exclude_same_player=False, path=INDEX_PATH):
+    """
+    match_id 경기의 player_id 선수와 특징 벡터가 가장 가까운(정규화 유클리드 거리) 선수-경기 k개를 찾습니다.
+    exclude_same_player: 같은 팀의 같은 선수 번호(다른 경기의 본인)도 결과에서 제외
+    k: 1 이상, MAX_K보다 크면 MAX_K개만 반환
+    반환: DataFrame [Match_ID, Player, TeamID, Distance] + 점수 컬럼, 선수가 인덱스에 없으면 KeyError
+    """
+    if features not in FEATURE_SETS:
+        raise ValueError(f"features는 {', '.join(FEATURE_SETS)} 중 하나입니다.")
+    if k < 1:
+        raise ValueError("k는 1 이상이어야 합니다.")
+    k = min(k, MAX_K)
+    searcher = _searcher(path, features)
+    index = searcher['index']
+    query = searcher['rows'].get((str(match_id), str(player_id)))
+    if query is None:
+        raise KeyError(f"인덱스에 없는 선수입니다: {match_id} / {player_id}")
+
+    if exclude_same_player:
+        excluded = np.flatnonzero((index['players'] == index['players'][query]) & (index['teams'] == index['teams'][query]))
+    else:
+        excluded = np.array([query])
+    rows, distances = _nearest(searcher, searcher['matrix'][query], k + len(excluded))
+    keep = ~np.isin(rows, excluded)
+    rows, distances = rows[keep][:k], distances[keep][:k]
+
+    result = pd.DataFrame({
+        'Match_ID': index['match_ids'][rows], 'Player': index['players'][rows], 'TeamID': index['teams'][rows],
+        'Distance': distances.round(4),
+    })
+    scores = pd.DataFrame(index['features'][rows][:, :len(SCORE_FEATURES)].round().astype(int), columns=SCORE_FEATURES)
+    return pd.concat([result, scores], axis=1)
@@ -0,0 +1,104 @@
+"""
+팀/전후반/경기 분할 요약.
+
+선수별 요약을 조각마다 다시 계산하지 않고, 이벤트 카운터를 가장 세밀한 키(MatchID, TeamID, Half, Player)로
+한 번만 groupby한 뒤 필요한 분할(예: 경기-팀, 경기-팀-전후반)은 그 결과를 다시 합산해 만듭니다.
+모든 분할을 같은 MultiIndex(합산된 키는 'All')에 쌓아 비율/점수를 한 번에 계산합니다.
+"""
+import pandas as pd
+
+from schema import normalize_events
+from scoring import calculate_all_scores
+from summaries import build_summary_counters, summary_frame
+
+SPLIT_KEYS = ['MatchID', 'TeamID', 'Half', 'Player']
+ALL = 'All'
+
+# 내보내기 시트 이름 -> 분할 키
+DEFAULT_SPLITS = {
+    'Team_Split': ['MatchID', 'TeamID'],
+    'Team_Half_Split': ['MatchID', 'TeamID', 'Half'],
+    'Player_Half_Split': ['MatchID', 'TeamID', 'Half', 'Player'],
+}
+
+
+def parse_split_keys(value):
+    """
+    'TeamID,Half' 같은 문자열 또는 리스트를 분할 키 리스트로 변환합니다. (SPLIT_KEYS 순서로 정렬)
+    """
+    keys = [key.strip() for key in value.split(',')] if isinstance(value, str) else list(value)
+    unknown = [key for key in keys if key not in SPLIT_KEYS]
+    if unknown or not keys:
+        raise ValueError(f"분할 키는 {', '.join(SPLIT_KEYS)} 중에서 선택합니다: {', '.join(unknown) or '(없음)'}")
+    return [key for key in SPLIT_KEYS if key in keys]
+
+
+def _key_frame(df_analyzed):
+    return pd.DataFrame({
+        key: (df_analyzed[key] if key in df_analyzed.columns else pd.Series('', index=df_analyzed.index))
+        .fillna('').astype(str).to_numpy()
+        for key in SPLIT_KEYS
+    }, index=df_analyzed.index)
+
+
+def _conceded(teams, groups, by):
+    """
+    분할별 실점 지표: 그룹이 나온 (경기[, 전후반], 팀)마다 같은 범위 상대팀의 유효 슈팅 xG/득점을 합산합니다.
+    전후반으로 나누지 않은 분할은 경기 전체의 상대팀 합계를 사용합니다. (build_player_stats와 같은 기준)
+    """
+    scope = ['MatchID', 'Half'] if 'Half' in by else ['MatchID']
+    own = teams.groupby(level=scope + ['TeamID']).sum()
+    opponent = own.groupby(level=scope).transform('sum') - own
+    pairs = groups[sorted(set(by) | set(scope) | {'TeamID'}, key=SPLIT_KEYS.index)].drop_duplicates()
+    values = opponent.reindex(pd.MultiIndex.from_frame(pairs[scope + ['TeamID']])).fillna(0).to_numpy()
+    conceded = pd.DataFrame(values, columns=['Total_SOT_xG_Conceded', 'Goals_Conceded'])
+    return conceded.groupby([pairs[key].to_numpy() for key in by]).sum()
+
+
+def split_stats(df_analyzed, splits=None):
+    """
+    분석된 이벤트 데이터로 여러 분할의 요약/Raw/Score 프레임을 한 번에 계산합니다.
+    splits: {이름: 분할 키 리스트} (기본값 DEFAULT_SPLITS)
+    반환: {이름: DataFrame (index = 분할 키 MultiIndex, 컬럼 = build_player_stats와 같음)}
+    """
+    splits = {name: parse_split_keys(by) for name, by in (splits or DEFAULT_SPLITS).items()}
+    normalize_events(df_analyzed)
+    keys = _key_frame(df_analyzed)
+    key_arrays = [keys[key] for key in SPLIT_KEYS]
+
+    # 가장 세밀한 키로 한 번만 groupby
+    finest = build_summary_counters(df_analyzed).groupby(key_arrays).sum()
+    finest.index.names = SPLIT_KEYS
+    is_sot = df_analyzed['Action'].isin(['Goal', 'Shot On Target']).to_numpy()
+    xg = df_analyzed['xG'].fillna(0).to_numpy() if 'xG' in df_analyzed.columns else 0.0
+    teams = pd.DataFrame({
+        'Team_SOT_xG': is_sot * xg,
+        'Team_Goals': (df_analyzed['Action'] == 'Goal').to_numpy().astype(float),
+    }, index=df_analyzed.index).groupby([keys['MatchID'], keys['Half'], keys['TeamID']]).sum()
+    groups = finest.index.to_frame(index=False)
+
+    # 분할별로 합산한 뒤, 합산된 키를 'All'로 채워 같은 MultiIndex에 쌓음
+    frames = []
+    for name, by in splits.items():
+        part = finest.groupby(level=by).sum()
+        conceded = _conceded(teams, groups, by)
+        for col in conceded.columns:
+            part[col] = conceded[col].reindex(part.index).fillna(0).to_numpy()
+        index = part.index.to_frame(index=False)
+        for key in SPLIT_KEYS:
+            if key not in by:
+                index[key] = ALL
+        part.index = pd.MultiIndex.from_frame(index[SPLIT_KEYS])
+        frames.append(part.assign(_split=name))
+    if not frames:
+        return {}
+    stacked = pd.concat(frames)
+
+    # 비율/정수 처리와 점수 계산은 모든 분할에 대해 한 번에
+    split_names = stacked.pop('_split').to_numpy()
+    stats = calculate_all_scores(summary_frame(stacked))
+    return {
+        name: stats[split_names == name].droplevel([key for key in SPLIT_KEYS if key not in by])
+        for name, by in splits.items()
+    }
+
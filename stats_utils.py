@@ -1,30 +1,71 @@
+import hashlib
 
+import numpy as np
+import pandas as pd
+
+from schema import EVENT_COLUMNS
 
 # --- 상수 ---
 FIELD_W = 105
 FIELD_H = 68
 
+def parse_time_seconds(series):
+    """
+    'MM:SS' 또는 'HH:MM:SS' 문자열 Series를 초 단위 정수 배열로 변환합니다. 형식이 맞지 않으면 0입니다.
+    정규식 추출 한 번으로 시/분/초 정수 배열을 만든 뒤 벡터 연산으로 합산합니다.
+    """
+    parts = series.astype(str).str.extract(r'^\s*(\d+)\s*:\s*(\d+)\s*(?::\s*(\d+)\s*)?$')
+    first, second, third = (pd.to_numeric(parts[i], errors='coerce').to_numpy(dtype=float) for i in range(3))
+    seconds = np.where(np.isnan(third), first * 60 + second, first * 3600 + second * 60 + third)
+    return np.nan_to_num(seconds, nan=0).astype(np.int64)
+
 def convert_time_to_seconds(df):
     """
     'Time' 컬럼(MM:SS 또는 HH:MM:SS 형식)을 초 단위 'Time(s)' 컬럼으로 변환합니다.
     """
-    def time_to_seconds(time_str):
-        try:
-            parts = str(time_str).split(':')
-            if len(parts) == 2:
-                m, s = map(int, parts)
-                return m * 60 + s
-            elif len(parts) == 3:
-                h, m, s = map(int, parts)
-                return h * 3600 + m * 60 + s
-        except (ValueError, TypeError):
-            return 0
-        return 0
-
     if 'Time' in df.columns:
-        df['Time(s)'] = df['Time'].apply(time_to_seconds)
+        df['Time(s)'] = parse_time_seconds(df['Time'])
     return df
 
+def tag_mask(series, tag):
+    """
+    Tags 컬럼에 tag가 포함된 행을 bool 배열로 반환합니다. (결측은 False)
+    Tags 조합의 종류는 이벤트 수보다 훨씬 적으므로 고유값에만 str.contains를 적용합니다.
+    """
+    codes, uniques = pd.factorize(series)
+    mask = np.asarray(pd.Index(uniques).astype(str).str.contains(tag, regex=False), dtype=bool)
+    return np.append(mask, False)[codes]
+
+# MatchID가 빈 경기의 키에 쓰는 앞부분 이벤트 수
+MATCH_KEY_EVENTS = 10
+
+def match_keys(df):
+    """
+    경기 식별 키: MatchID가 있으면 그대로, 비어 있으면 팀 구성과 앞부분 이벤트(MATCH_KEY_EVENTS개)의 해시를 사용합니다.
+    (같은 경기를 전반 종료 후 또는 뒷부분을 수정한 뒤 다시 내보내도 같은 키)
+    """
+    match_ids = df['MatchID'].fillna('').astype(str).str.strip() if 'MatchID' in df.columns else pd.Series('', index=df.index)
+    keys = match_ids.copy()
+    blank = match_ids == ''
+    if blank.any():
+        rows = df.loc[blank]
+        teams = sorted(rows['TeamID'].fillna('').astype(str).unique()) if 'TeamID' in df.columns else []
+        cols = [c for c in ['Half', 'Time', 'Player', 'Action', 'StartX', 'StartY', 'EndX', 'EndY'] if c in df.columns]
+        row_hash = pd.util.hash_pandas_object(rows[cols].head(MATCH_KEY_EVENTS).astype(str), index=False).to_numpy()
+        digest = hashlib.sha1('|'.join(teams).encode('utf-8') + row_hash.tobytes()).hexdigest()
+        keys[blank] = 'hash:' + digest
+    return keys
+
+def match_hashes(df, keys=None):
+    """
+    경기(match_keys)별 이벤트 내용 해시. 반환: {경기 키: 해시}
+    """
+    keys = match_keys(df) if keys is None else keys
+    cols = [col for col in EVENT_COLUMNS if col in df.columns]
+    row_hash = pd.util.hash_pandas_object(df[cols].astype(str), index=False).to_numpy()
+    return {key: hashlib.sha1(row_hash[rows.to_numpy()].tobytes()).hexdigest()
+            for key, rows in pd.Series(np.arange(len(keys)), index=keys.to_numpy()).groupby(level=0)}
+
 def is_in_final_third(x):
     return x >= 70
 
@@ -33,3 +74,75 @@ def is_in_penalty_area(x, y):
 
 def is_progressive_pass(start_x, end_x):
     return end_x - start_x >= 10
+
+
+# --- 공간 구역 인덱스 ---
+# 시작/끝 좌표마다 구역 비트 플래그와 그리드 셀 번호를 한 번만 계산해 두고,
+# 요약 함수들은 좌표 대신 정수 플래그로 필터링합니다.
+OWN_HALF_MAX_X = 52.5
+THIRD_W = FIELD_W / 3
+CENTRAL_CHANNEL_Y = (21.1, 46.9)
+
+ZONE_OWN_HALF = 1
+ZONE_DEF_THIRD = 2
+ZONE_MID_THIRD = 4
+ZONE_FINAL_THIRD = 8
+ZONE_PENALTY_AREA = 16
+ZONE_CENTRAL_CHANNEL = 32
+
+# 그리드: 가로 6칸 x 세로 3칸 (셀 번호 = gx * GRID_Y + gy, 좌표 없음 = -1)
+GRID_X = 6
+GRID_Y = 3
+GRID_SIZE = GRID_X * GRID_Y
+
+def zone_flags(x, y):
+    """
+    좌표 배열에 대한 구역 비트 플래그(uint8)를 반환합니다. 좌표가 NaN이면 0입니다.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    flags = np.zeros(x.shape, dtype=np.uint8)
+    flags |= np.where(x <= OWN_HALF_MAX_X, ZONE_OWN_HALF, 0).astype(np.uint8)
+    flags |= np.where(x < THIRD_W, ZONE_DEF_THIRD, 0).astype(np.uint8)
+    flags |= np.where((x >= THIRD_W) & ~is_in_final_third(x), ZONE_MID_THIRD, 0).astype(np.uint8)
+    flags |= np.where(is_in_final_third(x), ZONE_FINAL_THIRD, 0).astype(np.uint8)
+    flags |= np.where(is_in_penalty_area(x, y), ZONE_PENALTY_AREA, 0).astype(np.uint8)
+    flags |= np.where((y > CENTRAL_CHANNEL_Y[0]) & (y < CENTRAL_CHANNEL_Y[1]), ZONE_CENTRAL_CHANNEL, 0).astype(np.uint8)
+    return flags
+
+def grid_cell(x, y, grid_x=GRID_X, grid_y=GRID_Y):
+    """
+    좌표 배열을 grid_x * grid_y 그리드의 셀 번호(int16)로 변환합니다. 좌표가 NaN이면 -1입니다.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    gx = np.clip(np.floor(np.nan_to_num(x) / FIELD_W * grid_x), 0, grid_x - 1)
+    gy = np.clip(np.floor(np.nan_to_num(y) / FIELD_H * grid_y), 0, grid_y - 1)
+    return np.where(valid, gx * grid_y + gy, -1).astype(np.int16)
+
+def add_zone_index(df):
+    """
+    StartX_adj/StartY_adj, EndX_adj/EndY_adj로부터 Start_Zone, End_Zone(플래그)과
+    Start_Grid, End_Grid(셀 번호) 컬럼을 추가합니다.
+    """
+    for point in ('Start', 'End'):
+        x_col, y_col = f'{point}X_adj', f'{point}Y_adj'
+        if x_col in df.columns and y_col in df.columns:
+            x, y = df[x_col].to_numpy(dtype=float), df[y_col].to_numpy(dtype=float)
+        else:
+            x = y = np.full(len(df), np.nan)
+        df[f'{point}_Zone'] = zone_flags(x, y)
+        df[f'{point}_Grid'] = grid_cell(x, y)
+    return df
+
+def ensure_zone_index(df):
+    if not all(col in df.columns for col in ('Start_Zone', 'End_Zone', 'Start_Grid', 'End_Grid')):
+        add_zone_index(df)
+    return df
+
+def in_zone(zone, flags):
+    """
+    구역 플래그 컬럼에서 flags의 모든 비트가 켜진 행을 True로 반환합니다.
+    """
+    return (zone & flags) == flags
@@ -0,0 +1,150 @@
+import os
+import json
+import struct
+import hashlib
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 로컬 개발 환경
+    fcntl = None
+
+# --- 로컬 저장소 경로 ---
+# gunicorn 워커들이 같은 디렉토리를 공유하도록 프로젝트 하위 'data/'를 기본값으로 사용
+DATA_DIR = os.environ.get('FPA_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+# 캐시 디렉토리 정리 주기: 이 시간(초)이 지났거나 한도의 PRUNE_WRITE_FRACTION만큼 새로 썼을 때만 전체를 훑습니다.
+PRUNE_INTERVAL_S = float(os.environ.get('FPA_PRUNE_INTERVAL', '60'))
+PRUNE_WRITE_FRACTION = 0.1
+
+_prune_state = {}
+_prune_lock = threading.Lock()
+
+def data_path(*parts):
+    """
+    DATA_DIR 하위 경로를 반환합니다. 마지막 요소를 제외한 디렉토리는 미리 생성합니다.
+    """
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+def content_hash(data):
+    """
+    바이트 데이터의 SHA-256 해시(hex)를 반환합니다. 데이터셋 식별자로 사용됩니다.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def atomic_write_bytes(path, data):
+    """
+    임시 파일에 쓴 뒤 os.replace로 교체하여, 다른 워커가 반쯤 쓰인 파일을 읽지 않도록 합니다.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+@contextmanager
+def file_lock(path):
+    """
+    여러 gunicorn 워커가 같은 파일을 갱신할 때 사용하는 배타적 잠금 (path + '.lock').
+    fcntl이 없는 환경에서는 잠금 없이 실행됩니다.
+    """
+    lock_path = path + '.lock'
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def prune_directory(directory, limit_bytes, suffix):
+    """
+    directory 하위의 suffix 파일 총 용량이 limit_bytes를 넘으면 수정 시각이 오래된 파일부터 지웁니다.
+    (읽을 때 os.utime으로 시각을 갱신하면 LRU 순서가 됩니다)
+    """
+    entries = []
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(suffix):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+    if total <= limit_bytes:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        if total <= limit_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def maybe_prune_directory(directory, limit_bytes, suffix, written_bytes):
+    """
+    쓰기마다 호출하는 prune_directory. 디렉토리별로 마지막 정리 후 PRUNE_INTERVAL_S초가 지났거나
+    limit_bytes * PRUNE_WRITE_FRACTION 이상을 새로 썼을 때만 실제로 정리합니다.
+    """
+    now = time.monotonic()
+    with _prune_lock:
+        pruned_at, written = _prune_state.get(directory, (None, 0))
+        written += written_bytes
+        due = (pruned_at is None or now - pruned_at >= PRUNE_INTERVAL_S
+               or written >= limit_bytes * PRUNE_WRITE_FRACTION)
+        _prune_state[directory] = (now, 0) if due else (pruned_at, written)
+    if due:
+        prune_directory(directory, limit_bytes, suffix)
+
+
+# --- 배열 묶음 바이너리 ---
+def pack_arrays(magic, meta, arrays):
+    """
+    magic + 헤더 길이(uint32) + JSON 헤더 + 배열 바이트 (각 배열은 파일 시작 기준 8바이트 경계에서 시작)
+    헤더의 arrays[이름] = {'dtype', 'offset', 'length', 'shape'} (offset은 본문 시작 기준 바이트, length는 원소 수)
+    """
+    layout, chunks, offset = {}, [], 0
+    for name, values in arrays.items():
+        raw = values.astype(values.dtype.newbyteorder('<')).tobytes()
+        layout[name] = {'dtype': values.dtype.name, 'offset': offset, 'length': int(values.size), 'shape': list(values.shape)}
+        padding = -len(raw) % 8
+        chunks.append(raw + b'\0' * padding)
+        offset += len(raw) + padding
+    header = json.dumps({**meta, 'arrays': layout}).encode('utf-8')
+    header += b' ' * (-(len(magic) + 4 + len(header)) % 8)
+    return magic + struct.pack('<I', len(header)) + header + b''.join(chunks)
+
+
+def unpack_arrays(buffer, magic):
+    """
+    pack_arrays의 역변환. buffer가 np.memmap이면 배열은 복사 없이 파일을 가리킵니다. 반환: (meta, {이름: ndarray})
+    """
+    import numpy as np
+    if bytes(buffer[:len(magic)]) != magic:
+        raise ValueError(f"{magic.decode('ascii')} 형식이 아닙니다.")
+    (header_len,) = struct.unpack_from('<I', buffer, len(magic))
+    body = len(magic) + 4 + header_len
+    meta = json.loads(bytes(buffer[len(magic) + 4:body]))
+    layout = meta.pop('arrays')
+    arrays = {name: np.frombuffer(buffer, dtype=np.dtype(spec['dtype']).newbyteorder('<'),
+                                  count=spec['length'], offset=body + spec['offset']).reshape(spec['shape'])
+              for name, spec in layout.items()}
+    return meta, arrays
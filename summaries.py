@@ -1,8 +1,11 @@
 import pandas as pd
 import numpy as np
-from stats_utils import is_in_final_third, is_in_penalty_area, is_progressive_pass
+from schema import normalize_events
+from stats_utils import (is_progressive_pass, tag_mask, GRID_SIZE, ensure_zone_index, in_zone,
+                         ZONE_OWN_HALF, ZONE_FINAL_THIRD, ZONE_PENALTY_AREA, ZONE_CENTRAL_CHANNEL)
 
 def create_player_summary(df_analyzed):
+    normalize_events(df_analyzed)
     all_players = df_analyzed['Player'].unique()
     
     # 필수 컬럼 정의 (0으로 초기화할 대상)
@@ -22,7 +25,7 @@ def create_player_summary(df_analyzed):
     for col in required_cols:
         summary[col] = 0.0 if 'Rate' in col else 0
 
-    if 'Tags' not in df_analyzed.columns: df_analyzed['Tags'] = ''
+    ensure_zone_index(df_analyzed)
     df_pass = df_analyzed[df_analyzed['Action'].isin(pass_actions)].copy()
     
     if df_pass.empty:
@@ -55,11 +58,11 @@ def create_player_summary(df_analyzed):
     df_pass_success = df_pass[df_pass['Tags'].str.contains('Success')]
     if not df_pass_success.empty:
         summary['Progressive_Pass_Success'] = df_pass_success[is_progressive_pass(df_pass_success['StartX_adj'], df_pass_success['EndX_adj'])].groupby('Player')['Action'].count().reindex(all_players).fillna(0)
-        summary['Final_Third_Pass_Success'] = df_pass_success[is_in_final_third(df_pass_success['StartX_adj'])].groupby('Player')['Action'].count().reindex(all_players).fillna(0)
-        summary['PA_Pass_Success'] = df_pass_success[is_in_penalty_area(df_pass_success['EndX_adj'], df_pass_success['EndY_adj'])].groupby('Player')['Action'].count().reindex(all_players).fillna(0)
+        summary['Final_Third_Pass_Success'] = df_pass_success[in_zone(df_pass_success['Start_Zone'], ZONE_FINAL_THIRD)].groupby('Player')['Action'].count().reindex(all_players).fillna(0)
+        summary['PA_Pass_Success'] = df_pass_success[in_zone(df_pass_success['End_Zone'], ZONE_PENALTY_AREA)].groupby('Player')['Action'].count().reindex(all_players).fillna(0)
         
         # BLD Score Logic: Own Half Passes
-        df_own_half = df_pass_success[df_pass_success['StartX_adj'] <= 52.5].copy()
+        df_own_half = df_pass_success[in_zone(df_pass_success['Start_Zone'], ZONE_OWN_HALF)].copy()
         if not df_own_half.empty:
             df_own_half['x_gain'] = df_own_half['EndX_adj'] - df_own_half['StartX_adj']
             # Base Score 0.5 + Bonus (x_gain * 0.1 if x_gain >= 5)
@@ -67,7 +70,7 @@ def create_player_summary(df_analyzed):
             summary['Own_Half_Pass_Score'] = df_own_half.groupby('Player')['Score'].sum().reindex(all_players).fillna(0)
 
     # BLD Fail Logic
-    df_pass_fail_own = df_pass[(~df_pass['Tags'].str.contains('Success')) & (df_pass['StartX_adj'] <= 52.5)]
+    df_pass_fail_own = df_pass[(~df_pass['Tags'].str.contains('Success')) & in_zone(df_pass['Start_Zone'], ZONE_OWN_HALF)]
     summary['Own_Half_Pass_Fail'] = df_pass_fail_own.groupby('Player')['Action'].count().reindex(all_players).fillna(0)
 
     # 정수형 변환 (Rate 제외)
@@ -78,6 +81,7 @@ def create_player_summary(df_analyzed):
 
 
 def create_shooter_summary(df_with_xg):
+    normalize_events(df_with_xg)
     all_players = df_with_xg['Player'].unique()
     
     required_cols = [
@@ -94,8 +98,6 @@ def create_shooter_summary(df_with_xg):
     df_shots = df_with_xg[df_with_xg['Action'].isin(shot_actions)].copy()
     if df_shots.empty: return summary
     
-    if 'Tags' not in df_shots.columns: df_shots['Tags'] = ''
-    df_shots['Tags'] = df_shots['Tags'].fillna('')
 
     agg_summary = df_shots.groupby('Player').agg(
         Total_Shots=('Action', 'count'),
@@ -146,13 +148,14 @@ def create_shooter_summary(df_with_xg):
 
 
 def create_cross_summary(df_analyzed):
+    normalize_events(df_analyzed)
     all_players = df_analyzed['Player'].unique()
     
     required_cols = ['Total_Crosses', 'Successful_Crosses', 'Cross_Accuracy', 'Central_PA_Cross_Success']
     summary = pd.DataFrame(index=all_players)
     for col in required_cols: summary[col] = 0.0
 
-    if 'Tags' not in df_analyzed.columns: df_analyzed['Tags'] = ''
+    ensure_zone_index(df_analyzed)
     df_cross = df_analyzed[df_analyzed['Action'] == 'Cross'].copy()
     
     if df_cross.empty: return summary
@@ -172,7 +175,7 @@ def create_cross_summary(df_analyzed):
     
     df_cross_success = df_cross[df_cross['Tags'].str.contains('Success')]
     if not df_cross_success.empty:
-        central_crosses = df_cross_success[is_in_penalty_area(df_cross_success['EndX_adj'], df_cross_success['EndY_adj']) & (df_cross_success['EndY_adj'] > 21.1) & (df_cross_success['EndY_adj'] < 46.9)]
+        central_crosses = df_cross_success[in_zone(df_cross_success['End_Zone'], ZONE_PENALTY_AREA | ZONE_CENTRAL_CHANNEL)]
         summary['Central_PA_Cross_Success'] = central_crosses.groupby('Player')['Action'].count().reindex(all_players).fillna(0)
 
     summary[['Total_Crosses', 'Successful_Crosses', 'Central_PA_Cross_Success']] = summary[['Total_Crosses', 'Successful_Crosses', 'Central_PA_Cross_Success']].astype(int)
@@ -180,6 +183,7 @@ def create_cross_summary(df_analyzed):
     return summary
 
 def create_advanced_summary(df_analyzed):
+    normalize_events(df_analyzed)
     all_players = df_analyzed['Player'].unique()
     
     required_cols = [
@@ -197,8 +201,7 @@ def create_advanced_summary(df_analyzed):
     summary = pd.DataFrame(index=all_players)
     for col in required_cols: summary[col] = 0
 
-    if 'Tags' not in df_analyzed.columns: df_analyzed['Tags'] = ''
-    df_analyzed['Tags'] = df_analyzed['Tags'].fillna('')
+    ensure_zone_index(df_analyzed)
 
     # Helper function to safe update
     def safe_update(series, col_name):
@@ -215,7 +218,7 @@ def create_advanced_summary(df_analyzed):
     safe_update(df_pass_fail.groupby('Player')['Action'].count(), 'Pass_Fail_Count')
     safe_update(df_miss.groupby('Player')['Action'].count(), 'Miss_Count')
 
-    df_final_third = df_analyzed[is_in_final_third(df_analyzed['StartX_adj'])]
+    df_final_third = df_analyzed[in_zone(df_analyzed['Start_Zone'], ZONE_FINAL_THIRD)]
     if not df_final_third.empty:
         df_ft_pass_succ = df_final_third[df_final_third['Action'].isin(['Pass', 'Cross']) & df_final_third['Tags'].str.contains('Success')]
         df_ft_break_succ = df_final_third[(df_final_third['Action'] == 'Breakthrough') & df_final_third['Tags'].str.contains('Success')]
@@ -248,7 +251,7 @@ def create_advanced_summary(df_analyzed):
     
     df_tackle_success = df_tackle[df_tackle['Tags'].str.contains('Success')]
     if not df_tackle_success.empty:
-        safe_update(df_tackle_success[is_in_final_third(df_tackle_success['StartX_adj'])].groupby('Player')['Action'].count(), 'Final_Third_Tackle_Success')
+        safe_update(df_tackle_success[in_zone(df_tackle_success['Start_Zone'], ZONE_FINAL_THIRD)].groupby('Player')['Action'].count(), 'Final_Third_Tackle_Success')
     
     df_tackle_fail_foul = df_analyzed[(df_analyzed['Action'] == 'Foul') & (df_analyzed['Tags'].str.contains('In-box'))]
     safe_update(df_tackle_fail_foul.groupby('Player')['Action'].count(), 'PA_Foul_Tackles')
@@ -309,3 +312,358 @@ def create_advanced_summary(df_analyzed):
     safe_update(df_aerial_lost.groupby('Player')['Action'].count(), 'Aerial_Duels_Lost')
 
     return summary.fillna(0).astype(int)
+
+
+def create_zone_pass_matrix(df_analyzed, by='Player'):
+    """
+    by(선수 또는 팀)별 시작 그리드 -> 끝 그리드 패스 횟수/성공 횟수를 한 번의 bincount로 집계합니다.
+    0이 아닌 (by, Start_Grid, End_Grid) 조합만 long 형태로 반환합니다.
+    """
+    columns = [by, 'Start_Grid', 'End_Grid', 'Passes', 'Successful_Passes']
+    normalize_events(df_analyzed)
+    ensure_zone_index(df_analyzed)
+
+    df_pass = df_analyzed[df_analyzed['Action'].isin(['Pass', 'Cross'])
+                          & (df_analyzed['Start_Grid'] >= 0) & (df_analyzed['End_Grid'] >= 0)]
+    if df_pass.empty:
+        return pd.DataFrame(columns=columns)
+
+    # 팀/선수가 비어 있는(NaN) 이벤트도 하나의 그룹으로 집계 (-1 코드가 flat을 음수로 만들지 않도록)
+    codes, groups = pd.factorize(df_pass[by], use_na_sentinel=False)
+    start = df_pass['Start_Grid'].to_numpy(dtype=np.int64)
+    end = df_pass['End_Grid'].to_numpy(dtype=np.int64)
+    success = tag_mask(df_pass['Tags'], 'Success').astype(float)
+
+    flat = (codes * GRID_SIZE + start) * GRID_SIZE + end
+    size = len(groups) * GRID_SIZE * GRID_SIZE
+    passes = np.bincount(flat, minlength=size)
+    successes = np.bincount(flat, weights=success, minlength=size)
+
+    nonzero = np.flatnonzero(passes)
+    group_idx, rest = np.divmod(nonzero, GRID_SIZE * GRID_SIZE)
+    start_idx, end_idx = np.divmod(rest, GRID_SIZE)
+    return pd.DataFrame({
+        by: groups[group_idx],
+        'Start_Grid': start_idx,
+        'End_Grid': end_idx,
+        'Passes': passes[nonzero],
+        'Successful_Passes': successes[nonzero].astype(int),
+    }, columns=columns)
+
+
+def create_pass_network(df_analyzed):
+    """
+    받는 선수(Receiver)가 기록된 이벤트로 팀별 패서 -> 리시버 패스 횟수/성공 횟수와
+    선수별 평균 위치를 계산합니다. (edges, nodes) 두 DataFrame을 반환합니다.
+
+    (팀, 선수)를 정수 코드로 변환한 뒤 간선 코드를 np.unique + bincount로 집계하므로
+    시즌 단위 데이터에서도 선수 수의 제곱 크기 배열을 만들지 않습니다.
+    """
+    edge_cols = ['TeamID', 'Passer', 'Receiver', 'Passes', 'Successful_Passes']
+    node_cols = ['TeamID', 'Player', 'Avg_X', 'Avg_Y', 'Events', 'Passes_Made', 'Passes_Received']
+
+    normalize_events(df_analyzed)
+    team = df_analyzed['TeamID'].fillna('').astype(str).to_numpy()
+    player = df_analyzed['Player'].to_numpy(dtype=object)
+    receiver = df_analyzed['Receiver'].to_numpy(dtype=object)
+
+    # 노드 코드: (팀 코드, 선수 코드) 쌍을 하나의 정수로 묶어 factorize (이벤트 주체 + 리시버)
+    n_events = len(df_analyzed)
+    team_codes, team_uniques = pd.factorize(team)
+    name_codes, name_uniques = pd.factorize(np.concatenate([player, receiver]))
+    pair_codes = np.concatenate([team_codes, team_codes]).astype(np.int64) * max(len(name_uniques), 1) + name_codes
+    codes, pair_uniques = pd.factorize(pair_codes)
+    player_code, receiver_code = codes[:n_events], codes[n_events:]
+    n_nodes = len(pair_uniques)
+    node_team_idx, node_name_idx = np.divmod(pair_uniques, max(len(name_uniques), 1))
+    node_team = np.asarray(team_uniques, dtype=object)[node_team_idx]
+    node_player = np.asarray(name_uniques, dtype=object)[node_name_idx]
+
+    # 평균 위치 (좌표가 있는 이벤트 기준)
+    x = df_analyzed['StartX_adj'].to_numpy(dtype=float) if 'StartX_adj' in df_analyzed.columns else np.full(n_events, np.nan)
+    y = df_analyzed['StartY_adj'].to_numpy(dtype=float) if 'StartY_adj' in df_analyzed.columns else np.full(n_events, np.nan)
+    has_pos = ~(np.isnan(x) | np.isnan(y))
+    events = np.bincount(player_code[has_pos], minlength=n_nodes)
+    sum_x = np.bincount(player_code[has_pos], weights=x[has_pos], minlength=n_nodes)
+    sum_y = np.bincount(player_code[has_pos], weights=y[has_pos], minlength=n_nodes)
+
+    # 간선: 리시버가 있는 이벤트만
+    is_pass = (receiver != '') & (player != '')
+    tags = df_analyzed['Tags'] if 'Tags' in df_analyzed.columns else pd.Series('', index=df_analyzed.index)
+    success = tag_mask(tags, 'Success').astype(float)[is_pass]
+    edge_flat = player_code[is_pass].astype(np.int64) * n_nodes + receiver_code[is_pass]
+    edge_ids, edge_inverse = np.unique(edge_flat, return_inverse=True)
+    edge_passes = np.bincount(edge_inverse, minlength=len(edge_ids))
+    edge_success = np.bincount(edge_inverse, weights=success, minlength=len(edge_ids))
+    passer_idx, receiver_idx = np.divmod(edge_ids, n_nodes)
+
+    edges = pd.DataFrame({
+        'TeamID': node_team[passer_idx],
+        'Passer': node_player[passer_idx],
+        'Receiver': node_player[receiver_idx],
+        'Passes': edge_passes,
+        'Successful_Passes': edge_success.astype(int),
+    }, columns=edge_cols).sort_values(['TeamID', 'Passes'], ascending=[True, False], ignore_index=True)
+
+    passes_made = np.bincount(player_code[is_pass], minlength=n_nodes)
+    passes_received = np.bincount(receiver_code[is_pass], minlength=n_nodes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        nodes = pd.DataFrame({
+            'TeamID': node_team,
+            'Player': node_player,
+            'Avg_X': np.round(sum_x / events, 2),
+            'Avg_Y': np.round(sum_y / events, 2),
+            'Events': events,
+            'Passes_Made': passes_made,
+            'Passes_Received': passes_received,
+        }, columns=node_cols)
+    nodes = nodes[nodes['Player'] != ''].sort_values(['TeamID', 'Player'], ignore_index=True)
+    return edges, nodes
+
+
+DEFAULT_TIMELINE_WINDOW = 15  # 분
+
+def create_timeline_summary(df_analyzed, window_minutes=DEFAULT_TIMELINE_WINDOW):
+    """
+    Time(s)를 전/후반별 window_minutes 분 구간으로 나누어 선수별/팀별 활동량, 성공률, xG 타임라인을 만듭니다.
+    (Half, Window, TeamID, Player) 한 번의 groupby로 선수 타임라인을 만들고, 팀 타임라인은 그 결과를 합산합니다.
+    반환: (player_timeline, team_timeline)
+    """
+    if not window_minutes > 0:
+        raise ValueError("타임라인 구간(window_minutes)은 0보다 커야 합니다.")
+    if float(window_minutes).is_integer():
+        window_minutes = int(window_minutes)
+    window_s = max(int(window_minutes * 60), 1)
+    tags = df_analyzed['Tags'] if 'Tags' in df_analyzed.columns else pd.Series('', index=df_analyzed.index)
+    success = tag_mask(tags, 'Success')
+    fail = tag_mask(tags, 'Fail')
+    is_pass = df_analyzed['Action'].isin(['Pass', 'Cross']).to_numpy()
+    seconds = df_analyzed['Time(s)'].to_numpy(dtype=np.int64) if 'Time(s)' in df_analyzed.columns else np.zeros(len(df_analyzed), dtype=np.int64)
+
+    work = pd.DataFrame({
+        'Half': df_analyzed['Half'].fillna('').astype(str).to_numpy(),
+        'Window': seconds // window_s * window_minutes,
+        'TeamID': df_analyzed['TeamID'].to_numpy(),
+        'Player': df_analyzed['Player'].to_numpy(),
+        'Events': 1,
+        'Outcome_Events': (success | fail).astype(int),
+        'Successful_Events': success.astype(int),
+        'Passes': is_pass.astype(int),
+        'Successful_Passes': (is_pass & success).astype(int),
+        'Shots': df_analyzed['Action'].isin(['Goal', 'Shot On Target', 'Shot', 'Blocked Shot']).to_numpy().astype(int),
+        'xG': df_analyzed['xG'].fillna(0).to_numpy() if 'xG' in df_analyzed.columns else 0.0,
+        'xT_Added': df_analyzed['xT_Added'].fillna(0).to_numpy() if 'xT_Added' in df_analyzed.columns else 0.0,
+    })
+
+    keys = ['Half', 'Window', 'TeamID', 'Player']
+    player_timeline = work.groupby(keys, sort=True, dropna=False).sum()
+    team_timeline = player_timeline.groupby(level=['Half', 'Window', 'TeamID'], sort=True, dropna=False).sum()
+
+    for timeline in (player_timeline, team_timeline):
+        timeline['Success_Rate'] = np.where(
+            timeline['Outcome_Events'] > 0,
+            timeline['Successful_Events'] / timeline['Outcome_Events'].where(timeline['Outcome_Events'] > 0, 1) * 100,
+            0
+        ).round(2)
+        timeline['Pass_Success_Rate'] = np.where(
+            timeline['Passes'] > 0,
+            timeline['Successful_Passes'] / timeline['Passes'].where(timeline['Passes'] > 0, 1) * 100,
+            0
+        ).round(2)
+        timeline['xG'] = timeline['xG'].round(3)
+        timeline['xT_Added'] = timeline['xT_Added'].round(4)
+
+    window_end = lambda frame: frame.index.get_level_values('Window') + window_minutes
+    player_timeline.insert(0, 'Window_End', window_end(player_timeline))
+    team_timeline.insert(0, 'Window_End', window_end(team_timeline))
+    return player_timeline, team_timeline
+
+
+# 이벤트 단위 카운터: 선수별로 합산하면 점수 계산에 쓰이는 요약 컬럼이 되는 값
+# (정수 변환으로 소수점이 잘리는 컬럼은 합산 후 다시 잘라야 함)
+TRUNCATED_COUNTERS = ['Own_Half_Pass_Score', 'Valid_Dribble_Distance', 'Total_Sprint_Distance']
+
+def build_event_counters(df_analyzed):
+    """
+    이벤트 x 카운터 행렬을 만듭니다. 선수별 열 합계가 create_player/shooter/cross/advanced_summary의
+    점수 관련 컬럼과 같습니다. (상대팀 기준 실점 지표는 이벤트 단위로 나눌 수 없으므로 제외)
+    반환: DataFrame (index = df_analyzed.index)
+    """
+    normalize_events(df_analyzed)
+    ensure_zone_index(df_analyzed)
+    action = df_analyzed['Action']
+    has = lambda tag: tag_mask(df_analyzed['Tags'], tag)
+    success = has('Success')
+    start_zone = df_analyzed['Start_Zone'].to_numpy()
+    end_zone = df_analyzed['End_Zone'].to_numpy()
+    final_third = in_zone(start_zone, ZONE_FINAL_THIRD)
+    own_half = in_zone(start_zone, ZONE_OWN_HALF)
+    distance = df_analyzed['Distance'].fillna(0).to_numpy() if 'Distance' in df_analyzed.columns else np.zeros(len(df_analyzed))
+    start_x = df_analyzed['StartX_adj'].to_numpy() if 'StartX_adj' in df_analyzed.columns else np.full(len(df_analyzed), np.nan)
+    end_x = df_analyzed['EndX_adj'].to_numpy() if 'EndX_adj' in df_analyzed.columns else np.full(len(df_analyzed), np.nan)
+    xg = df_analyzed['xG'].fillna(0).to_numpy() if 'xG' in df_analyzed.columns else np.zeros(len(df_analyzed))
+
+    is_pass = action.isin(['Pass', 'Cross']).to_numpy()
+    is_cross = (action == 'Cross').to_numpy()
+    is_shot = action.isin(['Goal', 'Shot On Target', 'Shot', 'Blocked Shot']).to_numpy()
+    is_sot = action.isin(['Goal', 'Shot On Target']).to_numpy()
+    is_goal = (action == 'Goal').to_numpy()
+    is_break_succ = (action == 'Breakthrough').to_numpy() & success
+    is_miss = (action == 'Miss').to_numpy()
+    is_offside = (action == 'Offside').to_numpy()
+    is_tackle = (action == 'Tackle').to_numpy()
+    is_duel = (action == 'Duel').to_numpy()
+    is_aerial = is_duel & has('Aerial')
+    is_clear = (action == 'Clear').to_numpy()
+    is_dribble = (action == 'Dribble').to_numpy()
+    is_sprint = (action == 'Sprint').to_numpy()
+    is_header = has('Header')
+    pass_succ = is_pass & success
+    x_gain = end_x - start_x
+
+    counters = {
+        # create_player_summary
+        'Total_Pass': is_pass,
+        'Success_Pass': pass_succ,
+        'Key_Pass': is_pass & has('Key'),
+        'Assist': is_pass & has('Assist'),
+        'Progressive_Pass_Success': pass_succ & is_progressive_pass(start_x, end_x),
+        'PA_Pass_Success': pass_succ & in_zone(end_zone, ZONE_PENALTY_AREA),
+        'Own_Half_Pass_Score': np.where(pass_succ & own_half, 0.5 + np.where(x_gain >= 5, x_gain * 0.1, 0), 0.0),
+        'Own_Half_Pass_Fail': is_pass & ~success & own_half,
+        # create_shooter_summary
+        'Goals': is_goal,
+        'Total_xG': np.where(is_shot, xg, 0.0),
+        'Headed_Goals': is_goal & is_header,
+        'Outbox_Goals': is_goal & has('Out-box'),
+        'Catch_Count': (action == 'Catching').to_numpy(),
+        # create_cross_summary
+        'Total_Crosses': is_cross,
+        'Successful_Crosses': is_cross & success,
+        'Central_PA_Cross_Success': is_cross & success & in_zone(end_zone, ZONE_PENALTY_AREA | ZONE_CENTRAL_CHANNEL),
+        # create_advanced_summary
+        'Pass_Success_Count': pass_succ,
+        'Breakthrough_Success': is_break_succ,
+        'Pass_Fail_Count': is_pass & ~success,
+        'Miss_Count': is_miss,
+        'FT_Pass_Success': final_third & pass_succ,
+        'FT_Breakthrough_Success': final_third & is_break_succ,
+        'FT_Pass_Fail': final_third & is_pass & ~success,
+        'FT_Miss': final_third & is_miss,
+        'FT_Offside': final_third & is_offside,
+        'Duel_Win_Count': is_duel & success,
+        'Total_Tackles': is_tackle,
+        'Successful_Tackles': is_tackle & success,
+        'Intercept_Count': (action == 'Intercept').to_numpy(),
+        'Clear_Count': is_clear,
+        'Block_Count': (action == 'Block').to_numpy(),
+        'Total_Aerial_Duels': is_aerial,
+        'Aerial_Duels_Won': is_aerial & success,
+        'Aerial_Duels_Lost': is_aerial & ~success,
+        'Received_Assist': is_shot & has('Assist'),
+        'Received_Key_Pass': is_shot & has('Key Pass'),
+        'SOT_Count': is_sot,
+        'Goal_Count': is_goal,
+        'Offside_Count': is_offside,
+        'Dribble_Attempt': is_dribble,
+        'Be_Fouled': (action == 'Be Fouled').to_numpy(),
+        'Valid_Dribble_Distance': np.where(is_dribble & (distance >= 5), distance, 0.0),
+        'Dribble_Fail_Count': is_dribble & ~success,
+        'Sprint_Count': is_sprint,
+        'Total_Sprint_Distance': np.where(is_sprint, distance, 0.0),
+        'Header_SOT': is_header & is_sot,
+        'Header_Clear': is_header & is_clear,
+    }
+    return pd.DataFrame({name: np.asarray(values, dtype=float) for name, values in counters.items()}, index=df_analyzed.index)
+
+
+def summarize_event_counters(counters):
+    """
+    선수별로 합산된 카운터(DataFrame 또는 행 단위 합계)에 요약 함수와 같은 비율/정수 처리를 적용합니다.
+    """
+    for col in TRUNCATED_COUNTERS:
+        counters[col] = np.trunc(counters[col])
+    counters['Pass_Success_Rate'] = np.where(counters['Total_Pass'] > 0, counters['Success_Pass'] / counters['Total_Pass'].where(counters['Total_Pass'] > 0, 1) * 100, 0).round(2)
+    counters['Cross_Accuracy'] = np.where(counters['Total_Crosses'] > 0, counters['Successful_Crosses'] / counters['Total_Crosses'].where(counters['Total_Crosses'] > 0, 1) * 100, 0).round(2)
+    return counters
+
+
+# 점수에는 쓰이지 않고 요약 시트에만 있는 컬럼의 이벤트 단위 카운터 (청크 집계용)
+PASS_DIRECTIONS = ['forward', 'left', 'right', 'backward']
+PASS_DISTANCES = ['short', 'middle', 'long']
+
+def build_summary_counters(df_analyzed):
+    """
+    build_event_counters에 요약 시트 전용 컬럼(패스 방향/거리, 슈팅 수, 태클/파울 등)을 더한 이벤트 x 카운터 행렬.
+    선수별 열 합계가 4개 요약 함수의 컬럼과 같습니다. (Fail_Pass, 비율, 실점 지표 제외)
+    """
+    counters = build_event_counters(df_analyzed)
+    action = df_analyzed['Action']
+    has = lambda tag: tag_mask(df_analyzed['Tags'], tag)
+    success = has('Success')
+    final_third = in_zone(df_analyzed['Start_Zone'].to_numpy(), ZONE_FINAL_THIRD)
+    is_pass = action.isin(['Pass', 'Cross']).to_numpy()
+    is_tackle = (action == 'Tackle').to_numpy()
+    is_foul = (action == 'Foul').to_numpy()
+    is_duel = (action == 'Duel').to_numpy()
+    empty = pd.Series('', index=df_analyzed.index)
+    direction = df_analyzed.get('Pass_Direction', empty)
+    distance = df_analyzed.get('Pass_Distance', empty)
+
+    extra = {
+        # create_player_summary
+        'Final_Third_Pass_Success': is_pass & success & final_third,
+        **{name: is_pass & (direction == name).to_numpy() for name in PASS_DIRECTIONS},
+        **{name: is_pass & (distance == name).to_numpy() for name in PASS_DISTANCES},
+        # create_shooter_summary
+        'Total_Shots': action.isin(['Goal', 'Shot On Target', 'Shot', 'Blocked Shot']).to_numpy(),
+        'Shots_On_Target': action.isin(['Goal', 'Shot On Target']).to_numpy(),
+        'Counter_Attack_Goals': (action == 'Goal').to_numpy() & has('Counter Attack'),
+        # create_advanced_summary
+        'Tackle_Count': is_tackle,
+        'Acquisition_Count': (action == 'Acquisition').to_numpy(),
+        'Foul_Count': is_foul,
+        'Duel_Lose_Count': is_duel & ~success,
+        'Final_Third_Tackle_Success': is_tackle & success & final_third,
+        'PA_Foul_Tackles': is_foul & has('In-box'),
+        'Cutout_Count': (action == 'Cutout').to_numpy(),
+        'Cross_Success': (action == 'Cross').to_numpy() & success,
+    }
+    for name, values in extra.items():
+        counters[name] = np.asarray(values, dtype=float)
+    return counters
+
+
+# build_player_stats와 같은 컬럼 순서 (패스 -> 슈팅 -> 크로스 -> 고급 요약)
+SUMMARY_COLUMNS = [
+    'Total_Pass', 'Success_Pass', 'Key_Pass', 'Assist', 'Fail_Pass', 'Pass_Success_Rate',
+    'Progressive_Pass_Success', 'Final_Third_Pass_Success', 'PA_Pass_Success',
+    'Own_Half_Pass_Score', 'Own_Half_Pass_Fail',
+] + PASS_DIRECTIONS + PASS_DISTANCES + [
+    'Total_Shots', 'Shots_On_Target', 'Goals', 'Total_xG', 'Headed_Goals', 'Outbox_Goals', 'Counter_Attack_Goals',
+    'Catch_Count', 'Total_SOT_xG_Conceded', 'Goals_Conceded',
+    'Total_Crosses', 'Successful_Crosses', 'Cross_Accuracy', 'Central_PA_Cross_Success',
+    'Pass_Success_Count', 'Breakthrough_Success', 'Pass_Fail_Count', 'Miss_Count',
+    'FT_Pass_Success', 'FT_Breakthrough_Success', 'FT_Pass_Fail', 'FT_Miss', 'FT_Offside',
+    'Tackle_Count', 'Duel_Win_Count', 'Intercept_Count', 'Acquisition_Count', 'Foul_Count', 'Duel_Lose_Count',
+    'Total_Tackles', 'Successful_Tackles', 'Final_Third_Tackle_Success', 'PA_Foul_Tackles',
+    'Clear_Count', 'Cutout_Count', 'Block_Count',
+    'Total_Aerial_Duels', 'Aerial_Duels_Won',
+    'Received_Assist', 'Received_Key_Pass', 'SOT_Count', 'Goal_Count', 'Offside_Count',
+    'Dribble_Attempt', 'Cross_Success', 'Be_Fouled',
+    'Valid_Dribble_Distance', 'Dribble_Fail_Count', 'Sprint_Count', 'Total_Sprint_Distance',
+    'Header_SOT', 'Header_Clear', 'Aerial_Duels_Lost',
+]
+# 요약 함수에서 실수형으로 남는 컬럼 (나머지는 정수형)
+FLOAT_COLUMNS = ['Pass_Success_Rate', 'Total_xG', 'Catch_Count', 'Total_SOT_xG_Conceded', 'Goals_Conceded', 'Cross_Accuracy']
+
+def summary_frame(counters):
+    """
+    합산된 카운터(실점 지표 포함)에 비율/정수 처리를 적용해 build_player_stats의 요약 컬럼 순서로 반환합니다.
+    """
+    stats = summarize_event_counters(counters)
+    stats['Fail_Pass'] = stats['Total_Pass'] - stats['Success_Pass']
+    stats = stats[SUMMARY_COLUMNS].copy()
+    int_cols = [col for col in SUMMARY_COLUMNS if col not in FLOAT_COLUMNS]
+    stats[int_cols] = stats[int_cols].astype(int)
+    return stats
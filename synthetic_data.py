@@ -0,0 +1,74 @@
+"""
+합성 이벤트/슈팅 데이터 생성기. 테스트와 성능 측정 스크립트(benchmarks.py)가 공유합니다.
+"""
+import numpy as np
+import pandas as pd
+
+import analysis
+import xg_model
+from stats_utils import convert_time_to_seconds, add_zone_index, is_in_penalty_area
+
+# --- 상수 ---
+SYNTHETIC_ACTIONS = (['Pass'] * 40 + ['Cross'] * 4 + ['Shot', 'Shot On Target', 'Goal', 'Blocked Shot']
+                     + ['Dribble'] * 3 + ['Breakthrough'] * 3
+                     + ['Tackle', 'Intercept', 'Clear', 'Miss', 'Duel', 'Duel', 'Foul', 'Be Fouled', 'Offside',
+                        'Catching', 'Block', 'Cutout', 'Acquisition', 'Gain', 'Sprint', 'Throw-in', 'Touch'])
+SYNTHETIC_TAGS = ['Success', 'Fail', 'Success, Progressive', 'Fail, Progressive', 'Success, Header',
+                  'Fail, Header', 'In-box', 'Success, Aerial', 'Fail, Aerial', 'Success, First Time']
+
+
+def synthetic_events(n_matches=38, events_per_match=1500, seed=0):
+    """
+    합성 이벤트 데이터 (경기당 2팀 x 11명). 벡터화된 분석 단계까지 적용된 형태로 반환합니다.
+    (키패스/어시스트 태깅은 생략)
+    """
+    rng = np.random.default_rng(seed)
+    n = n_matches * events_per_match
+    match_idx = np.repeat(np.arange(n_matches), events_per_match)
+    half = np.where(np.tile(np.arange(events_per_match), n_matches) < events_per_match // 2, '1st', '2nd')
+    home = rng.random(n) < 0.5
+    seconds = np.tile(np.arange(events_per_match) % (events_per_match // 2), n_matches) * (2700 // (events_per_match // 2))
+    player = np.where(home, 1, 12) + rng.integers(0, 11, n)
+    action = rng.choice(SYNTHETIC_ACTIONS, n)
+    has_receiver = np.isin(action, ['Pass', 'Cross', 'Throw-in'])
+    receiver = np.where(has_receiver, (np.where(home, 1, 12) + rng.integers(0, 11, n)).astype(str), '')
+    two_dots = has_receiver | np.isin(action, ['Dribble', 'Breakthrough', 'Sprint'])
+    df = pd.DataFrame({
+        'No': np.tile(np.arange(1, events_per_match + 1), n_matches),
+        'MatchID': np.char.add('M', match_idx.astype(str)),
+        'TeamID': np.where(home, np.char.add('T', (2 * match_idx % 20).astype(str)),
+                           np.char.add('T', ((2 * match_idx + 1) % 20).astype(str))),
+        'Half': half,
+        'Team': np.where(home, 'home', 'away'),
+        'Direction': np.where(home == (half == '1st'), 'right', 'left'),
+        'Time': [f"{s // 60:02d}:{s % 60:02d}" for s in seconds],
+        'Player': player.astype(str),
+        'Receiver': receiver,
+        'Action': action,
+        'StartX': rng.uniform(0, 105, n).round(1),
+        'StartY': rng.uniform(0, 68, n).round(1),
+        'EndX': np.where(two_dots, rng.uniform(0, 105, n).round(1), np.nan),
+        'EndY': np.where(two_dots, rng.uniform(0, 68, n).round(1), np.nan),
+        'Tags': rng.choice(SYNTHETIC_TAGS, n),
+    })
+    df['No'] = np.arange(1, n + 1)
+    df = convert_time_to_seconds(df)
+    df = analysis.analyze_pass_data(df)
+    df = add_zone_index(df)
+    return analysis.add_xg_to_data(df)
+
+
+def synthetic_shots(n_shots, coef, seed=0, shots_per_match=25):
+    """
+    xg_model.record_shots와 같은 형식의 합성 슈팅 기록 (득점은 coef 로지스틱 모델에서 추출)
+    """
+    rng = np.random.default_rng(seed)
+    x = 105 - rng.gamma(2.0, 7.0, n_shots).clip(0.5, 40)
+    y = (34 + rng.normal(0, 9, n_shots)).clip(1, 67)
+    tags = np.where(is_in_penalty_area(x, y), 'In-box', 'Out-box').astype(object)
+    tags = tags + np.where(rng.random(n_shots) < 0.15, ', Header', '') + np.where(rng.random(n_shots) < 0.2, ', Weak Foot', '')
+    features = xg_model.shot_features(pd.DataFrame({'StartX_adj': x, 'StartY_adj': y, 'Tags': tags}))
+    goals = rng.random(n_shots) < xg_model.predict(features, coef)
+    n_matches = max(n_shots // shots_per_match, 1)
+    return {'match_ids': np.array([f'M{m}' for m in range(n_matches)], dtype=str),
+            'match': rng.integers(0, n_matches, n_shots), 'features': features, 'goals': goals.astype(np.uint8)}
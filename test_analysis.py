@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+
+
+def test_assign_possessions_and_summary():
+    df = pd.DataFrame({
+        'MatchID': ['M1'] * 11,
+        'TeamID': ['A', 'A', 'B', 'B', 'B', 'B', 'B', 'B', 'B', 'B', 'B'],
+        'Half': ['1st'] * 6 + ['2nd'] * 5,
+        'Player': ['1', '2', '7', '7', '8', '9', '7', '9', '8', '8', '7'],
+        'Action': ['Pass', 'Pass', 'Pass', 'Pass', 'Pass', 'Shot', 'Pass', 'Goal', 'Gain', 'Clear', 'Pass'],
+        'Tags': ['Success', 'Fail', 'Success', 'Success', 'Success', '', 'Success', '', '', '', 'Fail'],
+        # 3 -> 4: 간격 32초 > max_gap_s, NaN 시간은 점유를 나누지 않음
+        'Time(s)': [0, 5, 8, 40, np.nan, 45, 50, 55, 57, 58, 59],
+        'StartX_adj': [10.0, 20.0, 80.0, 60.0, 65.0, 90.0, 50.0, 95.0, 30.0, 20.0, 40.0],
+        'EndX_adj': [20.0, 30.0, 70.0, 65.0, 85.0, np.nan, 60.0, np.nan, np.nan, np.nan, 50.0],
+    })
+    # 1-2: 같은 팀 | 3: 팀 변경 | 4-6: 시간 간격 초과 | 7-8: 전후반 변경 | 9-10: 획득(Gain) | 11: 상실(Clear) 다음
+    df = analysis.assign_possessions(df, max_gap_s=20)
+    assert df['PossessionID'].tolist() == [1, 1, 2, 3, 3, 3, 4, 4, 5, 5, 6]
+    assert df['Possession_Seq'].tolist() == [1, 2, 1, 1, 2, 3, 1, 2, 1, 2, 1]
+
+    summary = analysis.create_possession_summary(df)
+    assert summary.index.tolist() == [1, 2, 3, 4, 5, 6]
+    assert summary['Events'].tolist() == [2, 1, 3, 2, 2, 1]
+    assert summary['TeamID'].tolist() == ['A', 'B', 'B', 'B', 'B', 'B']
+    assert summary['Passes'].sum() == 7 and summary['Successful_Passes'].sum() == 5
+    assert summary['Shots'].tolist() == [0, 0, 1, 1, 0, 0] and summary['Goals'].sum() == 1
+    assert summary.loc[3, 'Duration'] == 5 and summary.loc[3, 'Players'] == 3
+    assert summary.loc[1, 'Progression'] == 20.0 and summary.loc[3, 'Max_X'] == 90.0
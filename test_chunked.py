@@ -0,0 +1,22 @@
+import pandas as pd
+
+import analysis
+from synthetic_data import synthetic_events
+from chunked import chunked_player_stats
+from schema import EVENT_COLUMNS
+
+
+def test_chunked_stats_match_in_memory_stats_and_ignore_chunk_size(tmp_path):
+    raw = synthetic_events(n_matches=1, events_per_match=1500)[EVENT_COLUMNS]
+    expected = analysis.build_player_stats(analysis.perform_full_analysis(raw.copy()))
+
+    # 경기 중간에서 잘린 원본 청크는 경기 단위로 다시 모아 분석
+    stats = chunked_player_stats([raw.iloc[:400], raw.iloc[400:1100], raw.iloc[1100:]], by='match')
+    pd.testing.assert_frame_equal(stats, expected, check_exact=False, rtol=1e-9)
+
+    # 이미 분석된 이벤트는 고정 크기 청크로 집계해도 결과가 같음
+    path = tmp_path / 'events.csv'
+    synthetic_events(n_matches=4, events_per_match=1500).to_csv(path, index=False)
+    small = chunked_player_stats(str(path), chunksize=700)
+    large = chunked_player_stats(str(path), chunksize=100_000)
+    pd.testing.assert_frame_equal(small, large, check_exact=False, rtol=1e-9)
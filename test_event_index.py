@@ -0,0 +1,78 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+import analysis
+import app
+import datasets
+import event_index
+from synthetic_data import synthetic_events
+
+
+def test_query_matches_boolean_filter_and_paginates():
+    df = analysis.ensure_analyzed(synthetic_events(n_matches=4, events_per_match=1500))
+    index = event_index.build_event_index(df)
+
+    filters = {'player': '7.0', 'action': ['Pass', 'Cross'], 'tags': 'Progressive', 'exclude_tags': ['Success'],
+               'zone': 'final_third', 'half': '2nd'}
+    tokens = df['Tags'].fillna('').str.split(',').apply(lambda tags: {tag.strip() for tag in tags})
+    expected = df.index[(df['Player'] == '7') & df['Action'].isin(['Pass', 'Cross']) & (df['Half'] == '2nd')
+                        & tokens.apply(lambda tags: 'Progressive' in tags and 'Success' not in tags)
+                        & ((df['Start_Zone'] & event_index.ZONES['final_third']) != 0)]
+    np.testing.assert_array_equal(event_index.match_rows(index, filters), expected)
+
+    shots = {'action': ['Shot', 'Goal'], 'time_from': '10:00', 'time_to': 900}
+    expected = df.index[df['Action'].isin(['Shot', 'Goal']) & df['Time(s)'].between(600, 900)]
+    total, page = event_index.query_events(index, shots, page=2, page_size=10)
+    assert total == len(expected) and list(page.index) == list(expected[10:20])
+    assert event_index.query_events(index, {'player': '99'})[0] == 0
+
+
+def test_dataset_routes_share_index_through_disk(monkeypatch, tmp_path):
+    monkeypatch.setattr(datasets, 'DATASET_DIR', str(tmp_path))
+    buffer = io.BytesIO()
+    synthetic_events(n_matches=1, events_per_match=300).to_excel(buffer, index=False)
+    client = app.app.test_client()
+    registered = client.post('/datasets', data={'file': (io.BytesIO(buffer.getvalue()), 'match.xlsx')}).get_json()
+    assert registered['events'] == 300 and 'Pass' in registered['actions']
+
+    # 다른 워커처럼 메모리 인덱스 없이 디스크에서 다시 읽음
+    datasets.clear_memory()
+    body = {'dataset_id': registered['dataset_id'], 'action': 'Pass', 'page_size': 5}
+    response = client.post('/query_events', json=body).get_json()
+    assert len(response['events']) == 5 and {event['Action'] for event in response['events']} == {'Pass'}
+    assert client.post('/query_events', json={**body, 'zone': 'midfield'}).status_code == 400
+    assert client.post('/query_events', json={'dataset_id': 'missing'}).status_code == 404
+
+
+def test_dataset_file_is_memory_mapped_and_evicted(monkeypatch, tmp_path):
+    monkeypatch.setattr(datasets, 'DATASET_DIR', str(tmp_path))
+    df = synthetic_events(n_matches=2, events_per_match=800)
+    datasets.register('a', df.copy())
+    datasets.clear_memory()
+    index = datasets.get_index('a')
+
+    # 숫자 컬럼과 인덱스 배열은 파일 매핑을 그대로 가리킴
+    mapped = index['order']
+    while mapped is not None and not isinstance(mapped, np.memmap):
+        mapped = mapped.base
+    assert mapped is not None
+    assert np.shares_memory(index['df']['StartX'].to_numpy(), mapped)
+    expected = event_index.build_event_index(df)
+    filters = {'player': '7', 'action': 'Pass', 'exclude_tags': 'Success', 'time_from': '05:00'}
+    np.testing.assert_array_equal(event_index.match_rows(index, filters), event_index.match_rows(expected, filters))
+    _, page = event_index.query_events(index, filters, page_size=20)
+    _, expected_page = event_index.query_events(expected, filters, page_size=20)
+    assert page.astype(str).to_dict(orient='records') == expected_page.astype(str).to_dict(orient='records')
+
+    # 한도를 넘으면 오래 안 쓴 파일부터 삭제
+    path = tmp_path / 'a.fpad'
+    monkeypatch.setattr(datasets, 'DISK_LIMIT_BYTES', path.stat().st_size + 1024)
+    os.utime(path, (0, 0))
+    datasets.register('b', synthetic_events(n_matches=2, events_per_match=800, seed=1))
+    assert not path.exists() and (tmp_path / 'b.fpad').exists()
+    datasets.clear_memory()
+    with pytest.raises(KeyError):
+        datasets.get_index('a')
@@ -0,0 +1,56 @@
+import os
+
+import app
+import journal
+
+
+def _result(i):
+    return {'log_text': f'log {i}', 'log_data': {'Time': f'00:{i:02d}', 'Team': 'home', 'Player': str(i), 'Action': 'Pass',
+                                                  'Receiver': '', 'Coord': 'Pos(1.0, 2.0)', 'Tags': 'Success'}}
+
+
+def test_journal_replay_snapshot_and_torn_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, 'JOURNAL_DIR', str(tmp_path))
+    monkeypatch.setattr(journal, 'SNAPSHOT_EVERY', 4)
+    for i in range(10):
+        journal.append_logs('M 1', [_result(i)])
+    journal.undo('M 1')
+    journal.append_logs('M 1', [_result(10), {'error': 'x'}])
+
+    expected = [_result(i) for i in list(range(9)) + [10]]
+    session = journal.load_session('M 1')
+    assert session['logs'] == [r['log_text'] for r in expected]
+    assert session['log_data'] == [r['log_data'] for r in expected]
+    assert session['records'] == 12
+
+    # 스냅샷 없이 전체 저널을 다시 적용해도 같은 결과
+    path = journal.journal_path('M 1')
+    os.unlink(journal._snapshot_path(path))
+    assert journal.load_session('M 1') == session
+
+    # 쓰기 도중 끊긴 마지막 줄은 무시하고, 다음 기록은 새 줄에서 시작
+    with open(path, 'ab') as f:
+        f.write(b'{"op": "add", "log_te')
+    assert journal.load_session('M 1')['logs'] == session['logs']
+    journal.append_logs('M 1', [_result(11)])
+    assert journal.load_session('M 1')['logs'] == session['logs'] + ['log 11']
+
+    # 파일 이름에 쓸 수 없는 문자만 다른 Match ID도 서로 다른 저널
+    assert len({journal.journal_path(m) for m in ['M 1', 'M_1', 'M/1', 'M.1']}) == 4
+    assert journal.load_session('M_1')['logs'] == []
+
+
+def test_journal_routes(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, 'JOURNAL_DIR', str(tmp_path))
+    client = app.app.test_client()
+    dots = [{'meter_x': 30, 'meter_y': 20}, {'meter_x': 50, 'meter_y': 30}]
+    item = {'stat_input': '10ss8', 'dots': dots, 'half': '1st', 'team': 'home', 'direction': 'right', 'timeline': '10:00'}
+
+    first = client.post('/generate_log', json={**item, 'match_id': 'M1'}).get_json()
+    batch = client.post('/generate_log_batch', json={'items': [item, {**item, 'stat_input': '10x'}], 'match_id': 'M1'}).get_json()
+    assert batch['ok'] == 1 and batch['records'] == 2
+    assert client.post('/journal/undo', json={'match_id': 'M1'}).get_json() == {'records': 3}
+
+    session = client.get('/journal?match_id=M1').get_json()
+    assert session['logs'] == [first['log_text']] and session['log_data'] == [first['log_data']]
+    assert client.post('/journal', json={'match_id': ''}).status_code == 400
@@ -0,0 +1,23 @@
+import app
+from live_log import translate_items, translate_log
+
+
+def test_translate_log_rules_and_batch_route():
+    dots = [{'meter_x': 30, 'meter_y': 20}, {'meter_x': 50, 'meter_y': 30}]
+    log_text, log_data = translate_log('10ss8.sw', dots, '1st', 'home', 'right', '10:00')
+    assert log_text == '1st | home | right | 10:00 | Pos(30.0, 20.0) | 10 Pass to 8 | Pos(50.0, 30.0) | Tags: Progressive, Success, Switch'
+    assert log_data['Player'] == '10' and log_data['Receiver'] == '8' and log_data['Coord'] == 'Pos(30.0, 20.0)'
+
+    # 단독 액션: 좌표 1개, 페널티 박스 밖 슈팅은 Out-box / 세이브(sv)는 's'로 시작해도 받는 선수 불필요
+    assert translate_log('9d', dots, '2nd', 'away', 'left', '50:00')[1]['Tags'] == 'Fail, Out-box'
+    assert translate_log('1sv', dots[:1], '2nd', 'away', 'left', '50:00')[1]['Action'] == 'Save'
+    assert translate_log('7', dots[:1], '1st', 'home', 'right', '01:00')[1]['Action'] == 'Touch'
+
+    items = [{'stat_input': '10SS8', 'dots': dots}, {'stat_input': '10s', 'dots': dots}, {'stat_input': '10x', 'dots': dots}]
+    results = translate_items(items, {'half': '1st', 'team': 'home', 'direction': 'right', 'timeline': '00:30'})
+    assert results[0]['log_data']['Action'] == 'Pass'
+    assert 'error' in results[1] and 'error' in results[2]
+
+    response = app.app.test_client().post('/generate_log_batch', json={'items': items, 'half': '1st', 'team': 'home',
+                                                                         'direction': 'right', 'timeline': '00:30'})
+    assert response.get_json() == {'results': results, 'ok': 1, 'errors': 2}
@@ -0,0 +1,59 @@
+import pandas as pd
+
+import analysis
+import pipeline
+from synthetic_data import synthetic_events
+from schema import EVENT_COLUMNS
+
+
+def test_stage_dag_matches_full_analysis_and_recomputes_only_affected_stages(monkeypatch):
+    monkeypatch.setattr(pipeline, 'DISK_LIMIT_BYTES', 0)
+    pipeline.clear_cache()
+    raw = synthetic_events(n_matches=1, events_per_match=600)[EVENT_COLUMNS]
+
+    events = pipeline.analyze_events(raw)
+    expected = analysis.perform_full_analysis(raw.copy())
+    pd.testing.assert_frame_equal(events, expected)
+    all_stats, _ = pipeline.player_stats(events)
+    pd.testing.assert_frame_equal(all_stats, analysis.build_player_stats(expected), check_dtype=False)
+
+    computed = []
+    put = pipeline._cache_put
+    monkeypatch.setattr(pipeline, '_cache_put', lambda key, value, persist=True: (computed.append(key), put(key, value, persist)))
+    names = {}
+    run_stage = pipeline._run_stage
+    def spy(stage, *args):
+        key, value = run_stage(stage, *args)
+        names[key] = stage.name
+        return key, value
+    monkeypatch.setattr(pipeline, '_run_stage', spy)
+
+    # 같은 입력은 모두 캐시에서, 이벤트 하나의 Tags를 바꾸면 Tags에 의존하는 단계만 다시 계산
+    pipeline.player_stats(pipeline.analyze_events(raw))
+    assert computed == []
+    edited = raw.copy()
+    edited.loc[edited.index[5], 'Tags'] = 'Header'
+    events = pipeline.analyze_events(edited)
+    all_stats, _ = pipeline.player_stats(events)
+    recomputed = {names[key] for key in computed}
+    assert {'time', 'possessions', 'pass_geometry', 'zones'}.isdisjoint(recomputed)
+    assert {'key_pass_tags', 'xg', 'player_stats'} <= recomputed
+    pd.testing.assert_frame_equal(all_stats, analysis.build_player_stats(analysis.perform_full_analysis(edited.copy())),
+                                  check_dtype=False)
+
+
+def test_only_expensive_stages_are_written_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, 'CACHE_DIR', str(tmp_path / 'pipeline_cache'))
+    monkeypatch.setattr(pipeline, 'DISK_LIMIT_BYTES', 64 * 1024 * 1024)
+    pipeline.clear_cache()
+    raw = synthetic_events(n_matches=1, events_per_match=300, seed=1)[EVENT_COLUMNS]
+    all_stats, _ = pipeline.player_stats(pipeline.analyze_events(raw))
+
+    written = sorted(p.stem for p in (tmp_path / 'pipeline_cache').rglob('*.pkl'))
+    assert len(written) == len(pipeline.DISK_STAGES)
+    # 메모리 캐시를 비워도 디스크의 단계 결과와 다시 계산한 가벼운 단계로 같은 결과
+    pipeline.clear_cache()
+    again, _ = pipeline.player_stats(pipeline.analyze_events(raw))
+    pd.testing.assert_frame_equal(again, all_stats)
+    assert sorted(p.stem for p in (tmp_path / 'pipeline_cache').rglob('*.pkl')) == written
+    pipeline.clear_cache()
@@ -0,0 +1,47 @@
+import numpy as np
+
+import percentile_scoring
+from quantile_sketch import TDigest
+from synthetic_data import synthetic_events
+
+
+def test_merged_sketch_matches_empirical_cdf():
+    rng = np.random.default_rng(0)
+    data = rng.normal(10, 5, 50000)
+
+    # 경기 단위로 나눠 만든 스케치를 병합해도 전체 분포와 같아야 함
+    merged = TDigest()
+    for chunk in np.array_split(data, 200):
+        merged.merge(TDigest().update(chunk))
+
+    xs = np.array([0.0, 5.0, 10.0, 15.0, 20.0])
+    expected = np.searchsorted(np.sort(data), xs) / len(data)
+    assert len(merged.means) <= merged.compression
+    np.testing.assert_allclose(merged.cdf(xs), expected, atol=0.01)
+
+
+def test_round_trip_and_point_mass():
+    sketch = TDigest().update(np.r_[np.zeros(100), np.arange(1, 101)])
+    restored = TDigest.from_dict(sketch.to_dict())
+
+    assert restored.count == sketch.count
+    assert restored.cdf(-1.0) == 0.0 and restored.cdf(1000.0) == 1.0
+    # 0에 몰린 질량의 가운데 -> 약 0.25
+    assert abs(restored.cdf(0.0) - 0.25) < 0.02
+
+
+def test_reference_replaces_reexported_match(tmp_path):
+    path = str(tmp_path / 'score_sketches.json')
+    full = synthetic_events(2, 600, seed=4)
+    first_half = full[full['Half'] == '1st']
+
+    percentile_scoring.update_reference(first_half, path=path)
+    reference = percentile_scoring.update_reference(full, path=path)
+    assert reference['match_ids'] == ['M0', 'M1']
+
+    # 전반만 내보낸 경기를 전체로 다시 내보내면 처음부터 전체를 반영한 것과 같은 분포
+    expected = percentile_scoring.update_reference(full, path=str(tmp_path / 'fresh.json'))
+    loaded = percentile_scoring.load_reference(path)
+    for raw_col, sketch in expected['sketches'].items():
+        assert loaded['sketches'][raw_col].count == sketch.count
+        np.testing.assert_allclose(loaded['sketches'][raw_col].means, sketch.means, atol=1e-5)
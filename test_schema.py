@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+import pipeline
+from schema import ANALYSIS_ATTR, ANALYSIS_VERSION, SCHEMA_ATTR, invalidate_analysis, is_analyzed, normalize_events, player_id
+
+
+def test_normalize_events_is_canonical_and_skipped_when_marked():
+    df = pd.DataFrame({
+        'Player': [10.0, 7.0, np.nan], 'Receiver': [7.0, np.nan, 10.0],
+        'Action': ['Pass', 'Tackle', None], 'Tags': ['Success', np.nan, ''],
+        'StartX': ['10.5', 'x', 3], 'StartY': [1, 2, 3], 'EndX': [20, None, 1], 'EndY': [5, 6, 7],
+    })
+    normalize_events(df)
+
+    assert df.attrs[SCHEMA_ATTR]
+    assert df['Player'].tolist() == ['10', '7', ''] and df['Receiver'].tolist() == ['7', '', '10']
+    assert df['Tags'].tolist() == ['Success', '', ''] and df['Action'].tolist() == ['Pass', 'Tackle', '']
+    assert df['StartX'].isna().tolist() == [False, True, False]
+    assert df['No'].tolist() == [1, 2, 3]
+    assert player_id(10.0) == player_id('10') == '10'
+
+    # 표시가 있는 프레임은 다시 정규화/분석하지 않음 (같은 객체 반환)
+    assert normalize_events(df) is df
+    analyzed = analysis.perform_full_analysis(df.assign(Time='00:10', Direction='right', TeamID='H', Half='1st'))
+    assert is_analyzed(analyzed)
+    assert analysis.perform_full_analysis(analyzed) is analyzed
+    assert analysis.ensure_analyzed(analyzed) is analyzed
+
+
+def test_analyzed_marker_does_not_follow_derived_frames(monkeypatch):
+    monkeypatch.setattr(pipeline, 'DISK_LIMIT_BYTES', 0)
+    df = pd.DataFrame({'Time': ['00:10', '00:20', '00:30'], 'Direction': 'right', 'TeamID': 'H', 'Half': '1st',
+                       'Player': ['10', '7', '10'], 'Receiver': ['7', '', ''], 'Action': ['Pass', 'Tackle', 'Shot'],
+                       'Tags': ['Success', '', ''], 'StartX': [50, 60, 95], 'StartY': [30, 30, 34], 'EndX': [60, None, None],
+                       'EndY': [30, None, None]})
+    analyzed = analysis.perform_full_analysis(df)
+    assert analyzed.attrs[ANALYSIS_ATTR] == ANALYSIS_VERSION
+    assert is_analyzed(analyzed.copy())
+
+    # 표시는 attrs로 따라가지만, 행이 바뀌었거나 분석 컬럼이 빠진 프레임은 다시 분석
+    subset = analyzed[analyzed['Action'] == 'Pass']
+    assert subset.attrs[ANALYSIS_ATTR] == ANALYSIS_VERSION and not is_analyzed(subset)
+    assert not is_analyzed(analyzed.drop(columns=['xG']))
+    assert analysis.ensure_analyzed(analyzed.drop(columns=['xG']))['xG'].notna().sum() == 1
+
+    # 이벤트 값을 수정한 프레임은 표시를 무효화하면 분석 컬럼이 있어도 다시 분석
+    edited = invalidate_analysis(analyzed.copy())
+    edited.loc[2, 'Action'] = 'Goal'
+    assert not is_analyzed(edited) and SCHEMA_ATTR not in edited.attrs
+    reanalyzed = analysis.ensure_analyzed(edited)
+    assert is_analyzed(reanalyzed) and reanalyzed['xG'].notna().sum() == 1
+    assert pipeline.analyze_events(edited)[reanalyzed.columns].equals(reanalyzed)
+    assert analysis.ensure_analyzed(analyzed[analyzed['Action'] == 'Pass'])['Possession_Seq'].tolist() == [1]
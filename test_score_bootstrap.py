@@ -0,0 +1,25 @@
+import numpy as np
+
+import analysis
+from synthetic_data import synthetic_events
+from scoring import RAW_SCORE_COLUMNS, calculate_all_scores
+from score_bootstrap import FIXED_COLUMNS, bootstrap_score_intervals
+from summaries import build_event_counters, summarize_event_counters
+
+
+def test_event_counters_reproduce_summary_scores():
+    df = synthetic_events(n_matches=1, events_per_match=1500)
+    stats = analysis.build_player_stats(df)
+
+    # 가중치가 모두 1인 리샘플(원래 데이터)은 pandas 요약 파이프라인과 같은 Raw/Score를 내야 함
+    counters = summarize_event_counters(build_event_counters(df).groupby(df['Player']).sum())
+    for col in FIXED_COLUMNS:
+        counters[col] = stats[col]
+    scored = calculate_all_scores(counters).reindex(stats.index)
+
+    for raw_col, score_col in RAW_SCORE_COLUMNS.items():
+        np.testing.assert_allclose(scored[raw_col], stats[raw_col], err_msg=raw_col)
+        np.testing.assert_array_equal(scored[score_col], stats[score_col], err_msg=score_col)
+
+    intervals = bootstrap_score_intervals(df, stats, n_resamples=200)
+    assert (intervals['Passing_Score_Low'] <= intervals['Passing_Score_High']).all()
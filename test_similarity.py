@@ -0,0 +1,51 @@
+import functools
+
+import numpy as np
+
+import app
+import pipeline
+import similarity
+from synthetic_data import synthetic_events
+
+
+def test_similarity_index_updates_incrementally_and_answers_knn(tmp_path, monkeypatch):
+    # 단계 캐시는 메모리에만 (저장소의 data/에 쓰지 않음)
+    monkeypatch.setattr(pipeline, 'DISK_LIMIT_BYTES', 0)
+    path = str(tmp_path / 'similarity_index.npz')
+    df = synthetic_events(n_matches=2, events_per_match=1500)
+    # 전반만 내보낸 뒤 전체 경기를 다시 내보내면 그 경기의 행을 교체
+    first_half = df[(df['MatchID'] == 'M0') & (df['Half'] == '1st')]
+    assert similarity.update_index(first_half, path) == 22
+    halftime_vectors = similarity.load_index(path)['features']
+    assert similarity.update_index(df, path) == 44
+    assert similarity.update_index(df, path) == 0
+    assert not np.array_equal(similarity.load_index(path)['features'][-44:-22], halftime_vectors)
+    other = synthetic_events(n_matches=1, events_per_match=1500, seed=1).assign(MatchID='N0')
+    assert similarity.update_index(other, path) == 22
+
+    index = similarity.load_index(path)
+    assert index['normalized'].shape == (66, len(similarity.FEATURE_COLUMNS))
+    np.testing.assert_allclose(index['normalized'].mean(axis=0), 0, atol=1e-5)
+
+    neighbors = similarity.find_similar('M0', '5', k=5, path=path)
+    assert len(neighbors) == 5 and not ((neighbors['Match_ID'] == 'M0') & (neighbors['Player'] == '5')).any()
+    assert neighbors['Distance'].is_monotonic_increasing
+
+    # KD-tree와 전체 탐색의 결과가 같음
+    monkeypatch.setattr(similarity, 'TREE_MIN_ROWS', 0)
+    similarity._searchers.clear()
+    tree_neighbors = similarity.find_similar('M0', '5', k=5, features='scores', path=path)
+    monkeypatch.setattr(similarity, 'TREE_MIN_ROWS', 10 ** 9)
+    similarity._searchers.clear()
+    brute_neighbors = similarity.find_similar('M0', '5', k=5, features='scores', path=path)
+    np.testing.assert_allclose(tree_neighbors['Distance'], brute_neighbors['Distance'], atol=1e-3)
+
+    monkeypatch.setattr(similarity, 'find_similar', functools.partial(similarity.find_similar, path=path))
+    response = app.app.test_client().post('/similar_players', json={'match_id': 'M0', 'player_id': '5.0', 'k': 3})
+    assert len(response.get_json()['neighbors']) == 3
+    for k in [0, -3, 'x']:
+        assert app.app.test_client().post('/similar_players', json={'match_id': 'M0', 'player_id': '5', 'k': k}).status_code == 400
+    monkeypatch.setattr(similarity, 'MAX_K', 4)
+    response = app.app.test_client().post('/similar_players', json={'match_id': 'M0', 'player_id': '5', 'k': 10 ** 6})
+    assert len(response.get_json()['neighbors']) == 4
+    assert app.app.test_client().post('/similar_players', json={'match_id': 'X', 'player_id': '5'}).status_code == 404
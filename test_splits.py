@@ -0,0 +1,45 @@
+import pandas as pd
+
+import analysis
+import app
+import pipeline
+import splits
+from synthetic_data import synthetic_events
+
+
+def test_split_stats_match_per_slice_recomputation(monkeypatch):
+    # 단계 캐시는 메모리에만 (저장소의 data/에 쓰지 않음)
+    monkeypatch.setattr(pipeline, 'DISK_LIMIT_BYTES', 0)
+    df = synthetic_events(n_matches=1, events_per_match=1500)
+    results = splits.split_stats(df, {'Player': ['Player'], **splits.DEFAULT_SPLITS})
+
+    # 경기 하나에서 선수 분할은 build_player_stats와 같음
+    expected = analysis.build_player_stats(df)
+    pd.testing.assert_frame_equal(results['Player'].loc[expected.index], expected, check_exact=False,
+                                  rtol=1e-9, check_names=False)
+
+    # 팀-전후반 조각을 따로 계산한 결과와 같음 (실점 지표는 같은 전후반의 상대팀 기준이라 제외)
+    for (team, half), part in df.groupby(['TeamID', 'Half']):
+        expected = analysis.build_player_stats(part.reset_index(drop=True)).drop(
+            columns=['Total_SOT_xG_Conceded', 'Goals_Conceded', 'SAV_Raw', 'SAV_Score'])
+        stats = results['Player_Half_Split'].xs(('M0', team, half), level=['MatchID', 'TeamID', 'Half'])
+        pd.testing.assert_frame_equal(stats.loc[expected.index, expected.columns], expected, check_exact=False,
+                                      rtol=1e-9, check_names=False)
+
+    # 팀 분할의 실점은 상대팀 득점
+    team = results['Team_Split'].droplevel('MatchID')
+    assert team.loc['T0', 'Goals_Conceded'] == team.loc['T1', 'Goals']
+
+
+def test_split_summary_route_validates_keys(monkeypatch):
+    # 단계 캐시는 메모리에만 (저장소의 data/에 쓰지 않음)
+    monkeypatch.setattr(pipeline, 'DISK_LIMIT_BYTES', 0)
+    client = app.app.test_client()
+    logs = ['1st | home | right | 00:10 | Pos(50.0, 30.0) | 10 Pass to 8 | Pos(60.0, 30.0) | Tags: Success',
+            '2nd | away | left | 00:20 | Pos(90.0, 30.0) | 5 Shot On Target | Tags: In-box, Success']
+    body = {'logs': logs, 'match_id': 'M1', 'teamid_h': 'H', 'teamid_a': 'A'}
+    response = client.post('/split_summary', json={**body, 'by': 'Half,TeamID'})
+    rows = response.get_json()['splits']['TeamID_Half']
+    assert [(row['TeamID'], row['Half'], row['Total_Pass']) for row in rows] == [('A', '2nd', 0), ('H', '1st', 1)]
+    assert set(client.post('/split_summary', json=body).get_json()['splits']) == set(splits.DEFAULT_SPLITS)
+    assert client.post('/split_summary', json={**body, 'by': 'Minute'}).status_code == 400
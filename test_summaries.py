@@ -0,0 +1,133 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+import render_cache
+from stats_utils import parse_time_seconds
+from summaries import create_pass_network, create_timeline_summary
+from synthetic_data import synthetic_events
+
+
+def test_parse_time_seconds():
+    times = pd.Series(['00:00', '12:34', ' 45 : 07 ', '1:02:03', '95:30', '', None, 'abc', '12:34:56:78', np.nan])
+    assert parse_time_seconds(times).tolist() == [0, 754, 2707, 3723, 5730, 0, 0, 0, 0, 0]
+
+
+def test_timeline_summary_windows():
+    df = pd.DataFrame({
+        'Half': ['1st', '1st', '1st', '1st', '2nd', '2nd'],
+        'TeamID': ['A', 'A', 'A', 'B', 'A', 'A'],
+        'Player': ['7', '7', '10', '9', '7', '7'],
+        'Action': ['Pass', 'Pass', 'Shot', 'Tackle', 'Pass', 'Cross'],
+        'Tags': ['Success', 'Fail', '', 'Success', 'Success', 'Fail'],
+        'Time(s)': [0, 899, 900, 60, 30, 1900],
+        'xG': [np.nan, np.nan, 0.25, np.nan, np.nan, np.nan],
+    })
+    player, team = create_timeline_summary(df, 15)
+    assert player.index.tolist() == [('1st', 0, 'A', '7'), ('1st', 0, 'B', '9'), ('1st', 15, 'A', '10'),
+                                     ('2nd', 0, 'A', '7'), ('2nd', 30, 'A', '7')]
+    first = player.loc[('1st', 0, 'A', '7')]
+    assert (first['Window_End'], first['Events'], first['Passes'], first['Pass_Success_Rate']) == (15, 2, 2, 50.0)
+    assert player.loc[('1st', 15, 'A', '10'), 'xG'] == 0.25
+    assert team.loc[('1st', 0, 'A'), 'Events'] == 2 and team['Events'].sum() == len(df)
+
+    # 소수 구간(분)은 그대로, 0 이하는 거부
+    player, _ = create_timeline_summary(df, 7.5)
+    assert player.index.get_level_values('Window').tolist() == [0.0, 0.0, 7.5, 15.0, 0.0, 30.0]
+    with pytest.raises(ValueError):
+        create_timeline_summary(df, 0)
+    with pytest.raises(ValueError):
+        create_timeline_summary(df, -15)
+
+
+def test_export_rejects_invalid_options():
+    client = app.app.test_client()
+    logs = ['1st | home | right | 10:00 | Pos(30.0, 20.0) | 10 | Pass | 8 | Success']
+    for window in ['abc', 0, -15, 'nan']:
+        response = client.post('/export', json={'logs': logs, 'timeline_window': window})
+        assert response.status_code == 400, window
+    for mode in ['zscore', 'Percentile']:
+        response = client.post('/export', json={'logs': logs, 'scoring_mode': mode})
+        assert response.status_code == 400, mode
+    response = client.post('/upload_analyze', data={'file': (io.BytesIO(b''), 'a.xlsx'), 'scoring_mode': 'zscore'})
+    assert response.status_code == 400
+
+
+def test_pass_network_edges_and_nodes():
+    df = pd.DataFrame({
+        'TeamID': ['A', 'A', 'A', 'A', 'B', 'B'],
+        'Player': ['7', '7', '10', '7', '7', '9'],
+        'Receiver': ['10', '10', '7', '', '9', ''],
+        'Action': ['Pass', 'Pass', 'Pass', 'Shot', 'Pass', 'Tackle'],
+        'Tags': ['Success', 'Fail', 'Success', '', 'Success', 'Success'],
+        'StartX_adj': [10.0, 20.0, 30.0, np.nan, 50.0, 60.0],
+        'StartY_adj': [5.0, 15.0, 25.0, np.nan, 30.0, 40.0],
+    })
+    edges, nodes = create_pass_network(df)
+
+    # 같은 번호(7)라도 팀이 다르면 다른 노드
+    assert edges.values.tolist() == [
+        ['A', '7', '10', 2, 1],
+        ['A', '10', '7', 1, 1],
+        ['B', '7', '9', 1, 1],
+    ]
+    assert nodes['Player'].tolist() == ['10', '7', '7', '9']
+    a7 = nodes[(nodes['TeamID'] == 'A') & (nodes['Player'] == '7')].iloc[0]
+    assert (a7['Avg_X'], a7['Avg_Y'], a7['Events']) == (15.0, 10.0, 2)
+    assert (a7['Passes_Made'], a7['Passes_Received']) == (2, 1)
+    b9 = nodes[(nodes['TeamID'] == 'B') & (nodes['Player'] == '9')].iloc[0]
+    assert (b9['Events'], b9['Passes_Made'], b9['Passes_Received']) == (1, 0, 1)
+
+
+def test_pass_network_is_cached_per_team(tmp_path, monkeypatch):
+    import visualization
+    monkeypatch.setattr(render_cache, 'CACHE_DIR', str(tmp_path / 'render_cache'))
+    monkeypatch.setattr(app.datasets, 'DATASET_DIR', str(tmp_path / 'datasets'))
+    app.datasets.clear_memory()
+    render_cache.clear_memory()
+    drawn = []
+    monkeypatch.setattr(visualization, 'draw_pass_network_flask', lambda edges, nodes, team: drawn.append(team) or f'img-{team}')
+
+    buffer = io.BytesIO()
+    synthetic_events(n_matches=1, events_per_match=300).to_excel(buffer, index=False)
+    client = app.app.test_client()
+
+    def pass_network(player_id):
+        data = {'file': (io.BytesIO(buffer.getvalue()), 'match.xlsx'), 'player_id': player_id, 'vis_types': 'pass_network'}
+        return client.post('/upload_analyze_visualize', data=data).get_json()['pass_network']
+
+    # 홈 선수(1~11)는 같은 팀 이미지를 공유
+    assert pass_network('3') == pass_network('5') == 'img-T0'
+    assert pass_network('15') == 'img-T1'
+    assert pass_network('99') is None
+    assert drawn == ['T0', 'T1']
+    render_cache.clear_memory()
+
+
+def test_pass_network_with_blank_team_from_dataset_file(tmp_path, monkeypatch):
+    import visualization
+    monkeypatch.setattr(app.datasets, 'DATASET_DIR', str(tmp_path / 'datasets'))
+    app.datasets.clear_memory()
+    render_cache.clear_memory()
+    monkeypatch.setattr(visualization, 'draw_pass_network_flask', lambda edges, nodes, team: f'img-{team}')
+
+    # teamid_a를 비워 내보낸 파일처럼 원정 TeamID가 빈 칸인 워크북
+    df = synthetic_events(n_matches=1, events_per_match=300)
+    df['TeamID'] = df['TeamID'].where(df['Team'] == 'home', '')
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    client = app.app.test_client()
+
+    # 업로드한 파일은 등록된 데이터셋 파일(문자열 컬럼이 범주 코드)에서 읽음 (두 번째는 분석 없이 파일만)
+    for attempt in range(2):
+        monkeypatch.setattr(render_cache, 'CACHE_DIR', str(tmp_path / f'render_cache{attempt}'))
+        render_cache.clear_memory()
+        app.datasets.clear_memory()
+        data = {'file': (io.BytesIO(buffer.getvalue()), 'match.xlsx'), 'player_id': '3', 'vis_types': 'pass_network'}
+        response = client.post('/upload_analyze_visualize', data=data)
+        assert response.status_code == 200
+        assert response.get_json()['pass_network'] == 'img-T0'
+    render_cache.clear_memory()
@@ -0,0 +1,57 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+import analysis
+import app
+import datasets
+import render_cache
+import visual_data
+from synthetic_data import synthetic_events
+
+
+def test_visual_data_matches_server_plot_selection_and_round_trips():
+    df = analysis.ensure_analyzed(synthetic_events(n_matches=1, events_per_match=600))
+    data = visual_data.build_visual_data(df)
+    arrays, players = data['arrays'], data['meta']['players']
+    assert arrays['heat'].shape == (len(players), visual_data.HEAT_ROWS, visual_data.HEAT_COLS)
+
+    # visualization.plot_pass_map과 같은 패스, 같은 성공 여부
+    for i, p in enumerate(players):
+        passes = df[(df['Player'] == p) & df['Action'].str.contains('Pass', case=False, na=False)].dropna(
+            subset=['StartX_adj', 'StartY_adj', 'EndX_adj', 'EndY_adj'])
+        lo, hi = arrays['pass_offsets'][i], arrays['pass_offsets'][i + 1]
+        np.testing.assert_allclose(arrays['pass_end_x'][lo:hi] / visual_data.COORD_SCALE, passes['EndX_adj'], atol=0.05)
+        np.testing.assert_array_equal(arrays['pass_success'][lo:hi] == 1, passes['Tags'].str.contains('Success'))
+        assert arrays['heat'][i].max() == 255
+
+    decoded = visual_data.decode_binary(visual_data.encode_binary(data))
+    assert decoded['meta'] == json.loads(json.dumps(data['meta']))
+    for name, values in arrays.items():
+        np.testing.assert_array_equal(decoded['arrays'][name], values)
+
+
+def test_visual_data_route_and_partial_server_rendering(monkeypatch, tmp_path):
+    # 등록한 데이터셋과 렌더 캐시는 저장소의 data/가 아닌 임시 디렉토리에
+    monkeypatch.setattr(datasets, 'DATASET_DIR', str(tmp_path / 'datasets'))
+    monkeypatch.setattr(render_cache, 'CACHE_DIR', str(tmp_path / 'render_cache'))
+    datasets.clear_memory()
+    render_cache.clear_memory()
+    buffer = io.BytesIO()
+    synthetic_events(n_matches=1, events_per_match=300).to_excel(buffer, index=False)
+    client = app.app.test_client()
+
+    def post(url, **form):
+        return client.post(url, data={'file': (io.BytesIO(buffer.getvalue()), 'match.xlsx'), **form})
+
+    binary = visual_data.decode_binary(post('/visual_data').data)
+    as_json = post('/visual_data', format='json').get_json()
+    assert binary['meta']['players'] == as_json['players']
+    assert as_json['arrays']['heat']['shape'] == list(binary['arrays']['heat'].shape)
+    assert post('/visual_data', format='png').status_code == 400
+
+    # 브라우저에서 패스맵/히트맵을 그리면 서버는 패스 네트워크만 렌더링
+    response = post('/upload_analyze_visualize', player_id='3', vis_types='pass_network').get_json()
+    assert response['pass_map'] is None and response['heatmap'] is None and response['pass_network']
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+
+import app
+import analysis
+import pipeline
+import xg_model
+from synthetic_data import synthetic_events, synthetic_shots
+
+
+def _use_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(xg_model, 'SHOTS_PATH', str(tmp_path / 'xg_shots.npz'))
+    monkeypatch.setattr(xg_model, 'MODEL_DIR', str(tmp_path / 'xg_models'))
+    monkeypatch.setattr(xg_model, 'ACTIVE_PATH', str(tmp_path / 'xg_model.npz'))
+
+
+def test_fit_logistic_recovers_coefficients_and_batches_folds():
+    true_coef = np.array([-0.8, -0.15, 1.6, 0.5, -1.0, -0.5])
+    shots = synthetic_shots(40000, true_coef, seed=3)
+    coef, iterations = xg_model.fit_logistic(shots['features'], shots['goals'], prior_strength=0.0)
+    assert iterations < 15
+    np.testing.assert_allclose(coef, true_coef, atol=0.25)
+
+    # 가중치 행렬의 각 행 = 독립 적합 (0/1 가중치는 해당 슈팅만으로 적합한 것과 같음)
+    folds = shots['match'] % 3
+    weights = folds[None, :] != np.arange(3)[:, None]
+    batched, _ = xg_model.fit_logistic(shots['features'], shots['goals'], weights=weights)
+    single, _ = xg_model.fit_logistic(shots['features'][weights[1]], shots['goals'][weights[1]])
+    np.testing.assert_allclose(batched[1], single, atol=1e-6)
+
+
+
+def test_fit_logistic_keeps_coef_when_halvings_run_out(monkeypatch):
+    shots = synthetic_shots(2000, xg_model.DEFAULT_COEF)
+    prior = np.full(len(xg_model.DEFAULT_COEF), 8.0)
+    weights = np.ones((2, len(shots['goals'])))
+    weights[1, ::2] = 0
+    design = np.column_stack([np.ones(len(shots['features'])), shots['features']])
+    objective = lambda coef: xg_model._objective(coef, design, shots['goals'].astype(float), weights, prior, 1e-3)
+
+    # 먼 prior에서의 뉴턴 스텝은 목적 함수를 나쁘게 하므로, 줄일 기회가 끝나면 이전 계수를 유지
+    monkeypatch.setattr(xg_model, 'MAX_HALVINGS', 1)
+    coef, iterations = xg_model.fit_logistic(shots['features'], shots['goals'], weights=weights,
+                                             prior=prior, prior_strength=1e-3)
+    assert iterations == 1
+    np.testing.assert_array_equal(coef, np.tile(prior, (2, 1)))
+    assert (objective(coef) >= objective(np.tile(prior, (2, 1)))).all()
+
+def test_calibrate_versions_and_add_xg(tmp_path, monkeypatch):
+    _use_tmp(tmp_path, monkeypatch)
+    df = synthetic_events(2, 600, seed=5).drop(columns=['xG'])
+    default_xg = analysis.add_xg_to_data(df.copy())['xG']
+    assert xg_model.active_version() == 0
+
+    shots = synthetic_shots(5000, np.array([-1.5, -0.1, 1.0, 0.8, -0.7, -0.3]), seed=1)
+    model = xg_model.calibrate(shots, folds=4)
+    assert model['version'] == 1 and xg_model.active_version() == 1
+    report = model['diagnostics']['cross_validated']
+    assert report['folds'] == 4 and report['ece'] < model['diagnostics']['default']['ece']
+
+    # 활성 모델의 계수가 xG와 파이프라인 캐시 키에 반영됨
+    calibrated_xg = analysis.add_xg_to_data(df.copy())['xG']
+    assert not np.allclose(calibrated_xg.dropna(), default_xg.dropna())
+    assert xg_model.calibrate(shots, activate_model=False)['version'] == 2 and xg_model.active_version() == 1
+    key = pipeline.STAGE_STATE['xg']()
+    xg_model.activate(0)
+    assert pipeline.STAGE_STATE['xg']() != key
+    np.testing.assert_array_equal(analysis.add_xg_to_data(df.copy())['xG'], default_xg)
+
+
+def test_record_shots_and_routes(tmp_path, monkeypatch):
+    _use_tmp(tmp_path, monkeypatch)
+    df = synthetic_events(3, 1500, seed=2)
+    is_shot = df['Action'].isin(xg_model.SHOT_ACTIONS) & df['StartX_adj'].notna()
+    n_shots = int(is_shot.sum())
+    # 전반만 내보낸 뒤 전체 경기를 다시 내보내면 그 경기의 슈팅을 교체
+    first_half = df['Half'] == '1st'
+    assert xg_model.record_shots(df[first_half]) == int((is_shot & first_half).sum())
+    assert xg_model.record_shots(df) == n_shots
+    assert xg_model.record_shots(df) == n_shots  # 같은 경기는 다시 누적하지 않음
+    shots = xg_model.load_shots()
+    assert shots['match_ids'].tolist() == ['M0', 'M1', 'M2']
+    np.testing.assert_array_equal(np.bincount(shots['match']), is_shot.groupby(df['MatchID']).sum().to_numpy())
+    assert os.path.exists(xg_model.SHOTS_PATH)
+
+    client = app.app.test_client()
+    assert client.post('/xg_model/calibrate', json={'min_shots': n_shots + 1}).status_code == 400
+    fitted = client.post('/xg_model/calibrate', json={'min_shots': 10, 'folds': 3}).get_json()
+    assert fitted['version'] == 1 and fitted['shots'] == n_shots
+    info = client.get('/xg_model').get_json()
+    assert info['active']['version'] == 1 and [m['version'] for m in info['versions']] == [0, 1]
+    assert client.post('/xg_model/activate', json={'version': 7}).status_code == 404
+    assert client.post('/xg_model/activate', json={'version': 0}).get_json()['version'] == 0
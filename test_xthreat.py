@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+import xthreat
+from synthetic_data import synthetic_events
+
+
+def _cell(x, y):
+    return int(xthreat._cells(pd.DataFrame({'StartX_adj': [x], 'StartY_adj': [y]}), 'Start')[0])
+
+
+def test_count_transitions_and_solve_xt():
+    df = pd.DataFrame({
+        'Action': ['Pass', 'Pass', 'Dribble', 'Shot', 'Goal', 'Tackle', 'Pass'],
+        'Tags': ['Success', 'Fail', 'Success', '', '', 'Success', 'Success'],
+        'StartX_adj': [50.0, 50.0, 80.0, 100.0, 100.0, 50.0, np.nan],
+        'StartY_adj': [34.0, 34.0, 34.0, 34.0, 34.0, 34.0, 34.0],
+        'EndX_adj': [80.0, 70.0, 100.0, np.nan, np.nan, np.nan, 80.0],
+        'EndY_adj': [34.0, 34.0, 34.0, np.nan, np.nan, np.nan, 34.0],
+    })
+    mid, wing, box = _cell(50, 34), _cell(80, 34), _cell(100, 34)
+    shots, goals, moves, transitions = xthreat.count_transitions(df)
+    assert shots[box] == 2 and goals[box] == 1 and shots.sum() == 2
+    # 실패한 이동은 moves에만, 좌표 없는 이벤트와 비이동 액션은 제외
+    assert moves[mid] == 2 and moves[wing] == 1 and moves.sum() == 3
+    assert transitions[mid, wing] == 1 and transitions[wing, box] == 1 and transitions.sum() == 2
+
+    xt, iterations = xthreat.solve_xt(shots, goals, moves, transitions)
+    assert iterations < xthreat.MAX_ITERATIONS
+    # box: 슈팅만 -> 득점률 0.5, wing: 이동 성공 1회 -> xT(box), mid: 이동 2회 중 1회 성공 -> xT(wing) / 2
+    np.testing.assert_allclose([xt[box], xt[wing], xt[mid]], [0.5, 0.5, 0.25])
+    assert np.count_nonzero(xt) == 3
+
+    grid = xt.reshape(xthreat.XT_GRID_X, xthreat.XT_GRID_Y)
+    added = xthreat.add_xt_to_data(df.copy(), grid)['xT_Added']
+    np.testing.assert_allclose(added.to_numpy(), [0.25, 0.0, 0.0, np.nan, np.nan, np.nan, 0.0])
+
+
+def test_update_xt_model_replaces_reexported_match(tmp_path):
+    path = str(tmp_path / 'xt_model.npz')
+    full = synthetic_events(2, 600, seed=4)
+    first_half = full[full['Half'] == '1st']
+
+    partial_grid = xthreat.update_xt_model(first_half, path=path)
+    assert xthreat.load_model(path)['match_ids'].tolist() == ['M0', 'M1']
+    # 전체 경기를 다시 내보내면 전반 집계가 교체되어 처음부터 전체를 학습한 것과 같음
+    full_grid = xthreat.update_xt_model(full, path=path)
+    expected, _ = xthreat.solve_xt(*xthreat.count_transitions(full))
+    np.testing.assert_allclose(full_grid.reshape(-1), expected)
+    assert not np.allclose(full_grid, partial_grid)
+
+    # MatchID가 없는 경기도 뒷부분이 달라진 재내보내기는 같은 경기로 교체
+    blank = full[full['MatchID'] == 'M0'].assign(MatchID='')
+    xthreat.update_xt_model(blank.iloc[:300], path=path)
+    xthreat.update_xt_model(blank, path=path)
+    model = xthreat.load_model(path)
+    assert len(model['match_ids']) == 3
+    totals = xthreat.model_totals(model)
+    for total, expected in zip(totals, xthreat.count_transitions(pd.concat([full, blank]))):
+        np.testing.assert_array_equal(total, expected)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from stats_utils import (add_zone_index, in_zone, is_in_final_third, is_in_penalty_area,
+                         ZONE_OWN_HALF, ZONE_FINAL_THIRD, ZONE_PENALTY_AREA, ZONE_CENTRAL_CHANNEL)
+from summaries import create_zone_pass_matrix
+
+
+def make_events(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Player': rng.integers(1, 12, n).astype(str),
+        'TeamID': rng.choice(['H', 'A'], n),
+        'Action': rng.choice(['Pass', 'Cross', 'Shot', 'Tackle'], n),
+        'Tags': rng.choice(['Success', 'Fail', 'Success, Progressive', ''], n),
+        'StartX_adj': rng.uniform(0, 105, n),
+        'StartY_adj': rng.uniform(0, 68, n),
+        'EndX_adj': rng.uniform(0, 105, n),
+        'EndY_adj': rng.uniform(0, 68, n),
+    })
+    # 경계값과 결측 좌표 포함
+    df.loc[:3, 'StartX_adj'] = [52.5, 70.0, 88.5, np.nan]
+    df.loc[:3, 'EndY_adj'] = [21.1, 46.9, 13.84, 30.0]
+    return df
+
+
+def test_zone_flags_match_coordinate_predicates():
+    df = add_zone_index(make_events())
+    assert (in_zone(df['Start_Zone'], ZONE_OWN_HALF) == (df['StartX_adj'] <= 52.5)).all()
+    assert (in_zone(df['Start_Zone'], ZONE_FINAL_THIRD) == is_in_final_third(df['StartX_adj'])).all()
+    assert (in_zone(df['End_Zone'], ZONE_PENALTY_AREA) == is_in_penalty_area(df['EndX_adj'], df['EndY_adj'])).all()
+    central = is_in_penalty_area(df['EndX_adj'], df['EndY_adj']) & (df['EndY_adj'] > 21.1) & (df['EndY_adj'] < 46.9)
+    assert (in_zone(df['End_Zone'], ZONE_PENALTY_AREA | ZONE_CENTRAL_CHANNEL) == central).all()
+    assert df.loc[3, 'Start_Grid'] == -1
+
+
+def test_zone_pass_matrix_matches_groupby():
+    df = add_zone_index(make_events())
+    matrix = create_zone_pass_matrix(df, by='Player')
+
+    passes = df[df['Action'].isin(['Pass', 'Cross']) & (df['Start_Grid'] >= 0) & (df['End_Grid'] >= 0)]
+    expected = passes.assign(Success=passes['Tags'].str.contains('Success')).groupby(
+        ['Player', 'Start_Grid', 'End_Grid']).agg(Passes=('Action', 'count'), Successful_Passes=('Success', 'sum'))
+    result = matrix.set_index(['Player', 'Start_Grid', 'End_Grid']).sort_index()
+    pd.testing.assert_frame_equal(result, expected.sort_index(), check_dtype=False, check_index_type=False)
+
+
+def test_zone_pass_matrix_keeps_blank_team_group():
+    df = add_zone_index(make_events())
+    df['TeamID'] = df['TeamID'].astype(object)
+    df.loc[df['TeamID'] == 'A', 'TeamID'] = np.nan
+    matrix = create_zone_pass_matrix(df, by='TeamID')
+
+    passes = df[df['Action'].isin(['Pass', 'Cross']) & (df['Start_Grid'] >= 0) & (df['End_Grid'] >= 0)]
+    assert matrix['Passes'].sum() == len(passes)
+    assert matrix.loc[matrix['TeamID'].isna(), 'Passes'].sum() == passes['TeamID'].isna().sum()
@@ -0,0 +1,154 @@
+"""
+브라우저(canvas) 렌더링용 시각화 데이터.
+
+visualization.draw_pass_map_flask / draw_heatmap_flask가 그리는 데이터(패스 시작/끝 좌표, 성공 여부,
+위치 분포)를 모든 선수에 대해 한 번에 계산해 작은 typed array로 묶습니다. matplotlib을 쓰지 않으므로
+서버는 이미지를 래스터화하지 않고, 선수/필터 전환은 브라우저에서 다시 그리기만 합니다.
+
+배열 (선수 순서는 players, 패스는 선수별로 모여 있고 pass_offsets[i]:pass_offsets[i+1]이 i번째 선수):
+    pass_offsets  uint32 (선수 수 + 1)
+    pass_start_x, pass_start_y, pass_end_x, pass_end_y  uint16 (미터 x COORD_SCALE)
+    pass_success  uint8 (1 = 성공)
+    heat          uint8 (선수 수 x HEAT_ROWS x HEAT_COLS, 선수별 최댓값 255, 행 0 = y 0 쪽)
+"""
+import json
+import base64
+
+import numpy as np
+
+from schema import normalize_events, player_keys
+from stats_utils import FIELD_W, FIELD_H
+from storage import pack_arrays, unpack_arrays
+
+VISUAL_DATA_VERSION = 1
+COORD_SCALE = 10  # 0.1m 단위로 양자화
+HEAT_COLS, HEAT_ROWS = 42, 28  # 약 2.5m 셀
+# visualization.plot_heatmap의 kdeplot(thresh=0.3)과 같은 표시 기준 (브라우저에서 사용)
+HEAT_THRESH = 0.3
+BINARY_MAGIC = b'FPAV'
+
+ARRAY_DTYPES = {
+    'pass_offsets': np.uint32,
+    'pass_start_x': np.uint16, 'pass_start_y': np.uint16, 'pass_end_x': np.uint16, 'pass_end_y': np.uint16,
+    'pass_success': np.uint8,
+    'heat': np.uint8,
+}
+
+
+def player_sort_key(p):
+    # /get_player_list와 같은 순서 (숫자 번호 오름차순, 그 외는 뒤로)
+    return float(p) if p.replace('.', '', 1).isdigit() else 999
+
+
+def _quantize(values, limit):
+    return np.clip(np.rint(values * COORD_SCALE), 0, limit * COORD_SCALE).astype(np.uint16)
+
+
+def _gaussian_kernels(centers, sigma):
+    """
+    선수별 1차원 가우시안 평활 행렬 (선수 수 x 셀 x 셀), 각 열의 합은 1
+    """
+    diff = centers[None, :, None] - centers[None, None, :]
+    weights = np.exp(-0.5 * (diff / sigma[:, None, None]) ** 2)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def heat_grids(x, y, codes, n_players):
+    """
+    선수별 위치를 격자에 모은 뒤 Scott 규칙 대역폭의 가우시안으로 평활합니다. (binned KDE)
+    반환: float (선수 수 x HEAT_ROWS x HEAT_COLS)
+    """
+    col = np.clip((x / FIELD_W * HEAT_COLS).astype(int), 0, HEAT_COLS - 1)
+    row = np.clip((y / FIELD_H * HEAT_ROWS).astype(int), 0, HEAT_ROWS - 1)
+    counts = np.zeros((n_players, HEAT_ROWS, HEAT_COLS))
+    np.add.at(counts, (codes, row, col), 1)
+
+    n = np.bincount(codes, minlength=n_players).astype(float)
+    factor = np.where(n > 1, n, 2) ** (-1 / 6)
+    std_x = _group_std(x, codes, n_players, FIELD_W / 4)
+    std_y = _group_std(y, codes, n_players, FIELD_H / 4)
+    cell_w, cell_h = FIELD_W / HEAT_COLS, FIELD_H / HEAT_ROWS
+    kx = _gaussian_kernels(np.arange(HEAT_COLS) * cell_w, np.maximum(std_x * factor, cell_w / 2))
+    ky = _gaussian_kernels(np.arange(HEAT_ROWS) * cell_h, np.maximum(std_y * factor, cell_h / 2))
+    return np.einsum('prs,psc,pdc->prd', ky, counts, kx)
+
+
+def _group_std(values, codes, n_players, default):
+    n = np.bincount(codes, minlength=n_players).astype(float)
+    mean = np.bincount(codes, values, n_players) / np.maximum(n, 1)
+    var = np.bincount(codes, (values - mean[codes]) ** 2, n_players) / np.maximum(n - 1, 1)
+    return np.where((n > 1) & (var > 0), np.sqrt(var), default)
+
+
+def build_visual_data(df):
+    """
+    표준 스키마 df에서 모든 선수의 패스맵/히트맵 데이터를 계산합니다.
+    반환: {'meta': JSON 직렬화 가능한 dict, 'arrays': {이름: ndarray}}
+    """
+    df = normalize_events(df)
+    players = sorted({p for p in player_keys(df['Player']) if p}, key=player_sort_key)
+    index = {p: i for i, p in enumerate(players)}
+    codes = df['Player'].map(index).to_numpy()
+    has_player = ~np.isnan(codes.astype(float))
+    arrays = {}
+
+    # 패스맵: visualization.plot_pass_map과 같은 선택 (Action에 'Pass' 포함, 보정 좌표 있음)
+    pass_cols = ['StartX_adj', 'StartY_adj', 'EndX_adj', 'EndY_adj']
+    if all(col in df.columns for col in pass_cols):
+        coords = df[pass_cols].to_numpy(dtype=float)
+        mask = (has_player & df['Action'].str.contains('Pass', case=False, na=False).to_numpy()
+                & ~np.isnan(coords).any(axis=1))
+    else:
+        coords, mask = np.zeros((len(df), 4)), np.zeros(len(df), dtype=bool)
+    pass_codes = codes[mask].astype(int)
+    order = np.argsort(pass_codes, kind='stable')
+    pass_codes, coords = pass_codes[order], coords[mask][order]
+    arrays['pass_offsets'] = np.concatenate([[0], np.cumsum(np.bincount(pass_codes, minlength=len(players)))])
+    for i, (name, limit) in enumerate([('pass_start_x', FIELD_W), ('pass_start_y', FIELD_H),
+                                       ('pass_end_x', FIELD_W), ('pass_end_y', FIELD_H)]):
+        arrays[name] = _quantize(coords[:, i], limit)
+    arrays['pass_success'] = df['Tags'].fillna('').astype(str).str.contains('Success', regex=False).to_numpy()[mask][order]
+
+    # 히트맵: visualization.plot_heatmap과 같은 선택 (선수의 모든 이벤트 시작 위치)
+    if 'StartX_adj' in df.columns and 'StartY_adj' in df.columns:
+        start = df[['StartX_adj', 'StartY_adj']].to_numpy(dtype=float)
+        heat_mask = has_player & ~np.isnan(start).any(axis=1)
+    else:
+        start, heat_mask = np.zeros((len(df), 2)), np.zeros(len(df), dtype=bool)
+    grids = heat_grids(start[heat_mask, 0], start[heat_mask, 1], codes[heat_mask].astype(int), len(players))
+    peak = grids.max(axis=(1, 2), keepdims=True)
+    arrays['heat'] = np.rint(grids / np.where(peak > 0, peak, 1) * 255)
+
+    arrays = {name: np.ascontiguousarray(values, dtype=ARRAY_DTYPES[name]) for name, values in arrays.items()}
+    meta = {
+        'version': VISUAL_DATA_VERSION, 'players': players, 'coord_scale': COORD_SCALE,
+        'field': [FIELD_W, FIELD_H], 'heat_shape': [HEAT_ROWS, HEAT_COLS], 'heat_thresh': HEAT_THRESH,
+    }
+    return {'meta': meta, 'arrays': arrays}
+
+
+def encode_json(data):
+    """
+    배열을 little-endian 바이트의 base64 문자열로 담은 JSON 문자열
+    """
+    arrays = {}
+    for name, values in data['arrays'].items():
+        raw = values.astype(values.dtype.newbyteorder('<')).tobytes()
+        arrays[name] = {'dtype': values.dtype.name, 'shape': list(values.shape), 'data': base64.b64encode(raw).decode('ascii')}
+    return json.dumps({**data['meta'], 'arrays': arrays})
+
+
+def encode_binary(data):
+    """
+    BINARY_MAGIC + 헤더 길이(uint32) + JSON 헤더 + 배열 바이트 (storage.pack_arrays, 각 배열은 8바이트 경계에서 시작)
+    헤더의 arrays[이름] = {'dtype', 'offset', 'length', 'shape'} (offset은 본문 시작 기준 바이트, length는 원소 수)
+    """
+    return pack_arrays(BINARY_MAGIC, data['meta'], data['arrays'])
+
+
+def decode_binary(payload):
+    """
+    encode_binary의 역변환 (테스트/도구용). 반환: {'meta', 'arrays'}
+    """
+    meta, arrays = unpack_arrays(payload, BINARY_MAGIC)
+    return {'meta': meta, 'arrays': arrays}
@@ -0,0 +1,237 @@
+import io
+import os
+import zipfile
+import base64
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg') # Flask 서버 환경에서 GUI 백엔드 사용 방지
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+from mplsoccer import Pitch
+
+from schema import normalize_events, player_id
+
+VIS_TYPES = ('pass_map', 'heatmap')
+
+def fig_to_base64(fig):
+    img = io.BytesIO()
+    fig.savefig(img, format='png', bbox_inches='tight')
+    img.seek(0)
+    return base64.b64encode(img.getvalue()).decode('utf-8')
+
+def new_pitch():
+    # Reference Image Style: Striped Grass
+    pitch = Pitch(pitch_type='custom', pitch_length=105, pitch_width=68,
+                  pitch_color='grass', line_color='white', stripe=True)
+    fig, ax = pitch.draw(figsize=(10, 7))
+    return pitch, fig, ax
+
+def plot_pass_map(pitch, ax, df, p_id):
+    """
+    표준 스키마(schema.normalize_events)의 df에서 p_id 선수의 패스를 ax 위에 그립니다. 좌표 컬럼이 없으면 False를 반환합니다.
+    """
+    plot_df = df[(df['Player'] == p_id) & (df['Action'].str.contains('Pass', case=False, na=False))]
+
+    req_cols = ['StartX_adj', 'StartY_adj', 'EndX_adj', 'EndY_adj']
+    if not all(col in df.columns for col in req_cols):
+         return False
+
+    plot_df = plot_df.dropna(subset=req_cols)
+
+    # Colors from Reference: Blue (Success), Red (Fail)
+    success_color = 'blue'
+    fail_color = 'red'
+
+    for _, row in plot_df.iterrows():
+        tags = str(row['Tags']) if pd.notna(row['Tags']) else ''
+        is_success = 'Success' in tags
+
+        color = success_color if is_success else fail_color
+        linestyle = '-' if is_success else '--' # Dashed for failure
+        alpha = 0.8
+
+        # 1. 꼬리 (원형) - Rounded Tail: Remove border as requested
+        pitch.scatter(row['StartX_adj'], row['StartY_adj'], ax=ax,
+                      color=color, edgecolors='none', s=60, alpha=alpha, zorder=2)
+
+        # 2. 화살표 (Arrow)
+        pitch.arrows(row['StartX_adj'], row['StartY_adj'], row['EndX_adj'], row['EndY_adj'],
+                     color=color, ax=ax, width=2, headwidth=3, headlength=3,
+                     linestyle=linestyle, alpha=alpha, zorder=1)
+
+    # Remove Title and Legend as requested
+    # ax.set_title(f"Player {p_id} | Pass Map", fontsize=20, fontweight='bold', pad=15)
+    return True
+
+def plot_heatmap(pitch, ax, df, p_id):
+    """
+    표준 스키마(schema.normalize_events)의 df에서 p_id 선수의 위치 분포를 ax 위에 그립니다.
+    """
+    if 'StartX_adj' in df.columns and 'StartY_adj' in df.columns:
+        plot_df = df[df['Player'] == p_id].dropna(subset=['StartX_adj', 'StartY_adj'])
+
+        if not plot_df.empty:
+            # thresh를 높여서 히트맵 범위를 좁게 조정 (0.05 -> 0.3)
+            # levels를 줄여서 더 명확한 경계 표시 (100 -> 50)
+            pitch.kdeplot(x=plot_df['StartX_adj'], y=plot_df['StartY_adj'], ax=ax,
+                         fill=True, levels=50, thresh=0.3, cmap='hot', alpha=0.7)
+        else:
+            ax.text(52.5, 34, "No Data", ha='center', va='center', fontsize=20, color='white')
+
+    # Remove Title as requested
+    # ax.set_title(f"Player {p_id} | Heatmap", fontsize=20, fontweight='bold', pad=15)
+    return True
+
+PLOTTERS = {'pass_map': plot_pass_map, 'heatmap': plot_heatmap}
+
+def draw_pass_map_flask(df, p_id):
+    pitch, fig, ax = new_pitch()
+
+    # 이미 정규화된 프레임은 복사/변환 없이 그대로 사용
+    df = normalize_events(df)
+    p_id = player_id(p_id)
+
+    if not plot_pass_map(pitch, ax, df, p_id):
+        plt.close(fig)
+        return None
+
+    base64_img = fig_to_base64(fig)
+    plt.close(fig)
+    return base64_img
+
+def draw_heatmap_flask(df, p_id):
+    # Match Pass Map Style: Striped Grass
+    pitch, fig, ax = new_pitch()
+
+    # 이미 정규화된 프레임은 복사/변환 없이 그대로 사용
+    df = normalize_events(df)
+    p_id = player_id(p_id)
+
+    plot_heatmap(pitch, ax, df, p_id)
+
+    base64_img = fig_to_base64(fig)
+    plt.close(fig)
+    return base64_img
+
+def draw_pass_network_flask(edges, nodes, team_id, min_passes=2):
+    """
+    summaries.create_pass_network 결과로 team_id 팀의 패스 네트워크를 그립니다.
+    선 굵기는 패스 횟수, 원 크기는 패스 관여 횟수에 비례합니다.
+    """
+    pitch, fig, ax = new_pitch()
+    team_id = str(team_id)
+
+    team_nodes = nodes[(nodes['TeamID'].astype(str) == team_id) & nodes['Avg_X'].notna()].set_index('Player')
+    team_edges = edges[(edges['TeamID'].astype(str) == team_id) & (edges['Passes'] >= min_passes)
+                       & (edges['Passer'] != edges['Receiver'])]
+    team_edges = team_edges[team_edges['Passer'].isin(team_nodes.index) & team_edges['Receiver'].isin(team_nodes.index)]
+
+    if team_nodes.empty:
+        ax.text(52.5, 34, "No Data", ha='center', va='center', fontsize=20, color='white')
+    else:
+        if not team_edges.empty:
+            start = team_nodes.loc[team_edges['Passer'], ['Avg_X', 'Avg_Y']].to_numpy()
+            end = team_nodes.loc[team_edges['Receiver'], ['Avg_X', 'Avg_Y']].to_numpy()
+            widths = 1 + 9 * team_edges['Passes'].to_numpy() / team_edges['Passes'].max()
+            pitch.lines(start[:, 0], start[:, 1], end[:, 0], end[:, 1], ax=ax,
+                        lw=widths, color='white', alpha=0.6, zorder=1)
+
+        involvement = (team_nodes['Passes_Made'] + team_nodes['Passes_Received']).to_numpy()
+        sizes = 300 + 1200 * involvement / max(involvement.max(), 1)
+        pitch.scatter(team_nodes['Avg_X'], team_nodes['Avg_Y'], s=sizes, ax=ax,
+                      color='blue', edgecolors='white', linewidth=1.5, zorder=2)
+        for p_id, row in team_nodes.iterrows():
+            pitch.annotate(p_id, xy=(row['Avg_X'], row['Avg_Y']), ax=ax, color='white',
+                           va='center', ha='center', fontsize=11, fontweight='bold', zorder=3)
+
+    base64_img = fig_to_base64(fig)
+    plt.close(fig)
+    return base64_img
+
+
+# --- 배치 렌더링 (프로세스 풀) ---
+# 워커 프로세스마다 한 번만 준비되는 공유 상태: 정규화된 데이터와 미리 그려둔 피치 배경
+_worker_df = None
+_worker_pitches = {}
+
+def _init_batch_worker(df):
+    global _worker_df
+    _worker_df = normalize_events(df)
+    _worker_pitches.clear()
+
+def _render_on_shared_pitch(vis_type, p_id):
+    if vis_type not in _worker_pitches:
+        pitch, fig, ax = new_pitch()
+        _worker_pitches[vis_type] = (pitch, fig, ax, set(ax.get_children()))
+    pitch, fig, ax, background = _worker_pitches[vis_type]
+
+    try:
+        if not PLOTTERS[vis_type](pitch, ax, _worker_df, p_id):
+            return None
+        return fig_to_base64(fig)
+    finally:
+        # 배경(피치)만 남기고 이번 선수의 아티스트를 제거하여 다음 선수에 재사용
+        for artist in ax.get_children():
+            if artist not in background:
+                artist.remove()
+
+def _render_player(job):
+    p_id, vis_types = job
+    return p_id, {vis_type: _render_on_shared_pitch(vis_type, p_id) for vis_type in vis_types}
+
+def list_players(df):
+    players = [p for p in normalize_events(df)['Player'].unique() if p]
+    return sorted(players, key=lambda x: float(x) if x.replace('.','',1).isdigit() else 999)
+
+def render_players_batch(df, jobs, max_workers=None):
+    """
+    jobs: [(player_id, [vis_type, ...]), ...]
+    프로세스 풀에서 선수별 이미지를 렌더링하고 {player_id: {vis_type: base64}}를 반환합니다.
+    """
+    if not jobs:
+        return {}
+    max_workers = max_workers or os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(jobs)))
+
+    if max_workers == 1:
+        _init_batch_worker(df)
+        return dict(_render_player(job) for job in jobs)
+
+    # 워커당 여러 선수를 묶어 보내 IPC 왕복을 줄임
+    chunksize = max(1, len(jobs) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker, initargs=(df,)) as executor:
+        return dict(executor.map(_render_player, jobs, chunksize=chunksize))
+
+def build_zip(images):
+    """
+    {player_id: {vis_type: base64}} -> player_<id>_<vis_type>.png 로 구성된 ZIP
+    """
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as zf:
+        for p_id, by_type in images.items():
+            for vis_type, image in by_type.items():
+                if image:
+                    zf.writestr(f"player_{p_id}_{vis_type}.png", base64.b64decode(image))
+    output.seek(0)
+    return output
+
+def build_contact_sheet_pdf(images):
+    """
+    선수당 한 페이지(패스맵 | 히트맵)로 구성된 PDF
+    """
+    output = io.BytesIO()
+    with PdfPages(output) as pdf:
+        for p_id, by_type in images.items():
+            fig, axes = plt.subplots(1, len(VIS_TYPES), figsize=(16, 6))
+            for ax, vis_type in zip(axes, VIS_TYPES):
+                ax.axis('off')
+                image = by_type.get(vis_type)
+                if image:
+                    ax.imshow(plt.imread(io.BytesIO(base64.b64decode(image)), format='png'))
+            fig.suptitle(f"Player {p_id}", fontsize=16, fontweight='bold')
+            pdf.savefig(fig)
+            plt.close(fig)
+    output.seek(0)
+    return output
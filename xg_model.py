@@ -0,0 +1,370 @@
+"""
+xG 모델 보정.
+
+analysis.add_xg_to_data의 특징(골문 거리, 슈팅 각도, 박스 안, 헤딩, 약발)은 그대로 두고,
+로지스틱 회귀 계수만 누적된 슈팅 기록으로 다시 적합합니다.
+- 내보낸 경기의 슈팅 특징/득점 여부를 경기(MatchID) 단위로 data/xg_shots.npz에 누적 (record_shots)
+- calibrate(): IRLS(뉴턴법)로 적합 -> data/xg_models/xg_v<버전>.npz로 저장하고 활성 모델로 지정
+  (경기 단위 k-fold 교차검증의 모든 폴드를 표본 가중치 행렬로 한 번에 적합해 out-of-fold 보정 지표를 계산)
+- 활성 모델(data/xg_model.npz)이 없으면 버전 0 = 기본 계수(DEFAULT_COEF)를 사용합니다.
+"""
+import io
+import os
+import json
+import time
+
+import numpy as np
+
+from stats_utils import match_keys
+from storage import DATA_DIR, atomic_write_bytes, file_lock
+
+SHOT_ACTIONS = ['Goal', 'Shot On Target', 'Shot', 'Blocked Shot']
+FEATURES = ['dist', 'angle', 'is_pa', 'is_head', 'is_weak']
+# logit(xG) = 절편 + 계수 . 특징  (기존 공식 xG = 1 / (1 + exp(0.2 * dist - 2.0 * angle - 1.2 * is_pa + 1.5 * is_head + 0.8 * is_weak - 0.6)))
+DEFAULT_COEF = np.array([0.6, -0.2, 2.0, 1.2, -1.5, -0.8])
+
+# 골문 좌표 (오른쪽 골대 중앙)와 양쪽 포스트 y좌표
+GOAL_X, GOAL_Y = 105, 34
+GOAL_POST_LEFT, GOAL_POST_RIGHT = 30.34, 37.66
+
+# 적합 설정: 계수를 기본 계수 쪽으로 당기는 L2 강도 (슈팅이 적거나 헤딩 득점이 없는 등 완전 분리일 때 발산 방지)
+PRIOR_STRENGTH = float(os.environ.get('FPA_XG_PRIOR_STRENGTH', '1.0'))
+MIN_SHOTS = int(os.environ.get('FPA_XG_MIN_SHOTS', '200'))
+MAX_ITERATIONS = 50
+MAX_HALVINGS = 30
+TOLERANCE = 1e-8
+DEFAULT_FOLDS = 5
+CALIBRATION_BINS = 10
+
+SHOTS_PATH = os.path.join(DATA_DIR, 'xg_shots.npz')
+MODEL_DIR = os.path.join(DATA_DIR, 'xg_models')
+ACTIVE_PATH = os.path.join(DATA_DIR, 'xg_model.npz')
+
+_active = {}  # 활성 모델 파일 stat -> 모델 (워커 메모리)
+
+
+# --- 특징 ---
+def shot_features(df_shots):
+    """
+    슈팅 이벤트의 특징 행렬 (슈팅 수 x FEATURES). 보정 좌표가 없으면 거리/각도는 NaN입니다.
+    """
+    x = df_shots['StartX_adj'].to_numpy(dtype=float)
+    y = df_shots['StartY_adj'].to_numpy(dtype=float)
+    distance = np.sqrt((GOAL_X - x) ** 2 + (GOAL_Y - y) ** 2)
+    # 슈팅 위치에서 양쪽 골포스트까지의 벡터가 이루는 각도 (라디안)
+    angle = np.abs(np.arctan2(GOAL_POST_LEFT - y, GOAL_X - x) - np.arctan2(GOAL_POST_RIGHT - y, GOAL_X - x))
+    tags = df_shots['Tags'].astype(str).fillna('')
+    flags = [tags.str.contains(tag, case=False, na=False).to_numpy(dtype=float) for tag in ['In-box', 'Header', 'Weak Foot']]
+    return np.column_stack([distance, angle] + flags)
+
+
+def predict(features, coef=None):
+    """
+    특징 행렬의 xG. coef가 없으면 활성 모델의 계수를 사용합니다.
+    """
+    coef = active_model()['coef'] if coef is None else np.asarray(coef, dtype=float)
+    # 기본 계수에서 기존 공식과 같은 값이 나오도록 같은 순서로 지수를 더함
+    exponent = -coef[1] * features[:, 0]
+    for i in range(1, features.shape[1]):
+        exponent = exponent + -coef[i + 1] * features[:, i]
+    exponent = exponent + -coef[0]
+    return 1 / (1 + np.exp(exponent))
+
+
+# --- 적합 ---
+def _sigmoid(eta):
+    return 1 / (1 + np.exp(-np.clip(eta, -35, 35)))
+
+
+def _objective(coef, design, goals, weights, prior, prior_strength):
+    # 모델별 벌점 로그 우도
+    eta = coef @ design.T
+    log_likelihood = (weights * (goals * eta - np.logaddexp(0, eta))).sum(axis=1)
+    return log_likelihood - 0.5 * prior_strength * ((coef - prior) ** 2).sum(axis=1)
+
+
+def fit_logistic(features, goals, weights=None, prior=DEFAULT_COEF, prior_strength=PRIOR_STRENGTH,
+                 max_iterations=MAX_ITERATIONS, tol=TOLERANCE):
+    """
+    IRLS(뉴턴법) 로지스틱 회귀. 매 반복은 전체 슈팅에 대한 행렬 연산 한 번과 (k+1)x(k+1) 선형계 풀이이며,
+    목적 함수가 나빠지는 모델은 그 모델의 뉴턴 스텝만 절반씩 줄입니다.
+    weights: 표본 가중치 (슈팅 수,) 또는 (모델 수, 슈팅 수) — 2차원이면 여러 모델(교차검증 폴드 등)을 한 번에 적합
+    prior/prior_strength: 목적 함수에 prior_strength/2 * |coef - prior|^2 를 더함
+    반환: (계수 (k+1,) 또는 (모델 수, k+1), 반복 횟수)
+    """
+    design = np.column_stack([np.ones(len(features)), features])
+    goals = np.asarray(goals, dtype=float)
+    batched = weights is not None and np.ndim(weights) == 2
+    weights = np.ones((1, len(goals))) if weights is None else np.atleast_2d(np.asarray(weights, dtype=float))
+    n_models, n_coef = len(weights), design.shape[1]
+    prior = np.broadcast_to(np.asarray(prior, dtype=float), (n_coef,))
+    penalty = prior_strength * np.eye(n_coef)
+
+    coef = np.tile(prior, (n_models, 1))
+    objective = _objective(coef, design, goals, weights, prior, prior_strength)
+    for iteration in range(1, max_iterations + 1):
+        p = _sigmoid(coef @ design.T)
+        gradient = (weights * (goals - p)) @ design - (coef - prior) @ penalty
+        hessian = np.matmul(design.T * (weights * p * (1 - p))[:, None, :], design) + penalty
+        step = np.linalg.solve(hessian, gradient[..., None])[..., 0]
+        for halving in range(MAX_HALVINGS + 1):
+            candidate = coef + step
+            new_objective = _objective(candidate, design, goals, weights, prior, prior_strength)
+            worse = new_objective < objective - 1e-12 * np.abs(objective)
+            if not worse.any():
+                break
+            if halving == MAX_HALVINGS:
+                # 스텝을 끝까지 줄여도 나빠지는 모델은 이전 계수를 유지 (적용한 스텝 0)
+                step[worse] = 0
+                candidate[worse] = coef[worse]
+                new_objective[worse] = objective[worse]
+            else:
+                step[worse] /= 2
+        coef, objective = candidate, new_objective
+        if np.max(np.abs(step)) < tol:
+            break
+    return (coef if batched else coef[0]), iteration
+
+
+def calibration_report(goals, xg, bins=CALIBRATION_BINS):
+    """
+    보정 지표: 로그 손실, Brier 점수, ECE(구간별 |평균 xG - 득점률|의 슈팅 수 가중 평균)와
+    예측값 분위 구간별 (슈팅 수, 평균 xG, 득점률) 표
+    """
+    goals = np.asarray(goals, dtype=float)
+    xg = np.clip(np.asarray(xg, dtype=float), 1e-12, 1 - 1e-12)
+    order = np.argsort(xg, kind='stable')
+    table = []
+    for part in np.array_split(order, min(bins, len(order))):
+        if len(part):
+            table.append({'shots': int(len(part)), 'mean_xg': float(xg[part].mean()), 'goal_rate': float(goals[part].mean())})
+    return {
+        'shots': int(len(goals)),
+        'goals': int(goals.sum()),
+        'total_xg': float(xg.sum()),
+        'log_loss': float(-np.mean(goals * np.log(xg) + (1 - goals) * np.log(1 - xg))),
+        'brier': float(np.mean((xg - goals) ** 2)),
+        'ece': float(sum(row['shots'] * abs(row['mean_xg'] - row['goal_rate']) for row in table) / max(len(goals), 1)),
+        'bins': table,
+    }
+
+
+# --- 슈팅 기록 누적 ---
+def _empty_shots():
+    return {'match_ids': np.array([], dtype=str), 'match': np.zeros(0, dtype=np.int64),
+            'features': np.zeros((0, len(FEATURES))), 'goals': np.zeros(0, dtype=np.uint8)}
+
+
+def load_shots(path=None):
+    path = path or SHOTS_PATH
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            shots = {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return _empty_shots()
+    if shots.get('features', np.zeros((0, 0))).shape[1:] != (len(FEATURES),):
+        return _empty_shots()
+    return shots
+
+
+def _save_npz(path, arrays):
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    atomic_write_bytes(path, buffer.getvalue())
+
+
+def _match_shots(df, keys):
+    # df의 경기별 슈팅 (좌표가 없는 슈팅 제외): (경기 키[n], 특징[n, len(FEATURES)], 득점[n])
+    is_shot = df['Action'].isin(SHOT_ACTIONS).to_numpy()
+    df_shots = df[is_shot]
+    features = shot_features(df_shots)
+    valid = ~np.isnan(features).any(axis=1)
+    goals = (df_shots['Action'] == 'Goal').to_numpy(dtype=np.uint8)
+    return keys[is_shot].to_numpy(dtype=str)[valid], features[valid], goals[valid]
+
+
+def _changed_matches(shots, keys, shot_keys, features, goals):
+    # 저장된 기록에 없거나 슈팅이 달라진(부분/수정 후 재내보내기) 경기
+    index = {key: i for i, key in enumerate(shots['match_ids'].tolist())}
+    changed = []
+    for key in sorted(set(keys.unique())):
+        i = index.get(key)
+        new_rows = shot_keys == key
+        if i is None:
+            changed.append(key)
+            continue
+        old_rows = shots['match'] == i
+        if not (np.array_equal(shots['features'][old_rows], features[new_rows])
+                and np.array_equal(shots['goals'][old_rows], goals[new_rows])):
+            changed.append(key)
+    return changed
+
+
+def record_shots(df, path=None):
+    """
+    df의 경기 중 저장된 기록에 없거나 슈팅이 달라진 경기(전반 종료 후 내보낸 경기를 다시 내보낸 경우 등)의
+    슈팅 특징과 득점 여부를 기록합니다. 이미 있는 경기는 그 경기의 기록을 교체합니다. (경기 번호는 유지)
+    반환: 누적된 전체 슈팅 수
+    """
+    path = path or SHOTS_PATH
+    keys = match_keys(df)
+    shot_keys, features, goals = _match_shots(df, keys)
+    shots = load_shots(path)
+    if not _changed_matches(shots, keys, shot_keys, features, goals):
+        return len(shots['goals'])
+
+    with file_lock(path):
+        # 잠금을 얻는 동안 다른 워커가 같은 경기를 반영했을 수 있으므로 다시 읽음
+        shots = load_shots(path)
+        changed = _changed_matches(shots, keys, shot_keys, features, goals)
+        if changed:
+            known = shots['match_ids'].tolist()
+            match_ids = known + sorted(set(changed) - set(known))
+            index = {key: i for i, key in enumerate(match_ids)}
+            keep = ~np.isin(shots['match'], [index[key] for key in changed])
+            new_rows = np.isin(shot_keys, changed)
+            shots = {
+                'match_ids': np.array(match_ids, dtype=str),
+                'match': np.concatenate([shots['match'][keep],
+                                         np.array([index[key] for key in shot_keys[new_rows]], dtype=np.int64)]),
+                'features': np.concatenate([shots['features'][keep], features[new_rows]]),
+                'goals': np.concatenate([shots['goals'][keep], goals[new_rows]]),
+            }
+            _save_npz(path, shots)
+    return len(shots['goals'])
+
+
+# --- 모델 버전 ---
+def _version_path(version):
+    return os.path.join(MODEL_DIR, f'xg_v{version}.npz')
+
+
+def _default_model():
+    return {'version': 0, 'coef': DEFAULT_COEF.copy(), 'shots': 0, 'fitted_at': 0.0, 'diagnostics': {}}
+
+
+def _read_model(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {
+            'version': int(data['version']), 'coef': data['coef'].astype(float), 'shots': int(data['shots']),
+            'fitted_at': float(data['fitted_at']), 'diagnostics': json.loads(str(data['diagnostics'])),
+        }
+
+
+def active_model():
+    """
+    활성 xG 모델 {'version', 'coef', 'shots', 'fitted_at', 'diagnostics'}. 파일이 바뀌지 않았으면 메모리의 값을 재사용합니다.
+    """
+    try:
+        st = os.stat(ACTIVE_PATH)
+    except OSError:
+        return _default_model()
+    key = (ACTIVE_PATH, st.st_mtime_ns, st.st_size, st.st_ino)
+    if key not in _active:
+        try:
+            model = _read_model(ACTIVE_PATH)
+        except (OSError, KeyError, ValueError):
+            return _default_model()
+        _active.clear()
+        _active[key] = model
+    return _active[key]
+
+
+def active_version():
+    return active_model()['version']
+
+
+def list_versions():
+    """
+    저장된 모델 버전 목록 (버전 0 = 기본 계수 포함)
+    """
+    models = [_default_model()]
+    if os.path.isdir(MODEL_DIR):
+        for name in os.listdir(MODEL_DIR):
+            if name.startswith('xg_v') and name.endswith('.npz'):
+                try:
+                    models.append(_read_model(os.path.join(MODEL_DIR, name)))
+                except (OSError, KeyError, ValueError):
+                    continue
+    return sorted(models, key=lambda model: model['version'])
+
+
+def activate(version):
+    """
+    저장된 버전을 활성 모델로 지정합니다. (0이면 기본 계수로 되돌림, 없는 버전은 KeyError)
+    """
+    version = int(version)
+    with file_lock(ACTIVE_PATH):
+        if version == 0:
+            if os.path.exists(ACTIVE_PATH):
+                os.remove(ACTIVE_PATH)
+            return _default_model()
+        try:
+            with open(_version_path(version), 'rb') as f:
+                payload = f.read()
+        except OSError:
+            raise KeyError(f"저장된 xG 모델 버전이 없습니다: {version}")
+        atomic_write_bytes(ACTIVE_PATH, payload)
+    return active_model()
+
+
+def _model_arrays(model):
+    return {
+        'version': model['version'], 'coef': model['coef'], 'features': np.array(FEATURES, dtype=str),
+        'shots': model['shots'], 'fitted_at': model['fitted_at'], 'diagnostics': json.dumps(model['diagnostics']),
+    }
+
+
+def calibrate(shots=None, folds=DEFAULT_FOLDS, min_shots=MIN_SHOTS, activate_model=True):
+    """
+    누적된 슈팅(또는 shots)으로 계수를 적합하고 새 버전으로 저장합니다.
+    진단: 기본 계수 / 적합 계수(학습 데이터) / 적합 계수(경기 단위 k-fold out-of-fold)의 보정 지표와 적합 시간
+    반환: 새 모델 dict (슈팅이 min_shots보다 적으면 ValueError)
+    """
+    shots = load_shots() if shots is None else shots
+    features, goals = shots['features'], shots['goals'].astype(float)
+    if len(goals) < min_shots:
+        raise ValueError(f"xG 보정에는 슈팅이 {min_shots}개 이상 필요합니다. (현재 {len(goals)}개)")
+
+    started = time.perf_counter()
+    coef, iterations = fit_logistic(features, goals)
+    fit_seconds = time.perf_counter() - started
+
+    diagnostics = {
+        'iterations': int(iterations), 'fit_seconds': fit_seconds, 'matches': int(len(shots['match_ids'])),
+        'default': calibration_report(goals, predict(features, DEFAULT_COEF)),
+        'fitted': calibration_report(goals, predict(features, coef)),
+    }
+    folds = min(int(folds), len(shots['match_ids']))
+    if folds >= 2:
+        # 같은 경기의 슈팅은 같은 폴드 -> 폴드마다 나머지 경기로 학습한 계수를 한 번에 적합
+        fold = shots['match'] % folds
+        started = time.perf_counter()
+        fold_coef, _ = fit_logistic(features, goals, weights=(fold[None, :] != np.arange(folds)[:, None]))
+        diagnostics['cv_fit_seconds'] = time.perf_counter() - started
+        out_of_fold = np.empty(len(goals))
+        for k in range(folds):
+            out_of_fold[fold == k] = predict(features[fold == k], fold_coef[k])
+        diagnostics['cross_validated'] = dict(calibration_report(goals, out_of_fold), folds=folds)
+
+    with file_lock(ACTIVE_PATH):
+        version = max(model['version'] for model in list_versions()) + 1
+        model = {'version': version, 'coef': coef, 'shots': int(len(goals)), 'fitted_at': time.time(),
+                 'diagnostics': diagnostics}
+        buffer = io.BytesIO()
+        np.savez(buffer, **_model_arrays(model))
+        atomic_write_bytes(_version_path(version), buffer.getvalue())
+        if activate_model:
+            atomic_write_bytes(ACTIVE_PATH, buffer.getvalue())
+    return model
+
+
+def model_info(model):
+    """
+    JSON 응답용 모델 요약 (계수는 특징 이름별)
+    """
+    return {
+        'version': model['version'], 'shots': model['shots'], 'fitted_at': model['fitted_at'],
+        'coefficients': dict(zip(['intercept'] + FEATURES, np.round(model['coef'], 6).tolist())),
+        'diagnostics': model['diagnostics'],
+    }
@@ -0,0 +1,263 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from stats_utils import grid_cell, tag_mask, match_keys
+from storage import DATA_DIR, atomic_write_bytes, file_lock
+
+# --- 상수 ---
+# xT 그리드: 가로 16칸 x 세로 12칸 (셀 번호 = gx * XT_GRID_Y + gy)
+XT_GRID_X = 16
+XT_GRID_Y = 12
+XT_CELLS = XT_GRID_X * XT_GRID_Y
+
+SHOT_ACTIONS = ['Goal', 'Shot On Target', 'Shot', 'Blocked Shot']
+# 공을 다른 칸으로 옮기는 액션 -> xT_Summary 분류
+MOVE_CATEGORIES = {
+    'Pass': 'Pass', 'Key Pass': 'Pass', 'Assist': 'Pass',
+    'Cross': 'Cross',
+    'Dribble': 'Dribble', 'Breakthrough': 'Dribble',
+}
+MOVE_ACTIONS = list(MOVE_CATEGORIES)
+
+MAX_ITERATIONS = 200
+TOLERANCE = 1e-7
+
+MODEL_PATH = os.path.join(DATA_DIR, 'xt_model.npz')
+
+
+def _cells(df, point):
+    x_col, y_col = f'{point}X_adj', f'{point}Y_adj'
+    if x_col not in df.columns or y_col not in df.columns:
+        return np.full(len(df), -1, dtype=np.int64)
+    return grid_cell(df[x_col], df[y_col], XT_GRID_X, XT_GRID_Y).astype(np.int64)
+
+
+def _event_masks(df):
+    start = _cells(df, 'Start')
+    end = _cells(df, 'End')
+    action = df['Action']
+
+    is_shot = action.isin(SHOT_ACTIONS).to_numpy() & (start >= 0)
+    is_goal = (action == 'Goal').to_numpy() & (start >= 0)
+    is_move = action.isin(MOVE_ACTIONS).to_numpy() & (start >= 0)
+    success = tag_mask(df['Tags'], 'Success') if 'Tags' in df.columns else np.zeros(len(df), dtype=bool)
+    is_success_move = is_move & success & (end >= 0)
+    return start, end, is_shot, is_goal, is_move, is_success_move
+
+
+def count_transitions(df):
+    """
+    이벤트에서 칸별 슈팅/득점/이동 횟수와 칸 -> 칸 성공 이동 횟수를 집계합니다.
+    반환: (shots, goals, moves, transitions[XT_CELLS, XT_CELLS])
+    """
+    start, end, is_shot, is_goal, is_move, is_success_move = _event_masks(df)
+    shots = np.bincount(start[is_shot], minlength=XT_CELLS).astype(float)
+    goals = np.bincount(start[is_goal], minlength=XT_CELLS).astype(float)
+    moves = np.bincount(start[is_move], minlength=XT_CELLS).astype(float)
+    flat = start[is_success_move] * XT_CELLS + end[is_success_move]
+    transitions = np.bincount(flat, minlength=XT_CELLS * XT_CELLS).astype(float).reshape(XT_CELLS, XT_CELLS)
+    return shots, goals, moves, transitions
+
+
+def count_match_transitions(df, keys=None):
+    """
+    count_transitions와 같은 집계를 경기(match_keys)별로 합니다. 칸 -> 칸 이동은 0이 아닌 쌍만 희소하게 담습니다.
+    반환: match_ids[M], match_shots/match_goals/match_moves[M, XT_CELLS],
+          transition_match/transition_cell/transition_count (경기 -> 칸 순으로 정렬)
+    """
+    keys = match_keys(df) if keys is None else keys
+    codes, match_ids = pd.factorize(keys, sort=True)
+    n_matches = len(match_ids)
+    start, end, is_shot, is_goal, is_move, is_success_move = _event_masks(df)
+
+    def per_match(mask):
+        flat = codes[mask].astype(np.int64) * XT_CELLS + start[mask]
+        return np.bincount(flat, minlength=n_matches * XT_CELLS).astype(float).reshape(n_matches, XT_CELLS)
+
+    n_pairs = XT_CELLS * XT_CELLS
+    flat = codes[is_success_move].astype(np.int64) * n_pairs + start[is_success_move] * XT_CELLS + end[is_success_move]
+    pairs, counts = np.unique(flat, return_counts=True)
+    return {
+        'match_ids': np.asarray(match_ids, dtype=str),
+        'match_shots': per_match(is_shot), 'match_goals': per_match(is_goal), 'match_moves': per_match(is_move),
+        'transition_match': pairs // n_pairs, 'transition_cell': pairs % n_pairs,
+        'transition_count': counts.astype(float),
+    }
+
+
+def solve_xt(shots, goals, moves, transitions, max_iterations=MAX_ITERATIONS, tol=TOLERANCE):
+    """
+    xT(x) = P(shot|x) * P(goal|shot,x) + P(move|x) * sum_y T(x->y) * xT(y) 를 값 반복으로 풉니다.
+    반환: (xT 배열[XT_CELLS], 반복 횟수)
+    """
+    actions = shots + moves
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shot_prob = np.where(actions > 0, shots / actions, 0.0)
+        move_prob = np.where(actions > 0, moves / actions, 0.0)
+        goal_prob = np.where(shots > 0, goals / shots, 0.0)
+        # 실패한 이동도 분모(moves)에 포함되므로 행 합은 성공률 이하
+        transition_prob = np.where(moves[:, None] > 0, transitions / moves[:, None], 0.0)
+
+    shoot_value = shot_prob * goal_prob
+    xt = np.zeros(XT_CELLS)
+    for iteration in range(1, max_iterations + 1):
+        new_xt = shoot_value + move_prob * (transition_prob @ xt)
+        converged = np.max(np.abs(new_xt - xt)) < tol
+        xt = new_xt
+        if converged:
+            break
+    return xt, iteration
+
+
+MATCH_ARRAYS = ['match_shots', 'match_goals', 'match_moves']
+TRANSITION_ARRAYS = ['transition_match', 'transition_cell', 'transition_count']
+
+
+def _empty_model():
+    return {
+        'match_ids': np.array([], dtype=str),
+        'match_shots': np.zeros((0, XT_CELLS)), 'match_goals': np.zeros((0, XT_CELLS)), 'match_moves': np.zeros((0, XT_CELLS)),
+        'transition_match': np.zeros(0, dtype=np.int64), 'transition_cell': np.zeros(0, dtype=np.int64),
+        'transition_count': np.zeros(0),
+        'grid': np.zeros(XT_CELLS),
+    }
+
+
+def load_model(path=None):
+    try:
+        with np.load(path or MODEL_PATH, allow_pickle=False) as data:
+            model = {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return _empty_model()
+    if model.get('grid', np.zeros(0)).shape != (XT_CELLS,) or 'match_shots' not in model:
+        # 그리드 크기가 바뀌었거나 경기별 집계가 없는 이전 형식이면 다시 학습
+        return _empty_model()
+    return model
+
+
+def _save_model(model, path):
+    buffer = io.BytesIO()
+    np.savez(buffer, **model)
+    atomic_write_bytes(path, buffer.getvalue())
+
+
+def model_totals(model):
+    """
+    경기별 집계를 합산합니다. 반환: (shots, goals, moves, transitions[XT_CELLS, XT_CELLS])
+    """
+    transitions = np.bincount(model['transition_cell'], weights=model['transition_count'], minlength=XT_CELLS * XT_CELLS)
+    return (model['match_shots'].sum(axis=0), model['match_goals'].sum(axis=0), model['match_moves'].sum(axis=0),
+            transitions.reshape(XT_CELLS, XT_CELLS))
+
+
+def _match_transitions(model, i):
+    bounds = np.searchsorted(model['transition_match'], [i, i + 1])
+    return model['transition_cell'][bounds[0]:bounds[1]], model['transition_count'][bounds[0]:bounds[1]]
+
+
+def _changed_matches(model, counts):
+    # 저장된 모델에 없거나 집계가 달라진(부분/수정 후 재내보내기) 경기의 counts 내 위치
+    index = {match_id: i for i, match_id in enumerate(model['match_ids'].tolist())}
+    changed = []
+    for j, match_id in enumerate(counts['match_ids'].tolist()):
+        i = index.get(match_id)
+        if i is None or not all(np.array_equal(model[name][i], counts[name][j]) for name in MATCH_ARRAYS):
+            changed.append(j)
+            continue
+        old_cells, old_counts = _match_transitions(model, i)
+        new_cells, new_counts = _match_transitions(counts, j)
+        if not (np.array_equal(old_cells, new_cells) and np.array_equal(old_counts, new_counts)):
+            changed.append(j)
+    return changed
+
+
+def _replace_matches(model, counts, changed):
+    # 바뀐 경기의 이전 집계를 빼고 새 집계를 뒤에 붙임 (transition_match 정렬 유지)
+    replaced = np.isin(model['match_ids'], counts['match_ids'][changed])
+    keep = np.flatnonzero(~replaced)
+    remap = np.full(len(replaced), -1, dtype=np.int64)
+    remap[keep] = np.arange(len(keep))
+    new_index = np.full(len(counts['match_ids']), -1, dtype=np.int64)
+    new_index[changed] = len(keep) + np.arange(len(changed))
+
+    kept_t = ~replaced[model['transition_match']]
+    new_t = new_index[counts['transition_match']] >= 0
+    merged = {'match_ids': np.concatenate([model['match_ids'][keep], counts['match_ids'][changed]]).astype(str)}
+    for name in MATCH_ARRAYS:
+        merged[name] = np.concatenate([model[name][keep], counts[name][changed]])
+    merged['transition_match'] = np.concatenate([remap[model['transition_match'][kept_t]],
+                                                 new_index[counts['transition_match'][new_t]]])
+    for name in ('transition_cell', 'transition_count'):
+        merged[name] = np.concatenate([model[name][kept_t], counts[name][new_t]])
+    return merged
+
+
+def update_xt_model(df, path=None):
+    """
+    df의 경기별 집계를 저장된 모델과 비교해, 새 경기는 추가하고 집계가 달라진 경기(전반 종료 후 내보낸 뒤
+    전체 경기를 다시 내보낸 경우 등)는 이전 집계를 교체한 뒤 xT를 다시 풀어 저장합니다.
+    바뀐 경기가 없으면 디스크에 캐시된 그리드를 그대로 반환합니다.
+    반환: xT 그리드 (XT_GRID_X x XT_GRID_Y)
+    """
+    path = path or MODEL_PATH
+    counts = count_match_transitions(df)
+    model = load_model(path)
+    if not _changed_matches(model, counts):
+        return model['grid'].reshape(XT_GRID_X, XT_GRID_Y)
+
+    with file_lock(path):
+        # 잠금을 얻는 동안 다른 워커가 같은 경기를 반영했을 수 있으므로 다시 읽음
+        model = load_model(path)
+        changed = _changed_matches(model, counts)
+        if changed:
+            model = _replace_matches(model, counts, changed)
+            model['grid'], _ = solve_xt(*model_totals(model))
+            _save_model(model, path)
+    return model['grid'].reshape(XT_GRID_X, XT_GRID_Y)
+
+
+def add_xt_to_data(df, grid):
+    """
+    성공한 패스/크로스/드리블에 xT_Added = xT(끝 칸) - xT(시작 칸)을 추가합니다.
+    실패한 이동은 0, 이동이 아닌 이벤트는 NaN입니다.
+    """
+    flat = np.asarray(grid, dtype=float).reshape(-1)
+    start = _cells(df, 'Start')
+    end = _cells(df, 'End')
+    is_move = df['Action'].isin(MOVE_ACTIONS).to_numpy()
+    success = tag_mask(df['Tags'], 'Success') if 'Tags' in df.columns else np.zeros(len(df), dtype=bool)
+    valid = (start >= 0) & (end >= 0)
+
+    gained = np.where(valid, flat[np.clip(end, 0, None)] - flat[np.clip(start, 0, None)], 0.0)
+    df['xT_Added'] = np.where(is_move, np.where(success & valid, gained, 0.0), np.nan)
+    return df
+
+
+def create_xt_summary(df):
+    """
+    선수별 xT_Added 합계 (Pass / Cross / Dribble / Total)를 한 번의 groupby로 계산합니다.
+    """
+    columns = ['xT_Pass', 'xT_Cross', 'xT_Dribble', 'xT_Total']
+    all_players = df['Player'].unique()
+    if 'xT_Added' not in df.columns:
+        return pd.DataFrame(0.0, index=all_players, columns=columns)
+
+    moves = df[df['Action'].isin(MOVE_ACTIONS)]
+    summary = moves.groupby(['Player', moves['Action'].map(MOVE_CATEGORIES)])['xT_Added'].sum().unstack(fill_value=0.0)
+    summary = summary.reindex(index=all_players, columns=['Pass', 'Cross', 'Dribble'], fill_value=0.0).fillna(0.0)
+    summary.columns = columns[:3]
+    summary['xT_Total'] = summary.sum(axis=1)
+    return summary.round(4).sort_values(by='xT_Total', ascending=False)
+
+
+def grid_to_frame(grid):
+    """
+    xT 그리드를 시트 출력용 DataFrame으로 변환합니다. (행: 세로칸 gy, 열: 가로칸 gx, 공격 방향 -> 오른쪽)
+    """
+    grid = np.asarray(grid).reshape(XT_GRID_X, XT_GRID_Y)
+    frame = pd.DataFrame(grid.T, columns=[f'x{gx}' for gx in range(XT_GRID_X)])
+    frame.index.name = 'y'
+    return frame.round(5)